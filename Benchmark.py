@@ -0,0 +1,354 @@
+import json
+import math
+import os
+import sys
+import time
+
+from Sim.Assigner import Assigner
+from Sim.Customer import Customer
+from Sim.Distribution import Distribution
+from Sim.RandomStreams import RandomStreams
+from Sim.Server import Server
+from Sim.SimQueue import SimQueue
+from Sim.Simulation import Simulation
+from Sim.SimulationAnalysis import SimulationAnalysis
+from Sim.SourcePopulation import SourcePopulation
+from Sim.SystemExit import SystemExit
+
+
+class Benchmark:
+    """
+    Performance benchmarks of the simulation engine. Each benchmark builds a model, then
+    times one piece of work on it, and reports a rate: events per second for the engine
+    benchmarks, and Customers per second for the analysis benchmark. Rates are compared
+    against baselines stored in a JSON file, and a benchmark whose rate falls more than
+    the threshold below its baseline is reported as a regression.
+
+    Run from the command line with:
+
+        python Benchmark.py [names] [--scale S] [--repeat R] [--threshold T] [--save]
+
+    which prints the results, exits with status 1 if any benchmark regressed, and with
+    --save stores the results as the new baselines. Baselines are machine specific, so
+    they should be saved on the machine that checks for regressions. Building the
+    Customers of the analysis benchmark dominates a run, since every Customer keeps a
+    DataFrame row per experience; --scale 10 analyzes 1M Customers, given enough memory.
+    """
+
+    # benchmark name -> (description, unit, default size)
+    BENCHMARKS = {'mm1': ('M/M/1 queue', 'events/s', 10000),
+                  'mmc100': ('M/M/c queue with 100 servers', 'events/s', 10000),
+                  'tandem50': ('tandem line of 50 single-server queues', 'events/s', 10000),
+                  'breakdowns': ('servers that go out of service every few customers',
+                                 'events/s', 10000),
+                  'analysis': ('SimulationAnalysis of 100k customers', 'customers/s', 100000)}
+
+    # default location of the stored baselines, next to this module
+    BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                 'benchmark_baselines.json')
+
+    def __init__(self, baselinePath = None, threshold = 0.2, repeat = 3, scale = 1.0, seed = 1):
+        """
+        Benchmark class constructor
+        @param baselinePath: str - JSON file of baseline rates (default BASELINE_PATH)
+        @param threshold: double - fraction by which a rate may fall below its baseline
+                          before it is reported as a regression
+        @param repeat: int - number of times each benchmark is timed; the best time is kept
+        @param scale: double - factor applied to the size of every benchmark (e.g. 0.1 for
+                      a quick run)
+        @param seed: int - seed of the random streams of the benchmark models
+        """
+
+        self._baselinePath = baselinePath if baselinePath is not None else self.BASELINE_PATH
+        self._threshold = threshold
+        self._repeat = max(1, int(repeat))
+        self._scale = scale
+        self._seed = seed
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        msg = ""
+        msg += f'{type(self)} object at {id(self)}\n'
+        msg += f'\tIs a benchmark suite with baselines: {self._baselinePath}\n'
+
+        return msg
+
+    @property
+    def baselinePath(self):
+        return self._baselinePath
+
+    @property
+    def threshold(self):
+        return self._threshold
+
+    def getSize(self, name):
+        """
+        Returns the number of events (or Customers) a benchmark processes at this scale
+
+        @param name: str - benchmark name
+        @return: int
+        """
+        return max(1, int(self.BENCHMARKS[name][2] * self._scale))
+
+    def run(self, names = None):
+        """
+        Runs benchmarks and returns their results
+
+        @param names: list of str - benchmarks to run (default all of BENCHMARKS); unknown
+                      names are ignored
+        @return: dictionary of name -> {'rate', 'unit', 'size', 'seconds'}
+        """
+        if names is None:
+            names = list(self.BENCHMARKS)
+
+        results = {}
+        for name in [n for n in names if n in self.BENCHMARKS]:
+            size = self.getSize(name)
+
+            if name == 'analysis':
+                seconds = self._timeAnalysis(size)
+            else:
+                build = {'mm1': self._buildMM1, 'mmc100': self._buildMMC100,
+                         'tandem50': self._buildTandem50, 'breakdowns': self._buildBreakdowns}[name]
+                seconds = self._timeSimulation(build, size)
+
+            results[name] = {'rate': size / seconds if seconds > 0 else math.inf,
+                             'unit': self.BENCHMARKS[name][1],
+                             'size': size,
+                             'seconds': seconds}
+
+        return results
+
+    def loadBaselines(self):
+        """
+        Reads the stored baselines
+
+        @return: dictionary of name -> result, empty if there are none
+        """
+        try:
+            with open(self._baselinePath) as file:
+                return json.load(file)
+
+        except (OSError, ValueError):
+            return {}
+
+    def saveBaselines(self, results):
+        """
+        Stores results as the baselines of their benchmarks, keeping the baselines of
+        benchmarks that were not run
+
+        @param results: dictionary as returned by run
+        @return: None
+        """
+        baselines = self.loadBaselines()
+        baselines.update(results)
+
+        with open(self._baselinePath, 'w') as file:
+            json.dump(baselines, file, indent=2, sort_keys=True)
+
+    def compare(self, results, baselines = None):
+        """
+        Compares results with their baselines
+
+        @param results: dictionary as returned by run
+        @param baselines: dictionary of name -> result (default the stored baselines)
+        @return: dictionary of name -> {'rate', 'baseline', 'change', 'regressed'}, where
+                 change is the relative change of the rate and baseline is None for
+                 benchmarks without a baseline
+        """
+        if baselines is None:
+            baselines = self.loadBaselines()
+
+        comparison = {}
+        for name, result in results.items():
+            baseline = baselines.get(name, {}).get('rate')
+
+            if baseline is None or baseline <= 0:
+                comparison[name] = {'rate': result['rate'], 'baseline': None,
+                                    'change': math.nan, 'regressed': False}
+                continue
+
+            change = result['rate'] / baseline - 1
+            comparison[name] = {'rate': result['rate'], 'baseline': baseline,
+                                'change': change, 'regressed': change < -self._threshold}
+
+        return comparison
+
+    def report(self, results, comparison):
+        """
+        Formats results and their comparison with the baselines as a table
+
+        @return: str
+        """
+        lines = [f'{"benchmark":<12}{"size":>10}{"rate":>16}  {"unit":<12}{"baseline":>14}{"change":>9}']
+
+        for name, result in results.items():
+            compared = comparison[name]
+            baseline = '-' if compared['baseline'] is None else f'{compared["baseline"]:.1f}'
+            change = '-' if compared['baseline'] is None else f'{compared["change"]:+.1%}'
+            flag = '  REGRESSED' if compared['regressed'] else ''
+
+            lines.append(f'{name:<12}{result["size"]:>10}{result["rate"]:>16.1f}  '
+                         f'{result["unit"]:<12}{baseline:>14}{change:>9}{flag}')
+
+        return '\n'.join(lines)
+
+    def _timeSimulation(self, build, size):
+        """
+        Private method timing size events of Simulations built by build, keeping the best
+        of repeat runs. Building the Simulation is not timed.
+        @return: float - seconds
+        """
+        best = math.inf
+
+        for i in range(self._repeat):
+            sim = build()
+
+            start = time.perf_counter()
+            sim.run(maxEvents=size)
+            best = min(best, time.perf_counter() - start)
+
+        return best
+
+    def _timeAnalysis(self, size):
+        """
+        Private method timing the analysis of a Simulation with size completed Customers,
+        keeping the best of repeat runs. The Customers are built once and not timed.
+        @return: float - seconds
+        """
+        sim = Simulation(self._seed)
+        se = SystemExit('SE0')
+        sim.addStage(se)
+
+        for i in range(size):
+            cust = Customer(i, i, source='SP0')
+            cust.logArrival(i, 'Q0')
+            cust.logServiceEntry(i + (i % 7), 'Server0')
+            cust.logServiceCompletion(i + (i % 7) + 3)
+            se.acceptArrival(i + (i % 7) + 3, cust)
+
+        best = math.inf
+
+        for i in range(self._repeat):
+            start = time.perf_counter()
+            SimulationAnalysis(sim).analyzeSystemPerformance()
+            best = min(best, time.perf_counter() - start)
+
+        return best
+
+    def _newSimulation(self):
+        """
+        Private method creating an empty Simulation with its own random streams
+        @return: Simulation
+        """
+        sim = Simulation(self._seed)
+        sim.setRandomStreams(RandomStreams(self._seed))
+
+        return sim
+
+    def _buildLine(self, numQueues, numServers, interarrival, service, downTime, oos):
+        """
+        Private method building a line of numQueues queues in series, each with
+        numServers Servers, fed by one SourcePopulation
+        @return: Simulation
+        """
+        import scipy.stats
+
+        sim = self._newSimulation()
+
+        arrivals = Distribution(scipy.stats.expon(scale=interarrival))
+        services = Distribution(scipy.stats.expon(scale=service))
+        downTimes = Distribution(downTime)
+        oosTimes = Distribution(oos)
+
+        se = SystemExit('SE0')
+        sim.addStage(se)
+
+        dest = se
+        queues = []
+        for q in reversed(range(numQueues)):
+            queue = SimQueue(f'Q{q}', Assigner().assignInSequence)
+            queue.assignServer = Assigner().assignByAvailableTime
+            queue.addCustomerDestination(dest)
+            queues.append(queue)
+            dest = queue
+
+        sp = SourcePopulation('SP0', arrivals, Assigner().assignInSequence)
+        sp.addCustomerDestination(dest)
+        sim.addStage(sp)
+
+        for queue in reversed(queues):
+            sim.addStage(queue)
+
+            for s in range(numServers):
+                queue.addServer(Server(f'{queue.id}-Server{s}', 0, downTimes, oosTimes, services))
+
+        return sim
+
+    def _buildMM1(self):
+        """
+        Private method building an M/M/1 queue at 80% utilization, whose servers never
+        go out of service
+        @return: Simulation
+        """
+        import scipy.stats
+
+        return self._buildLine(1, 1, 10, 8, scipy.stats.uniform(loc=1e12, scale=1),
+                               scipy.stats.uniform(loc=1, scale=1))
+
+    def _buildMMC100(self):
+        """
+        Private method building an M/M/c queue with 100 servers at 90% utilization
+        @return: Simulation
+        """
+        import scipy.stats
+
+        return self._buildLine(1, 100, 1, 90, scipy.stats.uniform(loc=1e12, scale=1),
+                               scipy.stats.uniform(loc=1, scale=1))
+
+    def _buildTandem50(self):
+        """
+        Private method building 50 M/M/1 queues in series at 80% utilization
+        @return: Simulation
+        """
+        import scipy.stats
+
+        return self._buildLine(50, 1, 10, 8, scipy.stats.uniform(loc=1e12, scale=1),
+                               scipy.stats.uniform(loc=1, scale=1))
+
+    def _buildBreakdowns(self):
+        """
+        Private method building a queue with 5 servers that go out of service after
+        about every 3 customers
+        @return: Simulation
+        """
+        import scipy.stats
+
+        return self._buildLine(1, 5, 4, 10, scipy.stats.expon(scale=30),
+                               scipy.stats.expon(scale=5))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmarks of the simulation engine')
+    parser.add_argument('names', nargs='*', help=f'benchmarks to run: {", ".join(Benchmark.BENCHMARKS)}')
+    parser.add_argument('--scale', type=float, default=1.0, help='factor applied to every benchmark size')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per benchmark (best is kept)')
+    parser.add_argument('--threshold', type=float, default=0.2, help='allowed relative slowdown')
+    parser.add_argument('--baselines', default=None, help='JSON file of baselines')
+    parser.add_argument('--save', action='store_true', help='store the results as the new baselines')
+    args = parser.parse_args()
+
+    benchmark = Benchmark(args.baselines, args.threshold, args.repeat, args.scale)
+    results = benchmark.run(args.names or None)
+    comparison = benchmark.compare(results)
+
+    print(benchmark.report(results, comparison))
+
+    if args.save:
+        benchmark.saveBaselines(results)
+
+    sys.exit(1 if any(c['regressed'] for c in comparison.values()) else 0)
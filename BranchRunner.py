@@ -0,0 +1,174 @@
+import copy
+import math
+import multiprocessing
+
+import numpy as np
+
+from Sim.RandomStreams import RandomStreams
+from Sim.Simulation import Simulation
+from Sim.SimulationAnalysis import SimulationAnalysis
+
+
+class BranchRunner:
+    """
+    Runs several scenario variants ("branches") forward from the same warmed-up Simulation.
+    Each branch starts from an identical copy of the Simulation, including its RandomStreams,
+    so the branches are compared using common random numbers: the same stage or Server
+    draws the same random numbers in every branch. A snapshot without RandomStreams is given
+    streams seeded by the runner's seed in every branch.
+    """
+
+    # runner whose branches are being executed; inherited by forked worker processes
+    _active = None
+
+    def __init__(self, sim, seed = None):
+        """
+        BranchRunner class constructor
+        @param sim: Simulation - the (typically warmed-up) simulation every branch starts from
+        @param seed: int or list of int - seed of the RandomStreams given to the branches if
+                     the snapshot has none. If None, a seed is drawn from the operating
+                     system and can be read back from the seed property.
+        """
+
+        if isinstance(sim, Simulation):
+            self._sim = sim
+        else:
+            self._sim = None
+
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+
+        self._seed = seed
+
+        # branch name -> function that modifies the branch's copy of the Simulation
+        self._branches = {}
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        msg = ""
+        msg += f'{type(self)} object at {id(self)}\n'
+        msg += f'\tIs a branch runner with branches: {list(self._branches.keys())}\n'
+
+        return msg
+
+    @property
+    def seed(self):
+        return self._seed
+
+    @property
+    def numBranches(self):
+        return len(self._branches)
+
+    def isValid(self):
+        """
+        Insures that the runner has a Simulation and at least one branch
+
+        @return: Bool
+        """
+        return self._sim is not None and len(self._branches) > 0
+
+    def addBranch(self, name, modify = None):
+        """
+        Adds a branch to be run from the snapshot. The modify function receives the
+        branch's own copy of the Simulation and may change it in any way (e.g. add a Server
+        to a SimQueue, or change an assignServer policy) before the branch is run.
+
+        @param name: str or int - unique name of the branch
+        @param modify: function accepting a Simulation, or None to run the snapshot unchanged
+        @return: Bool
+        """
+        if name in self._branches or not (modify is None or callable(modify)):
+            return False
+
+        self._branches[name] = modify
+        return True
+
+    def removeBranch(self, name):
+        """
+        Removes a branch if it exists
+
+        @return: Bool - True if the branch was removed, False if not found
+        """
+        if name in self._branches:
+            del self._branches[name]
+            return True
+
+        return False
+
+    def run(self, maxTime = math.inf, maxEvents = 1000, processes = None, analyze = None):
+        """
+        Runs every branch from the snapshot. Where the platform supports it, each branch
+        runs in a worker process forked from this process, so the snapshot is shared
+        copy-on-write rather than copied; otherwise the branches run one after another
+        on deep copies of the snapshot.
+
+        @param maxTime: double - simulated time to run past the snapshot's current time
+        @param maxEvents: int - number of events to run past the snapshot
+        @param processes: int - number of worker processes, or None for one per CPU.
+                                Use 1 to run the branches in this process.
+        @param analyze: function accepting the branch's Simulation and returning a picklable
+                        result. Defaults to SimulationAnalysis.analyzeSystemPerformance for
+                        the Customers arriving after the snapshot.
+        @return: dictionary of branch name -> result
+        """
+        if not self.isValid():
+            return {}
+
+        self._maxTime = self._sim.simtime + maxTime
+        self._maxEvents = self._sim.getTrialsCompleted() + maxEvents
+        self._analyze = analyze
+
+        names = list(self._branches.keys())
+
+        if processes != 1 and 'fork' in multiprocessing.get_all_start_methods():
+            BranchRunner._active = self
+            try:
+                ctx = multiprocessing.get_context('fork')
+
+                # a fresh worker per branch ensures every branch starts from the pristine snapshot
+                with ctx.Pool(processes, maxtasksperchild=1) as pool:
+                    results = pool.map(_runBranch, names, chunksize=1)
+            finally:
+                BranchRunner._active = None
+        else:
+            results = [self._runBranch(name, copy.deepcopy(self._sim)) for name in names]
+
+        return dict(zip(names, results))
+
+    def _runBranch(self, name, sim):
+        """
+        Private method that applies a branch's modification to its copy of the Simulation,
+        runs it with the snapshot's random streams and analyzes the result
+        @param name: str or int - name of the branch
+        @param sim: Simulation - the branch's own copy of the snapshot
+        @return: result of the analyze function
+        """
+        startTime = sim.simtime
+
+        # streams are assigned before the modification, so that Servers and stages added
+        # by a branch get their own streams too
+        if sim.randomStreams is None:
+            sim.setRandomStreams(RandomStreams(self._seed))
+
+        modify = self._branches[name]
+        if modify is not None:
+            modify(sim)
+
+        sim.run(maxTime=self._maxTime, maxEvents=self._maxEvents)
+
+        if self._analyze is None:
+            return SimulationAnalysis(sim, startTime).analyzeSystemPerformance()
+
+        return self._analyze(sim)
+
+
+def _runBranch(name):
+    """
+    Worker process entry point. The runner and its snapshot were inherited from the parent
+    process by fork, so only the branch name crosses the process boundary.
+    """
+    runner = BranchRunner._active
+
+    return runner._runBranch(name, runner._sim)
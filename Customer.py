@@ -1,8 +1,5 @@
-import pandas as pd
 import numpy as np
 import math
-import scipy
-from scipy import stats
 from Sim.Experience import Experience
 
 
@@ -12,23 +9,43 @@ class Customer:
 
     """
 
-    def __init__(self, name, simtime):
+    def __init__(self, name, simtime, attributes = None, priority = 0, source = None):
         """
         Customer class constructor
-        @param name: name of the customer
+        @param name: name of the customer, or its sequence number if source is given
         @param simtime: Time that customer arrives in a system
+        @param attributes: optional dictionary of descriptive attributes (e.g. from a trace)
+        @param priority: customer class used by priority queues; lower values are served first
+        @param source: id of the source population that created the customer. If given,
+                       the customer is identified by the key (source, number), and its
+                       name, source-number, is only formatted when it is requested.
         """
 
-        self._name = str(name)
+        if source is None:
+            self._name = str(name)
+            self._key = self._name
+        else:
+            self._name = None
+            self._key = (source, name)
+
+        self._source = source
+        self._number = name
         self._systemArrivalTime = simtime
         self._simtime = simtime
 
 
         self._experience = {}
         self._arrivalTime = None
-        self._df_list = []
+        # Experiences completed or abandoned, in order; their rows are only built when
+        # the statistics are requested
+        self._finished = []
         self.totalWait = 0
         self.totalSys = 0
+        self._attributes = attributes if attributes is not None else {}
+        self._priority = priority
+
+        # service time still owed to the customer if its service was interrupted
+        self._remainingServiceTime = None
 
 
     def __repr__(self):
@@ -54,6 +71,64 @@ class Customer:
         return self._systemArrivalTime
 
 
+    @property
+    def attributes(self):
+        """
+        Getter property for the customer's descriptive attributes
+
+        @return: dictionary
+        """
+
+        return self._attributes
+
+
+    @property
+    def priority(self):
+        """
+        Getter property for the customer's priority class
+
+        @return: int
+        """
+
+        return self._priority
+
+
+    @property
+    def remainingServiceTime(self):
+        """
+        Getter property for the service time still owed to the customer after its service
+        was interrupted, or None if the customer is not part way through service
+
+        @return: double or None
+        """
+
+        return self._remainingServiceTime
+
+
+    @remainingServiceTime.setter
+    def remainingServiceTime(self, remainingServiceTime):
+        """
+        Setter property for the service time still owed to the customer
+
+        @return: None
+        """
+
+        self._remainingServiceTime = remainingServiceTime
+
+
+    @property
+    def key(self):
+        """
+        Getter property for the key identifying the customer in a SystemExit: its name,
+        or, if it was created by a source population, the tuple (source id, sequence
+        number). Keys therefore depend only on the source and the order of its arrivals,
+        so identical runs (in any process) produce identical keys.
+
+        @return: string or tuple
+        """
+        return self._key
+
+
     @property
     def name(self):
         """
@@ -61,6 +136,9 @@ class Customer:
 
         @return: string
         """
+        if self._name is None:
+            self._name = f'{self._source}-{self._number}'
+
         return self._name
 
 
@@ -144,15 +222,14 @@ class Customer:
 
     def logServiceCompletion(self, simtime):
         """
-        Logs that the Customer has completed service, and creates the Dataframe from the Experience class becayse the data from that queue is complete
+        Logs that the Customer has completed service, and keeps the Experience for the
+        statistics because the data from that queue is complete
 
         @return: No return
         """
         self.exp.logServiceCompletion(simtime)
 
-        self.single_df = self.exp.makeRow()
-
-        self._df_list.append(self.single_df)
+        self._finished.append(self.exp)
 
         if not math.isnan(self.exp.systemTime):
 
@@ -170,16 +247,32 @@ class Customer:
 
 
 
+    def logAbandonment(self, simtime):
+        """
+        Logs that the Customer has abandoned the queue without entering service
+
+        @return: No return
+        """
+        self.exp.logAbandonment(simtime)
+
+        self._finished.append(self.exp)
+
+        self.totalWait += self.exp.waitingTime
+        self.totalSys += self.exp.systemTime
+
+
+
     def getExperienceStatistics(self):
         """
-        Returns the dataframe that the Experience class created for the Customer object
+        Returns the dataframe of the Customer's Experiences, built from their rows
 
         @return: pandas Dataframe
         """
 
         if not math.isnan(self.exp.serviceCompletionTime):
+            import pandas as pd
 
-            self.df = pd.concat(self._df_list)
+            self.df = pd.concat([exp.makeRow() for exp in self._finished])
 
         else:
 
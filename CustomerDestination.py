@@ -23,6 +23,30 @@ class CustomerDestination(SimulationStage):
 
         return False
 
+    def acceptArrivals(self, simtime, customers):
+        """
+        Accepts several Customers arriving at the same time. By default, each Customer is
+        offered to acceptArrival in turn; subclasses may accept them more efficiently.
+        @param simtime: double - elapsed time, from the start of the simulation, at which the
+                                 Customer arrivals are taking place.
+        @param customers: list of Customer - Customers that have arrived at the
+                                             SimulationStage
+        @return: int - number of Customers accepted
+        """
+
+        return sum(1 for cust in customers if self.acceptArrival(simtime, cust))
+
+    def addBlockedStage(self, stage):
+        """
+        Records that an upstream stage keeps Customers this CustomerDestination refused.
+        A CustomerDestination does not block upstream stages, so refused Customers are not
+        kept, and this method always returns False.
+        @param stage: SimulationStage - stage that would keep the refused Customers
+        @return: False
+        """
+
+        return False
+
     def getNumCustomersWaiting(self):
         """
         Because SimulationStage is an abstract class, there can be no Customers waiting.
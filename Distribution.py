@@ -1,13 +1,24 @@
-import scipy
-from scipy import stats
+import numpy as np
 
 class Distribution:
     """
     Represents an instance of a probability distribution for the purpose of
-    generating random variates.
+    generating random variates. scipy is imported when the first Distribution is
+    validated rather than when the module is loaded.
     """
 
-    def __init__(self, RNG):
+    # valid interpolation methods for tabulated inverse-CDF sampling
+    INTERPOLATIONS = ['linear', 'nearest']
+
+    # tabulated samplers cover the uniforms in [TAIL_MASS, 1 - TAIL_MASS]; draws in the
+    # tails are computed exactly
+    TAIL_MASS = 1e-3
+
+    # initial and maximum number of intervals in a tabulated sampler
+    MIN_TABLE_SIZE = 256
+    MAX_TABLE_SIZE = 2 ** 20
+
+    def __init__(self, RNG, tabulate = False, tolerance = 1e-4, interpolation = 'linear'):
         """
         Distribution class constructor. Distribution is a "strategy" object that
         encapsulates a random number generating function. This provides for complete
@@ -18,6 +29,12 @@ class Distribution:
                     If a distribution specification, it must represent a valid
                     np.random function call. For example, normal(100, 20) would
                     be valid as np.random.normal(100, 20) is a valid function call.
+        @param tabulate: bool - if True, a continuous distribution precomputes a table of
+                         its inverse CDF and samples by table lookup, which costs the same
+                         for every distribution family
+        @param tolerance: double - maximum error of a tabulated quantile, relative to the
+                          distribution's interquartile range
+        @param interpolation: str - 'linear' or 'nearest' interpolation between table entries
         """
 
 
@@ -27,6 +44,17 @@ class Distribution:
         else:
             self._RNG = None
 
+        self._table = None
+        self._tolerance = tolerance
+
+        if interpolation in self.INTERPOLATIONS:
+            self._interpolation = interpolation
+        else:
+            self._interpolation = 'linear'
+
+        if tabulate and self._RNG is not None:
+            self._tabulate()
+
     def __repr__(self):
         return (self.__str__())
 
@@ -37,10 +65,56 @@ class Distribution:
 
         return msg
 
+    def __getstate__(self):
+        """
+        Pickles scipy distributions by name and parameters rather than as live objects,
+        which carry a copy of their random state. This keeps pickles small, and an
+        unpickled Distribution draws from the global np.random state, like the original.
+        Distributions scipy.stats cannot rebuild by name are pickled as they are. The
+        inverse CDF table (up to MAX_TABLE_SIZE values) is tabulated again on unpickling
+        rather than pickled.
+        """
+        state = self.__dict__.copy()
+
+        state['_table'] = None
+        state.pop('_step', None)
+
+        for key in ['_RNG', '_tableRV']:
+            if key in state and state[key] is not None and type(state[key]) is not str:
+                state[key] = self._describe(state[key])
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+        for key in ['_RNG', '_tableRV']:
+            if type(state.get(key)) is tuple:
+                self.__dict__[key] = self._rebuild(state[key])
+
+        # only Distributions that were tabulated have a _tableRV
+        if self.__dict__.get('_tableRV') is not None and self._RNG is not None:
+            self._tabulate()
+
     @property
     def RNG(self):
         return self._RNG
 
+    @property
+    def isTabulated(self):
+        return self._table is not None
+
+    @property
+    def tableSize(self):
+        """
+        Number of intervals in the tabulated inverse CDF, or 0 if not tabulated
+        @return: int
+        """
+        if self._table is None:
+            return 0
+
+        return len(self._table) - 1
+
 
     def isValid(self, RNG):
         """
@@ -48,15 +122,19 @@ class Distribution:
         the Distribution will return None for getEvent calls.
         @return: boolean
         """
+        import scipy.stats
+
         try:
 
             if type(RNG) is str:
 
-                if isinstance(eval(RNG), scipy.stats.rv_continuous):
+                RNG = self._evaluate(RNG)
+
+                if isinstance(RNG, scipy.stats.rv_continuous):
                     return True
-                elif isinstance(eval(RNG), scipy.stats.rv_discrete):
+                elif isinstance(RNG, scipy.stats.rv_discrete):
                     return True
-                elif isinstance(eval(RNG), scipy.stats.distributions.rv_frozen):
+                elif isinstance(RNG, scipy.stats.distributions.rv_frozen):
                     return True
                 else:
                     return False
@@ -77,32 +155,171 @@ class Distribution:
 
 
 
-    def getEvent(self, count = 1):
+    def getEvent(self, count = 1, stream = None):
         """
         Generates a random variate for the Distribution using the random number
         generating function provided at construction. Returns NaN if the Distribution
         is not valid
 
+        @param count: int - number of variates to generate (only the first is returned)
+        @param stream: RandomStream - if supplied, the variate is generated by inverse
+                       transform from the stream's uniforms instead of the global
+                       np.random state
         @return: double
         """
 
+        if self._table is not None:
+
+            if stream is None:
+                u = np.random.random_sample(count)
+            else:
+                u = stream.uniforms(count)
+
+            return self._lookup(u)[0]
+
         if self.isValid(self.RNG):
 
             if type(self.RNG) is str:
+                rng = self._evaluate(self._RNG)
+            else:
+                rng = self._RNG
 
+            if stream is None:
+                rv = rng.rvs(size=count)
+            else:
+                rv = rng.ppf(stream.uniforms(count))
 
-                rv = eval(self._RNG).rvs(size = count)
+            return rv[0]
 
-                return rv[0]
+        else:
+            return None
 
-            else:
-                rv = (self._RNG).rvs(size=count)
+    def mean(self):
+        """
+        Returns the theoretical mean of the Distribution, or None if the Distribution
+        is not valid
 
-                return rv[0]
+        @return: double
+        """
+
+        if self.isValid(self.RNG):
+
+            if type(self.RNG) is str:
+                return self._evaluate(self._RNG).mean()
+            else:
+                return self._RNG.mean()
 
         else:
             return None
 
+    def _evaluate(self, spec):
+        """
+        Private method evaluating a distribution specification such as
+        "scipy.stats.expon(scale=180)", with scipy and scipy.stats (as stats) in scope
+        @param spec: str - distribution specification
+        @return: object
+        """
+        import scipy.stats
+        from scipy import stats
+
+        return eval(spec)
+
+    def _describe(self, rv):
+        """
+        Private method describing a scipy distribution as (name, args, kwds), where args
+        and kwds are None for a distribution that is not frozen
+        @param rv: scipy distribution
+        @return: tuple, or rv if scipy.stats has no distribution of its name and type
+        """
+        import scipy.stats
+
+        dist = getattr(rv, 'dist', rv)
+        name = getattr(dist, 'name', None)
+
+        if not isinstance(name, str) or type(getattr(scipy.stats, name, None)) is not type(dist):
+            return rv
+
+        if isinstance(rv, scipy.stats.distributions.rv_frozen):
+            return name, rv.args, rv.kwds
+
+        return name, None, None
+
+    def _rebuild(self, description):
+        """
+        Private method rebuilding a scipy distribution from its description
+        @param description: tuple - (name, args, kwds) as returned by _describe
+        @return: scipy distribution
+        """
+        import scipy.stats
+
+        name, args, kwds = description
+        dist = getattr(scipy.stats, name)
+
+        if args is None:
+            return dist
+
+        return dist(*args, **kwds)
+
+    def _tabulate(self):
+        """
+        Private method that tabulates the inverse CDF on an evenly spaced grid of uniforms,
+        doubling the number of intervals until the interpolation error at the interval
+        midpoints is within tolerance. Discrete distributions are not tabulated.
+        @return: None
+        """
+        import scipy.stats
+
+        if type(self.RNG) is str:
+            rv = self._evaluate(self._RNG)
+        else:
+            rv = self._RNG
+
+        if isinstance(rv, scipy.stats.rv_discrete) or \
+                isinstance(getattr(rv, 'dist', None), scipy.stats.rv_discrete):
+            return
+
+        self._tableRV = rv
+        low = self.TAIL_MASS
+        high = 1 - self.TAIL_MASS
+        bound = self._tolerance * (rv.ppf(0.75) - rv.ppf(0.25))
+
+        size = self.MIN_TABLE_SIZE
+        while True:
+            self._table = rv.ppf(np.linspace(low, high, size + 1))
+            self._step = size / (high - low)
+
+            midpoints = low + (np.arange(size) + 0.5) / self._step
+            error = np.max(np.abs(self._lookup(midpoints) - rv.ppf(midpoints)))
+
+            if error <= bound or size >= self.MAX_TABLE_SIZE:
+                break
+
+            size *= 2
+
+    def _lookup(self, u):
+        """
+        Private method converting uniforms into variates using the tabulated inverse CDF.
+        The table is evenly spaced, so each lookup is a direct index rather than a search.
+        @param u: ndarray - uniforms
+        @return: ndarray
+        """
+        position = (u - self.TAIL_MASS) * self._step
+        size = len(self._table) - 1
+
+        if self._interpolation == 'nearest':
+            index = np.clip(np.rint(position).astype(int), 0, size)
+            rv = self._table[index]
+        else:
+            index = np.clip(position.astype(int), 0, size - 1)
+            fraction = position - index
+            rv = self._table[index] + fraction * (self._table[index + 1] - self._table[index])
+
+        tails = (u < self.TAIL_MASS) | (u > 1 - self.TAIL_MASS)
+        if tails.any():
+            rv[tails] = self._tableRV.ppf(u[tails])
+
+        return rv
+
     @RNG.setter
     def RNG(self, dist_spec):
 
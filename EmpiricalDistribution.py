@@ -0,0 +1,295 @@
+import math
+
+import numpy as np
+
+from Sim.Distribution import Distribution
+
+
+class EmpiricalDistribution(Distribution):
+    """
+    Represents a Distribution that generates random variates from observed data, such as
+    service times calibrated from production logs. The data is memory-mapped from a binary
+    file rather than read into memory, so very large samples load instantly and the pages
+    are shared by all processes that map the same file.
+    """
+
+    # valid sampling methods
+    METHODS = ['resample', 'ecdf', 'alias']
+
+    # number of values compared at a time when checking that 'ecdf' data is in order
+    CHUNK_SIZE = 1 << 20
+
+    def __init__(self, data, method = 'resample', dtype = 'float64', weights = None):
+        """
+        EmpiricalDistribution class constructor.
+
+        @param data: str or ndarray - path of a .npy file, or of a raw binary file of dtype
+                     values, or an array of values
+        @param method: str - 'resample' draws observations uniformly at random (bootstrap);
+                       'ecdf' requires ascending data (otherwise the EmpiricalDistribution
+                       is invalid) and interpolates between order statistics (a continuous
+                       inverse of the empirical CDF);
+                       'alias' draws the values in data with probabilities proportional to
+                       weights, using a Walker alias table
+        @param dtype: str - element type of a raw binary file
+        @param weights: str or ndarray - path of, or array with, one weight per value
+                        (required for 'alias', ignored otherwise)
+        """
+
+        self._table = None
+        self._mean = None
+        self._dtype = dtype
+
+        if method in self.METHODS:
+            self._method = method
+        else:
+            self._method = 'resample'
+
+        self._path = data if isinstance(data, str) else None
+        self._weightsPath = weights if isinstance(weights, str) else None
+
+        self._data = self._load(data, dtype)
+        self._weights = None
+
+        # 'ecdf' interpolates between neighbouring values, so they must be in order; the
+        # data is checked once here rather than sorted, which would copy it into memory
+        self._ascending = self._data is not None and self._method == 'ecdf' and \
+            self._isAscending()
+
+        if self._method == 'alias' and self._data is not None:
+            self._weights = self._load(weights, dtype)
+            self._buildAliasTable()
+
+        if self.isValid():
+            self._RNG = self._path if self._path is not None else \
+                f'array of {len(self._data)} values'
+        else:
+            self._RNG = None
+
+    def __getstate__(self):
+        """
+        Pickles file-backed data by path, so that worker processes map the file themselves
+        instead of receiving a copy of its contents. The alias table is derived from the
+        weights, so it is rebuilt on unpickling rather than pickled.
+        """
+        state = self.__dict__.copy()
+
+        if self._path is not None:
+            state['_data'] = None
+
+        if self._weightsPath is not None:
+            state['_weights'] = None
+
+        state['_probability'] = None
+        state['_alias'] = None
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+        if self._path is not None:
+            self._data = self._load(self._path, self._dtype)
+
+        if self._weightsPath is not None:
+            self._weights = self._load(self._weightsPath, self._dtype)
+
+        if self._method == 'alias' and self._data is not None:
+            self._buildAliasTable()
+
+    @property
+    def method(self):
+        return self._method
+
+    @property
+    def numValues(self):
+        if self._data is None:
+            return 0
+
+        return len(self._data)
+
+    def isValid(self, RNG = None):
+        """
+        Boolean function that returns the state of the EmpiricalDistribution. It is valid if
+        its data (and, for 'alias', its weights) could be loaded and is not empty, and, for
+        'ecdf', if its data is in ascending order.
+        @return: boolean
+        """
+        if self._data is None or len(self._data) == 0:
+            return False
+
+        if self._method == 'ecdf':
+            return self._ascending
+
+        if self._method == 'alias':
+            return self._weights is not None and len(self._weights) == len(self._data) and \
+                   self._probability is not None
+
+        return True
+
+    def getEvent(self, count = 1, stream = None):
+        """
+        Generates a random variate from the data. Returns None if the
+        EmpiricalDistribution is not valid
+
+        @param count: int - number of variates to generate (only the first is returned)
+        @param stream: RandomStream - if supplied, the uniforms come from the stream instead
+                       of the global np.random state
+        @return: double
+        """
+        if not self.isValid():
+            return None
+
+        if stream is None:
+            u = np.random.random_sample(count)
+        else:
+            u = stream.uniforms(count)
+
+        return self.ppf(u)[0]
+
+    def ppf(self, u):
+        """
+        Converts uniforms into variates, one uniform per variate, using the sampling method
+        @param u: ndarray - uniforms in [0, 1)
+        @return: ndarray
+        """
+        n = len(self._data)
+
+        if self._method == 'ecdf':
+            if n == 1:
+                return np.full(len(u), float(self._data[0]))
+
+            position = u * (n - 1)
+            index = np.clip(position.astype(np.int64), 0, n - 2)
+            fraction = position - index
+            low = self._data[index]
+
+            return low + fraction * (self._data[index + 1] - low)
+
+        position = u * n
+        index = np.clip(position.astype(np.int64), 0, n - 1)
+
+        if self._method == 'alias':
+            # the fractional part of the same uniform decides between a column and its alias
+            alias = (position - index) >= self._probability[index]
+            index = np.where(alias, self._alias[index], index)
+
+        return np.asarray(self._data[index], dtype=float)
+
+    def mean(self):
+        """
+        Returns the mean of the EmpiricalDistribution (computed once, on first use), or
+        None if it is not valid
+
+        @return: double
+        """
+        if not self.isValid():
+            return None
+
+        if self._mean is None:
+            if self._method == 'alias':
+                self._mean = float(np.average(self._data, weights=self._weights))
+            elif self._method == 'ecdf':
+                # mean of the piecewise linear inverse CDF
+                n = len(self._data)
+                self._mean = float(self._data[0]) if n == 1 else \
+                    float((np.sum(self._data) - (self._data[0] + self._data[-1]) / 2) / (n - 1))
+            else:
+                self._mean = float(np.mean(self._data))
+
+        return self._mean
+
+    def _load(self, data, dtype):
+        """
+        Private method memory-mapping data from a file, or accepting an array as is
+        @return: ndarray or None if the data cannot be loaded
+        """
+        try:
+            if isinstance(data, str):
+                if data.endswith('.npy'):
+                    data = np.load(data, mmap_mode='r')
+                else:
+                    data = np.memmap(data, dtype=dtype, mode='r')
+
+            if isinstance(data, np.ndarray) and data.ndim == 1:
+                return data
+
+        except (OSError, ValueError):
+            pass
+
+        return None
+
+    def _isAscending(self):
+        """
+        Private method checking that the data is in ascending order. The values are compared
+        a chunk at a time, so that a memory-mapped file is not read into memory at once, and
+        the check stops at the first chunk out of order.
+        @return: Bool
+        """
+        for start in range(0, len(self._data) - 1, self.CHUNK_SIZE):
+            chunk = self._data[start:start + self.CHUNK_SIZE + 1]
+
+            if not np.all(chunk[1:] >= chunk[:-1]):
+                return False
+
+        return True
+
+    def _buildAliasTable(self):
+        """
+        Private method building Walker's alias table, which allows the weighted values to be
+        drawn in constant time regardless of their number. The table is built with array
+        operations rather than the usual loop over a worklist: the deficits (1 - p) of the
+        light values, whose scaled probability p is below 1, and the excesses (p - 1) of
+        the heavy values are laid end to end, in index order, on two lines of equal length.
+        A light value is aliased to the heavy value whose excess covers the start of its
+        deficit. A heavy value whose excess is used up part way through a deficit makes up
+        the rest of that deficit from its own column, which is then aliased to the next
+        heavy value. This is the table the sequential sweep over lights and heavies builds.
+        @return: None
+        """
+        self._probability = None
+        self._alias = None
+
+        if self._weights is None or len(self._weights) != len(self._data):
+            return
+
+        weights = np.asarray(self._weights, dtype=float)
+        if np.any(weights < 0) or not math.isfinite(np.sum(weights)) or np.sum(weights) <= 0:
+            return
+
+        n = len(weights)
+        probability = weights * (n / np.sum(weights))
+        alias = np.arange(n)
+
+        lights = np.flatnonzero(probability < 1)
+        heavies = np.flatnonzero(probability >= 1)
+
+        if len(lights) > 0 and len(heavies) > 0:
+            # end of every light value's deficit, and of every heavy value's excess
+            deficitEnds = np.cumsum(1 - probability[lights])
+            deficitStarts = np.concatenate(([0.0], deficitEnds[:-1]))
+            excessEnds = np.cumsum(probability[heavies] - 1)
+
+            # the light values keep their own probability
+            donor = np.searchsorted(excessEnds, deficitStarts, side='right')
+            alias[lights] = heavies[np.minimum(donor, len(heavies) - 1)]
+
+            # the deficit left in each heavy value's column is the part of the deficit it
+            # stopped in that lies beyond the end of its excess
+            covering = np.minimum(np.searchsorted(deficitEnds, excessEnds, side='right'),
+                                  len(lights) - 1)
+            deficit = np.where(deficitStarts[covering] < excessEnds,
+                               deficitEnds[covering] - excessEnds, 0.0)
+
+            # the last heavy value is left with nothing but rounding error
+            deficit[-1] = 0.0
+            deficit = np.clip(deficit, 0.0, 1.0)
+
+            probability[heavies] = 1 - deficit
+            alias[heavies[:-1]] = np.where(deficit[:-1] > 0, heavies[1:], heavies[:-1])
+        else:
+            # every value is 1 up to rounding error
+            probability[:] = 1
+
+        self._probability = probability
+        self._alias = alias
@@ -0,0 +1,210 @@
+import json
+import os
+import struct
+
+import numpy as np
+
+from Sim.EventTracer import EventTracer
+
+
+class EventTraceReader:
+    """
+    Loads a trace written by an EventTracer as one NumPy array per column. A trace whose
+    tracer was not closed (e.g. after a crash) is read up to its last complete chunk,
+    without stage and server ids. Traces written by another version of EventTracer are
+    not read.
+    """
+
+    def __init__(self, path):
+        """
+        EventTraceReader class constructor. Reads the whole trace.
+        @param path: str - path of the trace file
+        """
+
+        self._path = path
+        self._stageIds = {}
+        self._serverIds = {}
+        self._sourceIds = []
+        self._columns = None
+
+        try:
+            with open(path, 'rb') as file:
+                self._read(file)
+
+        except (OSError, KeyError, ValueError, struct.error):
+            self._columns = None
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        msg = ""
+        msg += f'{type(self)} object at {id(self)}\n'
+        msg += f'\tIs an event trace reader of {self._path}: {self.numEvents} events\n'
+
+        return msg
+
+    def __len__(self):
+        return self.numEvents
+
+    @property
+    def numEvents(self):
+        if self._columns is None:
+            return 0
+
+        return len(self._columns['simtime'])
+
+    @property
+    def simtime(self):
+        return self.getColumn('simtime')
+
+    @property
+    def stage(self):
+        return self.getColumn('stage')
+
+    @property
+    def server(self):
+        return self.getColumn('server')
+
+    @property
+    def eventType(self):
+        return self.getColumn('eventType')
+
+    @property
+    def customer(self):
+        return self.getColumn('customer')
+
+    @property
+    def stageIds(self):
+        """
+        Ids of the traced stages
+
+        @return: dictionary of stage index -> id
+        """
+        return dict(self._stageIds)
+
+    def isValid(self):
+        """
+        Insures that the trace could be read
+
+        @return: Bool
+        """
+        return self._columns is not None
+
+    def getColumn(self, name):
+        """
+        Returns a column of the trace
+        @param name: str - one of EventTracer.COLUMNS
+        @return: ndarray, or None if the trace is not valid or has no such column
+        """
+        if self._columns is None:
+            return None
+
+        return self._columns.get(name)
+
+    def getStageId(self, stage):
+        """
+        Returns the id of a stage from its index in the trace
+        @param stage: int - stage index
+        @return: id, or None if unknown
+        """
+        return self._stageIds.get(int(stage))
+
+    def getServerId(self, stage, server):
+        """
+        Returns the id of a Server from its index, and its stage's index, in the trace
+        @param stage: int - stage index
+        @param server: int - Server index
+        @return: id, or None if unknown
+        """
+        ids = self._serverIds.get(int(stage), [])
+
+        if 0 <= server < len(ids):
+            return ids[int(server)]
+
+        return None
+
+    def getCustomerKey(self, customer):
+        """
+        Returns the key of a Customer (see Customer.key) from its value in the customer
+        column
+        @param customer: int
+        @return: tuple (source id, number), or None for -1 or an unknown source
+        """
+        if customer < 0:
+            return None
+
+        source, number = divmod(int(customer), EventTracer.CUSTOMER_STRIDE)
+
+        if source >= len(self._sourceIds):
+            return None
+
+        return (self._sourceIds[source], number)
+
+    def getEventName(self, eventType):
+        """
+        Returns the name of an event type code, e.g. 'ARRIVAL'
+        @param eventType: int
+        @return: str, or None if unknown
+        """
+        return EventTracer.EVENT_TYPES.get(int(eventType))
+
+    def _read(self, file):
+        """
+        Private method reading the header, the chunks and the footer of a trace. The
+        chunk headers are scanned first, so that every column is allocated once at its
+        full length and the chunks are read straight into it: reading a trace takes no
+        more memory than the trace itself.
+        @return: None
+        """
+        header = file.read(len(EventTracer.MAGIC) + 4)
+        if len(header) < len(EventTracer.MAGIC) + 4 or header[:len(EventTracer.MAGIC)] != EventTracer.MAGIC:
+            raise ValueError(f'{self._path} is not an event trace')
+
+        version = struct.unpack('<I', header[len(EventTracer.MAGIC):])[0]
+        if version != EventTracer.VERSION:
+            raise ValueError(f'{self._path} is a trace of unknown version {version}')
+
+        size = os.fstat(file.fileno()).st_size
+        rowSize = sum(np.dtype(dtype).itemsize for dtype in EventTracer.COLUMNS.values())
+
+        # offset and number of rows of every complete chunk
+        chunks = []
+
+        while True:
+            count = file.read(4)
+            if len(count) < 4:
+                # the tracer was not closed
+                break
+
+            n = struct.unpack('<I', count)[0]
+
+            if n == 0:
+                length = struct.unpack('<I', file.read(4))[0]
+                footer = json.loads(file.read(length).decode())
+
+                self._stageIds = {int(k): v for k, v in footer['stages'].items()}
+                self._serverIds = {int(k): v for k, v in footer['servers'].items()}
+                self._sourceIds = footer['sources']
+                break
+
+            if file.tell() + n * rowSize > size:
+                # the last chunk is incomplete
+                break
+
+            chunks.append((file.tell(), n))
+            file.seek(n * rowSize, os.SEEK_CUR)
+
+        total = sum(n for offset, n in chunks)
+        columns = {name: np.empty(total, dtype=dtype) for name, dtype in EventTracer.COLUMNS.items()}
+
+        start = 0
+        for offset, n in chunks:
+            file.seek(offset)
+
+            for name, column in columns.items():
+                file.readinto(memoryview(column[start:start + n]).cast('B'))
+
+            start += n
+
+        self._columns = columns
@@ -0,0 +1,197 @@
+import json
+import struct
+
+import numpy as np
+
+
+class EventTracer:
+    """
+    Records the events of a Simulation into a compact binary trace file for debugging
+    model behaviour. Each event is a row of (simtime, stage index, server index, event
+    type, customer key), kept in preallocated column arrays and written to disk a chunk
+    at a time, so tracing long runs costs a few array assignments per event. Tracing is
+    opt-in: stages only record events while a tracer is assigned to them (see
+    Simulation.setTracer). Traces are read back with EventTraceReader.
+
+    The file holds a header, then chunks of columns, each preceded by its number of rows,
+    and, once the tracer is closed, a JSON footer with the ids of the traced stages and
+    servers (rows refer to stages and servers by index) and of the source populations of
+    the traced Customers. A Customer created by a source population, whose key is
+    (source id, number), is recorded as source * CUSTOMER_STRIDE + number, where source
+    numbers the source populations in the order in which their Customers were first
+    traced.
+    """
+
+    MAGIC = b'SIMTRACE'
+    VERSION = 1
+
+    # event types: the values of QueueEvent (and of ServerEvent, which matches them),
+    # and ARRIVAL for Customers created by a source population
+    SERVICE_COMPLETION = 0
+    SERVER_DOWN = 1
+    SERVER_UP = 2
+    ABANDONMENT = 3
+    ARRIVAL = 4
+
+    EVENT_TYPES = {0: 'SERVICE_COMPLETION', 1: 'SERVER_DOWN', 2: 'SERVER_UP',
+                   3: 'ABANDONMENT', 4: 'ARRIVAL'}
+
+    # multiplier of a source population's number in the recorded customer keys
+    CUSTOMER_STRIDE = 2 ** 40
+
+    # column name -> dtype, in the order in which the columns of a chunk are written
+    COLUMNS = {'simtime': np.float64, 'stage': np.int32, 'server': np.int32,
+               'eventType': np.int8, 'customer': np.int64}
+
+    def __init__(self, path, chunkSize = 65536):
+        """
+        EventTracer class constructor. Creates (or overwrites) the trace file.
+        @param path: str - path of the trace file
+        @param chunkSize: int - number of events buffered before they are written
+        """
+
+        self._path = path
+        self._chunkSize = max(1, int(chunkSize))
+        self._stages = []
+        self._sources = {}
+        self._numEvents = 0
+        self._position = 0
+
+        self._columns = {name: np.empty(self._chunkSize, dtype=dtype)
+                         for name, dtype in self.COLUMNS.items()}
+
+        try:
+            self._file = open(path, 'wb')
+            self._file.write(self.MAGIC + struct.pack('<I', self.VERSION))
+
+        except OSError:
+            self._file = None
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        msg = ""
+        msg += f'{type(self)} object at {id(self)}\n'
+        msg += f'\tIs an event tracer writing {self._path}: {self._numEvents} events\n'
+
+        return msg
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def numEvents(self):
+        """
+        Number of events recorded so far, written or not
+
+        @return: int
+        """
+        return self._numEvents
+
+    def isValid(self):
+        """
+        Insures that the trace file is open for writing
+
+        @return: Bool
+        """
+        return self._file is not None
+
+    def addStage(self, stage):
+        """
+        Registers a traced stage, whose id (and whose Servers' ids) are written to the
+        footer of the trace when the tracer is closed
+        @param stage: SimulationStage
+        @return: None
+        """
+        if not any(s is stage for s in self._stages):
+            self._stages.append(stage)
+
+    def record(self, simtime, stage, server, eventType, customer):
+        """
+        Records one event
+        @param simtime: float - time of the event
+        @param stage: int - index of the stage processing the event
+        @param server: int - index of the Server in its SimQueue, or -1
+        @param eventType: int - one of the event types of EventTracer
+        @param customer: Customer or None - the Customer concerned by the event. Customers
+                         created by a source population are recorded by an integer made
+                         of their key, and None and Customers identified by name as -1.
+        @return: None
+        """
+        if self._file is None:
+            return
+
+        i = self._position
+
+        key = -1 if customer is None else customer.key
+
+        if type(key) is tuple:
+            source = self._sources.get(key[0])
+
+            if source is None:
+                source = self._sources[key[0]] = len(self._sources)
+
+            key = source * self.CUSTOMER_STRIDE + key[1]
+        else:
+            key = -1
+
+        self._columns['simtime'][i] = simtime
+        self._columns['stage'][i] = -1 if stage is None else stage
+        self._columns['server'][i] = -1 if server is None else server
+        self._columns['eventType'][i] = eventType
+        self._columns['customer'][i] = key
+
+        self._position += 1
+        self._numEvents += 1
+
+        if self._position == self._chunkSize:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the buffered events to the trace file as one chunk
+
+        @return: None
+        """
+        if self._file is None or self._position == 0:
+            return
+
+        self._file.write(struct.pack('<I', self._position))
+        for name in self.COLUMNS:
+            self._file.write(self._columns[name][:self._position].tobytes())
+
+        # the chunk reaches the disk even if the run never closes the tracer
+        self._file.flush()
+        self._position = 0
+
+    def close(self):
+        """
+        Writes the buffered events and the footer, and closes the trace file. Events
+        recorded afterwards are ignored.
+
+        @return: None
+        """
+        if self._file is None:
+            return
+
+        self.flush()
+
+        stages = {}
+        servers = {}
+        for stage in self._stages:
+            if stage.index is not None:
+                stages[stage.index] = stage.id
+
+                if hasattr(stage, 'servers'):
+                    ordered = sorted(stage.servers.values(), key=lambda server: server.index)
+                    servers[stage.index] = [server.id for server in ordered]
+
+        footer = json.dumps({'stages': stages, 'servers': servers,
+                             'sources': list(self._sources)}, default=str).encode()
+
+        self._file.write(struct.pack('<II', 0, len(footer)))
+        self._file.write(footer)
+        self._file.close()
+        self._file = None
@@ -1,5 +1,3 @@
-import pandas as pd
-
 import math
 
 class Experience:
@@ -22,6 +20,7 @@ class Experience:
         self._serviceCompletionTime = None
         self._waitingTime = None
         self._systemTime = None
+        self._abandonmentTime = None
 
 
 
@@ -79,6 +78,15 @@ class Experience:
 
 
 
+    @property
+    def abandonmentTime(self):
+        if self._abandonmentTime == None:
+            return math.nan
+        else:
+            return self._abandonmentTime
+
+
+
     @property
     def systemTime(self):
         if self._systemTime == None:
@@ -122,12 +130,28 @@ class Experience:
         self._systemTime = serviceCompletionTime - self.queueEntryTime
 
 
+    def logAbandonment(self, abandonmentTime):
+        """
+        Logs when a customer abandons a queue without entering service. The whole time
+        spent in the queue counts as both waiting and system time.
+
+        @return: There is no return, the function simply updates a few variables
+        """
+
+        self._abandonmentTime = abandonmentTime
+
+        self._waitingTime = abandonmentTime - self.queueEntryTime
+
+        self._systemTime = abandonmentTime - self.queueEntryTime
+
+
     def makeRow(self):
         """
         Creates a one-row pandas Dataframe that records all of the data for a Customer's experience in a single queue
 
         @return: pandas Dataframe
         """
+        import pandas as pd
 
         df = pd.DataFrame([[self.stageId, self.queueEntryTime, self.serverId,
                             self.serviceEntryTime, self.serviceCompletionTime,
@@ -0,0 +1,162 @@
+import math
+import time
+
+
+class Instrumentation:
+    """
+    Collects engine statistics while a Simulation runs: the number of events processed
+    by every stage and of every event type, the wall time each stage spends in
+    processEvent, and the overall event rate. Instrumentation is optional: a Simulation
+    only measures its events while an Instrumentation is assigned to it, and runs its
+    plain event loop otherwise, so that it costs nothing when disabled.
+    """
+
+    # event type recorded for stages that do not report one, i.e. source populations
+    ARRIVAL = 'ARRIVAL'
+
+    def __init__(self, clock = time.perf_counter):
+        """
+        Instrumentation class constructor
+        @param clock: function returning the current wall time in seconds
+        """
+
+        self._clock = clock
+        self.reset()
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        msg = ""
+        msg += f'{type(self)} object at {id(self)}\n'
+        msg += f'\tHas recorded {self._numEvents} events in {self._wallTime:.3f} seconds\n'
+
+        return msg
+
+    @property
+    def clock(self):
+        return self._clock
+
+    @property
+    def numEvents(self):
+        """
+        Number of events processed while instrumented
+
+        @return: int
+        """
+        return self._numEvents
+
+    @property
+    def wallTime(self):
+        """
+        Wall time, in seconds, spent in instrumented runs
+
+        @return: float
+        """
+        return self._wallTime
+
+    @property
+    def eventRate(self):
+        """
+        Events processed per second of wall time, or NaN if no time was recorded
+
+        @return: float
+        """
+        if self._wallTime <= 0:
+            return math.nan
+
+        return self._numEvents / self._wallTime
+
+    @property
+    def stageCounts(self):
+        """
+        Number of events processed by every stage
+
+        @return: dictionary of stage id -> int
+        """
+        return dict(self._stageCounts)
+
+    @property
+    def stageTimes(self):
+        """
+        Wall time, in seconds, every stage spent processing its events
+
+        @return: dictionary of stage id -> float
+        """
+        return dict(self._stageTimes)
+
+    @property
+    def eventTypeCounts(self):
+        """
+        Number of events of every type processed by every stage. Event types are the
+        QueueEvent of a SimQueue's event, and ARRIVAL for a source population.
+
+        @return: dictionary of (stage id, event type) -> int
+        """
+        return dict(self._eventTypeCounts)
+
+    def reset(self):
+        """
+        Discards everything recorded so far
+
+        @return: None
+        """
+        self._numEvents = 0
+        self._wallTime = 0
+        self._stageCounts = {}
+        self._stageTimes = {}
+        self._eventTypeCounts = {}
+        self._runStart = None
+
+    def startRun(self):
+        """
+        Called by Simulation when an instrumented run begins
+
+        @return: None
+        """
+        self._runStart = self._clock()
+
+    def stopRun(self):
+        """
+        Called by Simulation when an instrumented run ends
+
+        @return: None
+        """
+        if self._runStart is not None:
+            self._wallTime += self._clock() - self._runStart
+            self._runStart = None
+
+    def recordEvent(self, stageId, eventType, seconds):
+        """
+        Records one event processed by a stage
+        @param stageId: id of the stage
+        @param eventType: QueueEvent, ARRIVAL, or None for stages without event types
+        @param seconds: float - wall time the stage spent processing the event
+        @return: None
+        """
+        self._numEvents += 1
+        self._stageCounts[stageId] = self._stageCounts.get(stageId, 0) + 1
+        self._stageTimes[stageId] = self._stageTimes.get(stageId, 0) + seconds
+
+        key = (stageId, eventType)
+        self._eventTypeCounts[key] = self._eventTypeCounts.get(key, 0) + 1
+
+    def report(self):
+        """
+        Formats the recorded statistics as a table of stages and event types
+
+        @return: str
+        """
+        lines = [f'{self._numEvents} events in {self._wallTime:.3f} s '
+                 f'({self.eventRate:.1f} events/s)',
+                 f'{"stage":<16}{"event type":<24}{"events":>10}{"seconds":>12}']
+
+        for stageId, count in self._stageCounts.items():
+            lines.append(f'{str(stageId):<16}{"":<24}{count:>10}{self._stageTimes[stageId]:>12.4f}')
+
+            for (id, eventType), typeCount in self._eventTypeCounts.items():
+                if id == stageId:
+                    name = getattr(eventType, 'name', eventType)
+                    lines.append(f'{"":<16}{str(name):<24}{typeCount:>10}')
+
+        return '\n'.join(lines)
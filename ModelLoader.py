@@ -0,0 +1,539 @@
+import hashlib
+import inspect
+import json
+import os
+import pickle
+
+from Sim.Assigner import Assigner
+from Sim.Distribution import Distribution
+from Sim.EmpiricalDistribution import EmpiricalDistribution
+from Sim.NHPPSourcePopulation import NHPPSourcePopulation
+from Sim.Server import Server
+from Sim.ServerPool import ServerPool
+from Sim.SimQueue import SimQueue
+from Sim.Simulation import Simulation
+from Sim.SourcePopulation import SourcePopulation
+from Sim.SystemExit import SystemExit
+from Sim.TraceSourcePopulation import TraceSourcePopulation
+
+
+class ModelLoader:
+    """
+    Builds Simulations from a declarative model definition (a JSON or YAML file, or the
+    equivalent dictionary) instead of wiring stages imperatively. The definition is
+    validated and compiled once: distribution specifications are parsed into shared
+    Distribution objects and stage references are resolved to integer indexes, so that
+    each Simulation is built by plain list indexing. Compiled models can be cached on disk.
+
+    A model definition looks like:
+
+        {"seed": 100,
+         "distributions": {"service": "scipy.stats.expon(scale=144)"},
+         "stages": [
+            {"type": "SourcePopulation", "id": "SP0", "dist": "scipy.stats.expon(scale=180)",
+             "assignDestination": "assignInSequence", "destinations": ["Q0"]},
+            {"type": "SimQueue", "id": "Q0", "assignDestination": "assignInSequence",
+             "assignServer": "assignByAvailableTime", "destinations": ["SE0"],
+             "servers": [{"id": "Server", "count": 2,
+                          "downTimeDist": "scipy.stats.triang(c=0, loc=14400, scale=3600)",
+                          "oosDist": "scipy.stats.triang(c=1/3, loc=300, scale=900)",
+                          "svcTimeDist": "service"}]},
+            {"type": "SystemExit", "id": "SE0"}]}
+
+    Other than "type", "destinations", "assignServer" and "servers", the keys of a stage
+    are the arguments of its constructor. A server with a "count" is replicated with ids
+    suffixed 0 to count - 1; a server with "numServers" is a ServerPool. Distributions are
+    given by a specification string, the name of an entry in "distributions", or a
+    dictionary: {"spec": ..., "tabulate": true} for a tabulated Distribution or
+    {"data": path, "method": ...} for an EmpiricalDistribution.
+    """
+
+    # constructible stage types
+    STAGE_TYPES = {'SourcePopulation': SourcePopulation,
+                   'NHPPSourcePopulation': NHPPSourcePopulation,
+                   'TraceSourcePopulation': TraceSourcePopulation,
+                   'SimQueue': SimQueue,
+                   'SystemExit': SystemExit}
+
+    # Assigner methods usable as assignDestination and assignServer functions
+    ASSIGNERS = ['assignInSequence', 'assignToShortest', 'assignByAvailableTime']
+
+    # constructor arguments holding distributions
+    DISTRIBUTION_ARGUMENTS = ['dist', 'batchSizeDist', 'patienceDist', 'priority',
+                              'downTimeDist', 'oosDist', 'svcTimeDist']
+
+    # constructor arguments referring to other stages
+    STAGE_ARGUMENTS = ['overflowDestination', 'abandonDestination']
+
+    def __init__(self, model, cachePath = None):
+        """
+        ModelLoader class constructor
+        @param model: dictionary, or path of a .json, .yaml or .yml model definition
+        @param cachePath: str - path of a file caching the compiled model. If the cache
+                          was compiled from an identical definition, it is loaded instead
+                          of compiling the definition again; otherwise it is (re)written.
+                          The cache is a pickle, so it must come from a trusted source:
+                          loading a crafted file can execute arbitrary code.
+        """
+
+        self._errors = []
+        self._seed = None
+        self._stages = []
+        self._order = []
+        self._fromCache = False
+
+        definition = self._read(model)
+        digest = None
+
+        if definition is not None:
+            digest = hashlib.sha256(json.dumps(definition, sort_keys=True,
+                                               default=str).encode()).hexdigest()
+
+            if cachePath is not None and self._loadCache(cachePath, digest):
+                self._fromCache = True
+            else:
+                self._compile(definition)
+
+                if cachePath is not None and self.isValid():
+                    self._saveCache(cachePath, digest)
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        msg = ""
+        msg += f'{type(self)} object at {id(self)}\n'
+        msg += f'\tIs a model loader with {self.numStages} stages\n'
+
+        return msg
+
+    @property
+    def errors(self):
+        """
+        Problems found while reading and validating the model definition
+
+        @return: list of str
+        """
+        return self._errors
+
+    @property
+    def numStages(self):
+        return len(self._stages)
+
+    @property
+    def fromCache(self):
+        """
+        True if the compiled model was loaded from the cache
+
+        @return: bool
+        """
+        return self._fromCache
+
+    def isValid(self):
+        """
+        Insures that the model definition was read and compiled without errors
+
+        @return: Bool
+        """
+        return len(self._errors) == 0 and len(self._stages) > 0
+
+    def build(self, streams = None):
+        """
+        Builds a new Simulation from the compiled model. The signature matches the
+        buildSimulation function expected by ReplicationRunner, so loader.build can be
+        passed to it directly.
+
+        @param streams: RandomStreams - if supplied, assigned to the Simulation
+        @return: Simulation, or None if the model is not valid
+        """
+        if not self.isValid():
+            return None
+
+        sim = Simulation(self._seed)
+        if streams is not None:
+            sim.setRandomStreams(streams)
+
+        # stages are constructed in dependency order, so that stages referred to in a
+        # constructor exist first, and wired up once all of them exist
+        stages = [None] * len(self._stages)
+        for index in self._order:
+            stages[index] = self._buildStage(self._stages[index], stages)
+
+        for plan, stage in zip(self._stages, stages):
+            for index in plan['destinations']:
+                stage.addCustomerDestination(stages[index])
+
+            for server in plan['servers']:
+                stage.addServer(self._buildServer(server))
+
+        for stage in stages:
+            sim.addStage(stage)
+
+        return sim
+
+    def _buildStage(self, plan, stages):
+        """
+        Private method constructing a stage from its compiled plan
+        @return: SimulationStage
+        """
+        kwargs = dict(plan['kwargs'])
+
+        for key, index in plan['references'].items():
+            kwargs[key] = stages[index]
+
+        # every stage has its own Assigner, since assignInSequence keeps state
+        if 'assignDestination' in kwargs:
+            kwargs['assignDestination'] = getattr(Assigner(), kwargs['assignDestination'])
+
+        stage = self.STAGE_TYPES[plan['type']](plan['id'], **kwargs)
+
+        if plan['assignServer'] is not None:
+            stage.assignServer = getattr(Assigner(), plan['assignServer'])
+
+        return stage
+
+    def _buildServer(self, plan):
+        """
+        Private method constructing a Server or ServerPool from its compiled plan
+        @return: Server or ServerPool
+        """
+        if plan['type'] == 'ServerPool':
+            return ServerPool(plan['id'], plan['numServers'], 0, plan['svcTimeDist'])
+
+        return Server(plan['id'], 0, plan['downTimeDist'], plan['oosDist'], plan['svcTimeDist'])
+
+    def _read(self, model):
+        """
+        Private method reading the model definition from a dictionary or a file
+        @return: dictionary, or None if it cannot be read
+        """
+        if isinstance(model, dict):
+            return model
+
+        if not isinstance(model, str) or not os.path.exists(model):
+            self._errors.append(f'model definition {model} not found')
+            return None
+
+        try:
+            with open(model) as file:
+                if model.lower().endswith(('.yaml', '.yml')):
+                    import yaml
+
+                    definition = yaml.safe_load(file)
+                else:
+                    definition = json.load(file)
+
+        except ImportError:
+            self._errors.append('PyYAML is required to read YAML model definitions')
+            return None
+
+        except ValueError as error:
+            self._errors.append(f'model definition {model} cannot be parsed: {error}')
+            return None
+
+        if not isinstance(definition, dict):
+            self._errors.append(f'model definition {model} is not a mapping')
+            return None
+
+        return definition
+
+    def _compile(self, definition):
+        """
+        Private method validating the model definition and compiling it into a list of
+        stage plans with integer stage references
+        @return: None
+        """
+        self._seed = definition.get('seed')
+
+        self._distributions = {}
+        for name, spec in definition.get('distributions', {}).items():
+            self._distributions[name] = self._compileDistribution(spec, f'distribution {name}')
+
+        stages = definition.get('stages', [])
+        if not isinstance(stages, list) or len(stages) == 0:
+            self._errors.append('the model has no stages')
+            return
+
+        index = {}
+        for i, stage in enumerate(stages):
+            if not isinstance(stage, dict) or not isinstance(stage.get('id'), (str, int)):
+                self._errors.append(f'stage {i} has no id')
+            elif stage['id'] in index:
+                self._errors.append(f'stage id {stage["id"]} is not unique')
+            else:
+                index[stage['id']] = i
+
+        if len(self._errors) > 0:
+            return
+
+        self._stages = [self._compileStage(stage, index) for stage in stages]
+
+        if not any(plan['type'] == 'SystemExit' for plan in self._stages):
+            self._errors.append('the model has no SystemExit')
+
+        self._order = self._orderStages()
+
+        del self._distributions
+
+        if len(self._errors) == 0:
+            self._checkStages()
+
+    def _compileStage(self, stage, index):
+        """
+        Private method compiling one stage definition
+        @return: dictionary - the stage plan
+        """
+        stage = dict(stage)
+        id = stage.pop('id')
+        name = f'stage {id}'
+
+        stageType = stage.pop('type', None)
+        plan = {'type': stageType, 'id': id, 'kwargs': {}, 'references': {},
+                'destinations': [], 'servers': [], 'assignServer': None}
+
+        if stageType not in self.STAGE_TYPES:
+            self._errors.append(f'{name} has unknown type {stageType}')
+            return plan
+
+        destinations = stage.pop('destinations', [])
+        if not isinstance(destinations, list):
+            self._errors.append(f'{name} destinations must be a list')
+            destinations = []
+
+        for dest in destinations:
+            if self._isStageId(dest, index):
+                plan['destinations'].append(index[dest])
+            else:
+                self._errors.append(f'{name} refers to unknown destination {dest}')
+
+        if stageType != 'SystemExit' and len(plan['destinations']) == 0:
+            self._errors.append(f'{name} has no destinations')
+
+        if stageType == 'SimQueue':
+            plan['assignServer'] = self._compileAssigner(stage.pop('assignServer', None),
+                                                         f'{name} assignServer')
+
+            for server in stage.pop('servers', []):
+                plan['servers'].extend(self._compileServers(server, name))
+
+            if len(plan['servers']) == 0:
+                self._errors.append(f'{name} has no servers')
+
+        parameters = inspect.signature(self.STAGE_TYPES[stageType].__init__).parameters
+
+        for key, value in stage.items():
+            if key not in parameters or key in ['self', 'id']:
+                self._errors.append(f'{name} has unknown argument {key}')
+
+            elif key == 'assignDestination':
+                plan['kwargs'][key] = self._compileAssigner(value, f'{name} {key}')
+
+            elif key in self.STAGE_ARGUMENTS:
+                if self._isStageId(value, index):
+                    plan['references'][key] = index[value]
+                else:
+                    self._errors.append(f'{name} {key} refers to unknown stage {value}')
+
+            elif key in self.DISTRIBUTION_ARGUMENTS and not isinstance(value, (int, float)):
+                plan['kwargs'][key] = self._compileDistribution(value, f'{name} {key}')
+
+            else:
+                plan['kwargs'][key] = value
+
+        if 'assignDestination' in parameters and 'assignDestination' not in plan['kwargs']:
+            self._errors.append(f'{name} has no assignDestination')
+
+        return plan
+
+    def _isStageId(self, value, index):
+        """
+        Private method checking that a stage reference is the id of a stage of the model.
+        Ids are strings or integers, so other values (e.g. lists) refer to no stage.
+        @return: Bool
+        """
+        return isinstance(value, (str, int)) and value in index
+
+    def _checkStages(self):
+        """
+        Private method building the compiled model once and checking that every stage is
+        valid, which catches invalid argument values (e.g. a negative capacity) that only
+        the stages themselves validate
+        @return: None
+        """
+        try:
+            sim = self.build()
+
+            for stage in sim.stages:
+                if not stage.isValid():
+                    self._errors.append(f'stage {stage.id} is not valid')
+
+        except (TypeError, ValueError, AttributeError, OSError) as error:
+            self._errors.append(f'the model cannot be built: {error}')
+
+    def _compileServers(self, server, name):
+        """
+        Private method compiling one server definition into one or more server plans
+        @return: list of dictionary
+        """
+        if not isinstance(server, dict) or 'id' not in server:
+            self._errors.append(f'{name} has a server without an id')
+            return []
+
+        name = f'{name} server {server["id"]}'
+
+        if 'numServers' in server:
+            if not isinstance(server['numServers'], int) or server['numServers'] < 1:
+                self._errors.append(f'{name} has an invalid numServers')
+
+            return [{'type': 'ServerPool', 'id': server['id'], 'numServers': server['numServers'],
+                     'svcTimeDist': self._compileDistribution(server.get('svcTimeDist'),
+                                                              f'{name} svcTimeDist')}]
+
+        plan = {'type': 'Server'}
+        for key in ['downTimeDist', 'oosDist', 'svcTimeDist']:
+            plan[key] = self._compileDistribution(server.get(key), f'{name} {key}')
+
+        if 'count' not in server:
+            return [dict(plan, id=server['id'])]
+
+        if not isinstance(server['count'], int) or server['count'] < 1:
+            self._errors.append(f'{name} has an invalid count')
+            return []
+
+        return [dict(plan, id=f'{server["id"]}{i}') for i in range(server['count'])]
+
+    def _compileAssigner(self, assigner, name):
+        """
+        Private method validating the name of an Assigner method
+        @return: str
+        """
+        if assigner not in self.ASSIGNERS:
+            self._errors.append(f'{name} must be one of {self.ASSIGNERS}')
+
+        return assigner
+
+    def _compileDistribution(self, spec, name):
+        """
+        Private method compiling a distribution definition. A specification string is
+        evaluated once here, so that the Distribution holds the frozen scipy distribution
+        rather than evaluating the string on every draw.
+        @return: Distribution, or None if it is invalid
+        """
+        if isinstance(spec, str) and spec in getattr(self, '_distributions', {}):
+            return self._distributions[spec]
+
+        options = {}
+        if isinstance(spec, dict):
+            options = dict(spec)
+
+            if 'data' in options:
+                try:
+                    dist = EmpiricalDistribution(options.pop('data'), **options)
+
+                except (TypeError, ValueError):
+                    self._errors.append(f'{name} has invalid options {list(options)}')
+                    return None
+
+                if not dist.isValid():
+                    self._errors.append(f'{name} has invalid data')
+                    return None
+
+                return dist
+
+            spec = options.pop('spec', None)
+
+        # specifications are evaluated with scipy in scope, as Distribution does
+        import scipy.stats
+        from scipy import stats
+
+        try:
+            dist = Distribution(eval(spec), **options) if isinstance(spec, str) else None
+
+        except (NameError, SyntaxError, AttributeError, TypeError, ValueError):
+            dist = None
+
+        if dist is None or dist.RNG is None:
+            self._errors.append(f'{name} has invalid distribution {spec}')
+            return None
+
+        return dist
+
+    def _orderStages(self):
+        """
+        Private method ordering the stages so that stages referred to by another stage's
+        constructor come before it
+        @return: list of int
+        """
+        order = []
+        state = {}
+
+        def visit(i):
+            if state.get(i) == 'done':
+                return True
+
+            if state.get(i) == 'visiting':
+                return False
+
+            state[i] = 'visiting'
+            for j in self._stages[i]['references'].values():
+                if not visit(j):
+                    return False
+
+            state[i] = 'done'
+            order.append(i)
+            return True
+
+        for i in range(len(self._stages)):
+            if not visit(i):
+                self._errors.append(f'stage {self._stages[i]["id"]} has circular '
+                                    f'overflow or abandon destinations')
+                break
+
+        return order
+
+    def _loadCache(self, cachePath, digest):
+        """
+        Private method loading the compiled model from the cache, if it was compiled from
+        the same definition. A cache that cannot be read, or whose contents do not have
+        the structure written by _saveCache, is ignored.
+        @return: bool - True if the cache was loaded
+        """
+        try:
+            with open(cachePath, 'rb') as file:
+                cache = pickle.load(file)
+
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError,
+                IndexError, KeyError, TypeError, ValueError):
+            return False
+
+        if not isinstance(cache, dict) or cache.get('digest') != digest:
+            return False
+
+        stages = cache.get('stages')
+        order = cache.get('order')
+
+        if not isinstance(stages, list) or not isinstance(order, list) or \
+                not all(isinstance(plan, dict) and plan.get('type') in self.STAGE_TYPES and
+                        all(key in plan for key in ['id', 'kwargs', 'references', 'destinations',
+                                                    'servers', 'assignServer'])
+                        for plan in stages) or \
+                not all(isinstance(i, int) for i in order) or \
+                sorted(order) != list(range(len(stages))):
+            return False
+
+        self._seed = cache.get('seed')
+        self._stages = cache['stages']
+        self._order = cache['order']
+
+        return True
+
+    def _saveCache(self, cachePath, digest):
+        """
+        Private method writing the compiled model to the cache
+        @return: None
+        """
+        cache = {'digest': digest, 'seed': self._seed, 'stages': self._stages,
+                 'order': self._order}
+
+        with open(cachePath, 'wb') as file:
+            pickle.dump(cache, file)
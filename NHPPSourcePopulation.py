@@ -0,0 +1,275 @@
+import math
+
+import numpy as np
+
+from Sim.SourcePopulation import SourcePopulation
+
+
+class NHPPSourcePopulation(SourcePopulation):
+    """
+    Represents a source population whose arrivals follow a non-homogeneous Poisson process,
+    i.e. an arrival rate that varies over time (for example by hour of day). Arrivals are
+    generated in blocks: a piecewise-constant rate is handled by inverting its cumulative
+    rate function, a spline rate by thinning, both vectorized over the whole block.
+    """
+
+    KINDS = ['piecewise', 'spline']
+
+    def __init__(self, id, times, rates, assignDestination, kind = 'piecewise', period = None,
+                 blockSize = 1024, priority = 0):
+        """
+        NHPPSourcePopulation constructor
+        :param id: simulation stage id
+        :param times: ascending times, starting at 0, at which the rate is specified
+        :param rates: arrival rates (arrivals per unit time). For 'piecewise', rates[j]
+                      applies from times[j] until times[j + 1]; for 'spline', a cubic spline
+                      is fitted through (times, rates).
+        :param assignDestination: function that assigns customer to their next destination
+        :param kind: 'piecewise' or 'spline'
+        :param period: length of the rate cycle (e.g. 86400 for a daily cycle in seconds),
+                       which must exceed the last time. If None, the last rate ('piecewise')
+                       or the rate at the last time ('spline') applies indefinitely.
+        :param blockSize: number of arrivals generated at a time
+        :param priority: priority class of the customers created, or a distribution from
+                         which each customer's class is drawn
+        """
+        super().__init__(id, None, assignDestination, priority=priority)
+
+        self._times = np.asarray(times, dtype=float)
+        self._rates = np.asarray(rates, dtype=float)
+        self._kind = kind
+        self._period = period
+        self._blockSize = blockSize
+
+        # block of pre-generated arrival times and the position of the next one
+        self._arrivals = np.empty(0)
+        self._position = 0
+
+        self._valid = self._validate()
+
+        if self._valid:
+            if kind == 'piecewise':
+                self._buildCumulativeRate()
+            else:
+                self._buildSpline()
+
+            self._restart(0)
+            self._scheduleNextArrival()
+
+    def __str__(self):
+        msg = ""
+        msg += f'{type(self)} object at {id(self)}\n'
+        msg += f'\tIs a {self._kind} rate source population with rates: {self._rates}\n'
+
+        return msg
+
+    def isValid(self):
+        """
+        Insures that the source population instance is valid
+
+        @return: Bool
+        """
+        return self._valid and not self._destination == {} and not self._assignDestination is None
+
+    def getRate(self, t):
+        """
+        Returns the arrival rate at time t
+
+        @param t: double or ndarray - simulation time
+        @return: double or ndarray
+        """
+        if self._period is not None:
+            t = np.mod(t, self._period)
+
+        if self._kind == 'piecewise':
+            index = np.searchsorted(self._times, t, side='right') - 1
+            return self._rates[index]
+
+        return np.clip(self._spline(np.minimum(t, self._splineEnd)), 0, None)
+
+    def setRandomStreams(self, streams):
+        """
+        Assigns the source population its own arrival and priority streams. Pre-generated
+        arrivals after the last arrival are discarded and regenerated from the new stream.
+
+        @return: None
+        """
+        self._arrivalStream = streams.getStream('arrival', self.id)
+        self._priorityStream = streams.getStream('priority', self.id)
+
+        if self._valid:
+            self._restart(self._lastArrivalTime)
+            self._scheduleNextArrival()
+
+    def _scheduleNextArrival(self):
+        """
+        Private method setting the next arrival time to the next pre-generated arrival,
+        generating a new block when the current one is used up
+
+        @return: None
+        """
+        if self._position >= len(self._arrivals):
+            if self._kind == 'piecewise':
+                self._arrivals = self._invertBlock()
+            else:
+                self._arrivals = self._thinBlock()
+
+            self._position = 0
+
+        # arrivals postponed while the source population was blocked are not moved back
+        self._nextArrivalTime = max(self._arrivals[self._position], self._lastArrivalTime)
+        self._position += 1
+
+    def _uniforms(self, count):
+        """
+        Private method drawing uniforms from the arrival stream, or the global np.random
+        state if no stream has been assigned
+        @return: ndarray
+        """
+        if self._arrivalStream is None:
+            u = np.random.random_sample(count)
+            return np.clip(u, np.nextafter(0, 1), None)
+
+        return self._arrivalStream.uniforms(count)
+
+    def _restart(self, t):
+        """
+        Private method discarding pre-generated arrivals and restarting generation at time t
+        @return: None
+        """
+        self._arrivals = np.empty(0)
+        self._position = 0
+
+        if self._kind == 'piecewise':
+            self._unitTime = self._cumulativeRate(t)
+        else:
+            self._candidateTime = t
+
+    def _invertBlock(self):
+        """
+        Private method generating a block of arrivals by inversion: arrivals of a unit-rate
+        Poisson process are mapped through the inverse of the cumulative rate function
+        @return: ndarray
+        """
+        s = self._unitTime + np.cumsum(-np.log(self._uniforms(self._blockSize)))
+        self._unitTime = s[-1]
+
+        cycles = np.zeros(len(s))
+        if self._period is not None:
+            cycles = np.floor(s / self._cycleRate)
+            s = s - cycles * self._cycleRate
+
+        # segment j satisfies cumulative[j] <= s < cumulative[j + 1]; segments with a
+        # rate of zero are never selected
+        index = np.searchsorted(self._cumulative, s, side='right') - 1
+        index = np.clip(index, 0, len(self._rates) - 1)
+
+        t = self._times[index] + (s - self._cumulative[index]) / self._rates[index]
+
+        if self._period is not None:
+            t = t + cycles * self._period
+
+        return t
+
+    def _thinBlock(self):
+        """
+        Private method generating a block of arrivals by thinning: candidates of a Poisson
+        process with the maximum rate are accepted with probability rate(t) / maximum rate
+        @return: ndarray
+        """
+        accepted = []
+        count = 0
+
+        while count < self._blockSize:
+            candidates = self._candidateTime + \
+                         np.cumsum(-np.log(self._uniforms(self._blockSize)) / self._maxRate)
+            self._candidateTime = candidates[-1]
+
+            keep = self._uniforms(self._blockSize) * self._maxRate < self.getRate(candidates)
+            accepted.append(candidates[keep])
+            count += np.count_nonzero(keep)
+
+        return np.concatenate(accepted)
+
+    def _cumulativeRate(self, t):
+        """
+        Private method returning the expected number of arrivals by time t for a
+        piecewise-constant rate
+        @return: double
+        """
+        cycles = 0
+        if self._period is not None:
+            cycles = math.floor(t / self._period)
+            t = t - cycles * self._period
+
+        index = max(np.searchsorted(self._times, t, side='right') - 1, 0)
+
+        return cycles * self._cycleRate + self._cumulative[index] + \
+               (t - self._times[index]) * self._rates[index]
+
+    def _buildCumulativeRate(self):
+        """
+        Private method tabulating the cumulative rate at the start of every segment
+        @return: None
+        """
+        self._cumulative = np.concatenate([[0], np.cumsum(np.diff(self._times) * self._rates[:-1])])
+
+        # expected arrivals per cycle (unused without a period)
+        self._cycleRate = 0
+        if self._period is not None:
+            self._cycleRate = self._cumulative[-1] + (self._period - self._times[-1]) * self._rates[-1]
+
+    def _buildSpline(self):
+        """
+        Private method fitting the rate spline and bounding it from above for thinning. The
+        bound is the spline's maximum, which is reached at an end of the cycle or at a
+        root of its derivative.
+        @return: None
+        """
+        from scipy.interpolate import CubicSpline
+
+        times = self._times
+        rates = self._rates
+        self._splineEnd = times[-1]
+
+        if self._period is not None:
+            # close the cycle so that the spline is periodic
+            times = np.append(times, self._period)
+            rates = np.append(rates, rates[0])
+            self._spline = CubicSpline(times, rates, bc_type='periodic')
+            self._splineEnd = self._period
+        else:
+            self._spline = CubicSpline(times, rates)
+
+        extrema = self._spline.derivative().roots(extrapolate=False)
+        points = np.concatenate([[0, self._splineEnd], extrema[np.isfinite(extrema)]])
+        self._maxRate = float(np.max(self._spline(points)))
+
+    def _validate(self):
+        """
+        Private method checking the rate specification
+        @return: boolean
+        """
+        if self._kind not in self.KINDS:
+            return False
+
+        times = self._times
+        rates = self._rates
+
+        if times.ndim != 1 or len(times) == 0 or len(times) != len(rates) or times[0] != 0:
+            return False
+
+        if np.any(np.diff(times) <= 0) or np.any(rates < 0) or not np.all(np.isfinite(rates)):
+            return False
+
+        if self._period is not None and self._period <= times[-1]:
+            return False
+
+        if self._kind == 'spline' and len(times) < 2:
+            return False
+
+        # arrivals must continue to occur indefinitely
+        if self._period is None:
+            return rates[-1] > 0
+
+        return np.any(rates > 0)
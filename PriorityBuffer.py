@@ -0,0 +1,116 @@
+import heapq
+import itertools
+from collections import deque
+
+
+class PriorityBuffer:
+    """
+    Waiting line of a SimQueue that serves Customers in priority order, first come first
+    served within a priority class. It keeps one deque per priority class and a heap of
+    the classes that have Customers waiting, so that a Customer is added or removed in
+    O(log k) time for k classes. It offers the same operations as the deque it replaces.
+    """
+
+    def __init__(self):
+        """
+        PriorityBuffer class constructor. The buffer starts empty.
+        """
+
+        # deque of waiting Customers for every priority class seen so far
+        self._queues = {}
+
+        # heap of the priority classes whose deque is not empty
+        self._priorities = []
+
+        self._length = 0
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        msg = ""
+        msg += f'{type(self)} object at {id(self)}\n'
+        msg += f'\tIs a priority buffer with {self._length} customers in {len(self._priorities)} classes\n'
+
+        return msg
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        """
+        Iterates over the waiting Customers in the order in which they will be served
+        """
+        for priority in sorted(self._priorities):
+            yield from self._queues[priority]
+
+    def __getitem__(self, index):
+        """
+        Returns the waiting Customer at position index in the order of service
+        @param index: int
+        @return: Customer
+        """
+        if index == 0 and self._length > 0:
+            return self._queues[self._priorities[0]][0]
+
+        if index < 0:
+            index += self._length
+
+        if index < 0 or index >= self._length:
+            raise IndexError('PriorityBuffer index out of range')
+
+        return next(itertools.islice(iter(self), index, None))
+
+    def append(self, customer):
+        """
+        Adds a Customer at the back of its priority class
+        @param customer: Customer
+        @return: None
+        """
+        self._getQueue(customer.priority).append(customer)
+        self._length += 1
+
+    def appendleft(self, customer):
+        """
+        Adds a Customer at the front of its priority class, e.g. a Customer whose
+        service was interrupted
+        @param customer: Customer
+        @return: None
+        """
+        self._getQueue(customer.priority).appendleft(customer)
+        self._length += 1
+
+    def popleft(self):
+        """
+        Removes and returns the Customer at the front of the highest priority class
+        (the lowest priority value) with Customers waiting
+        @return: Customer
+        """
+        if self._length == 0:
+            raise IndexError('pop from an empty PriorityBuffer')
+
+        queue = self._queues[self._priorities[0]]
+        customer = queue.popleft()
+        self._length -= 1
+
+        if len(queue) == 0:
+            heapq.heappop(self._priorities)
+
+        return customer
+
+    def _getQueue(self, priority):
+        """
+        Private method returning the deque of a priority class, scheduling the class in
+        the heap if it has no Customers waiting
+        @return: deque
+        """
+        queue = self._queues.get(priority)
+
+        if queue is None:
+            queue = deque()
+            self._queues[priority] = queue
+
+        if len(queue) == 0:
+            heapq.heappush(self._priorities, priority)
+
+        return queue
@@ -0,0 +1,57 @@
+import numpy as np
+
+from Sim.RandomStream import RandomStream
+
+
+class QuasiRandomStream(RandomStream):
+    """
+    Represents a RandomStream whose first uniforms are the coordinates of one point of a
+    low-discrepancy (scrambled Sobol) or Latin hypercube point set. Each replication of an
+    experiment is given a different point of the same set, so the replications cover the
+    input space more evenly than independent random numbers. Once the point's coordinates
+    are used up, the stream continues with ordinary pseudo-random uniforms.
+    """
+
+    def __init__(self, point, seed = None, antithetic = False):
+        """
+        QuasiRandomStream class constructor
+        @param point: ndarray - coordinates (in (0, 1)) returned before any pseudo-random uniforms
+        @param seed: int or np.random.SeedSequence - seed of the pseudo-random continuation
+        @param antithetic: bool - if True, the stream returns 1 - U for every uniform U
+        """
+
+        super().__init__(seed, antithetic)
+
+        self._point = np.asarray(point, dtype=float)
+        self._position = 0
+
+    def __str__(self):
+        msg = super().__str__()
+        msg += f'\tHas used {self._position} of {len(self._point)} quasi-random coordinates\n'
+
+        return msg
+
+    @property
+    def dimension(self):
+        return len(self._point)
+
+    def uniforms(self, count = 1):
+        """
+        Generates uniform random numbers on the open interval (0, 1), taking the point's
+        remaining coordinates first
+
+        @param count: int - number of uniforms to generate
+        @return: ndarray
+        """
+        quasi = self._point[self._position:self._position + count]
+        self._position += len(quasi)
+
+        if self._antithetic:
+            quasi = 1 - quasi
+
+        quasi = np.clip(quasi, np.nextafter(0, 1), np.nextafter(1, 0))
+
+        if len(quasi) == count:
+            return quasi
+
+        return np.concatenate([quasi, super().uniforms(count - len(quasi))])
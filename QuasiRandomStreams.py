@@ -0,0 +1,80 @@
+import math
+
+import numpy as np
+
+from Sim.RandomStreams import RandomStreams
+from Sim.QuasiRandomStream import QuasiRandomStream
+
+
+class QuasiRandomStreams(RandomStreams):
+    """
+    Factory for the per-purpose QuasiRandomStreams of one replication of an experiment.
+    For every stream, a point set with one point per replication is generated by a
+    scrambled Sobol sequence or a Latin hypercube design, seeded only by the master seed and
+    the stream's identity; replication i draws its first uniforms from point i. The
+    replications thereby stratify the stream's first uniforms (e.g. the first arrivals and
+    service times), which speeds up convergence for the same number of replications.
+    """
+
+    METHODS = ['sobol', 'lhs']
+
+    def __init__(self, seed = None, replication = 0, numReplications = 1, method = 'sobol',
+                 dimension = 64, antithetic = False):
+        """
+        QuasiRandomStreams class constructor
+        @param seed: int - master seed, shared by all replications of the experiment
+        @param replication: int - index of this replication (0 <= replication < numReplications)
+        @param numReplications: int - total number of replications in the experiment
+        @param method: str - 'sobol' for scrambled Sobol points or 'lhs' for a Latin hypercube
+        @param dimension: int - number of quasi-random uniforms per stream, after which
+                                each stream continues pseudo-randomly
+        @param antithetic: bool - if True, every stream returns antithetic uniforms (1 - U)
+        """
+
+        super().__init__(seed, antithetic)
+
+        if method not in self.METHODS:
+            method = 'sobol'
+
+        self._replication = replication
+        self._numReplications = max(numReplications, replication + 1)
+        self._method = method
+        self._dimension = dimension
+
+    def __str__(self):
+        msg = super().__str__()
+        msg += f'\tUses {self._method} points for replication {self._replication} ' \
+               f'of {self._numReplications}\n'
+
+        return msg
+
+    @property
+    def method(self):
+        return self._method
+
+    @property
+    def replication(self):
+        return self._replication
+
+    def _makeStream(self, seedSequence):
+        """
+        Private method constructing a stream from the replication's point of the stream's
+        point set. The pseudo-random continuation is seeded separately for every replication.
+        @return: QuasiRandomStream
+        """
+        from scipy.stats import qmc
+
+        rng = np.random.default_rng(seedSequence)
+
+        if self._method == 'sobol':
+            # Sobol points are only balanced in blocks of powers of 2
+            engine = qmc.Sobol(self._dimension, scramble=True, seed=rng)
+            points = engine.random_base2(math.ceil(math.log2(self._numReplications)))
+        else:
+            engine = qmc.LatinHypercube(self._dimension, seed=rng)
+            points = engine.random(self._numReplications)
+
+        continuation = np.random.SeedSequence(seedSequence.entropy,
+                                              spawn_key=seedSequence.spawn_key + (self._replication,))
+
+        return QuasiRandomStream(points[self._replication], continuation, self._antithetic)
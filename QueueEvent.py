@@ -6,8 +6,10 @@ class QueueEvent(Enum):
         - SERVICE_COMPLETION
         - SERVER_DOWN
         - SERVER_UP
+        - ABANDONMENT
         """
 
         SERVICE_COMPLETION = 0
         SERVER_DOWN = 1
         SERVER_UP = 2
+        ABANDONMENT = 3
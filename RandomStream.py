@@ -0,0 +1,51 @@
+import numpy as np
+
+
+class RandomStream:
+    """
+    Represents an independent source of uniform random numbers dedicated to a single
+    purpose (e.g. the service times of one Server). Distributions convert its uniforms
+    into random variates by inverse transform, so one uniform is consumed per variate.
+    """
+
+    def __init__(self, seed = None, antithetic = False):
+        """
+        RandomStream class constructor
+        @param seed: int or np.random.SeedSequence - seed of the underlying generator
+        @param antithetic: bool - if True, the stream returns 1 - U for every uniform U the
+                                  equally seeded ordinary stream would return
+        """
+
+        self._generator = np.random.default_rng(seed)
+        self._antithetic = antithetic
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        msg = ""
+        msg += f'{type(self)} object at {id(self)}\n'
+        msg += f'\tIs a random stream using generator: {self._generator}\n'
+        msg += f'\tAntithetic: {self._antithetic}\n'
+
+        return msg
+
+    @property
+    def antithetic(self):
+        return self._antithetic
+
+    def uniforms(self, count = 1):
+        """
+        Generates uniform random numbers on the open interval (0, 1)
+
+        @param count: int - number of uniforms to generate
+        @return: ndarray
+        """
+        u = self._generator.random(count)
+
+        if self._antithetic:
+            u = 1 - u
+
+        # the generator can return exactly 0 (exactly 1 once made antithetic), which has
+        # no finite inverse for unbounded distributions
+        return np.clip(u, np.nextafter(0, 1), np.nextafter(1, 0))
@@ -0,0 +1,87 @@
+import zlib
+
+import numpy as np
+
+from Sim.RandomStream import RandomStream
+
+
+class RandomStreams:
+    """
+    Factory for the per-purpose RandomStreams used by a Simulation. Each stream is
+    identified by a purpose (e.g. 'arrival', 'service') and the id of the stage or Server
+    that uses it, and is seeded only by the master seed and that identity. Two Simulations
+    built with equal seeds therefore draw the same random numbers for the same purposes
+    (common random numbers), regardless of how their configurations differ.
+    """
+
+    def __init__(self, seed = None, antithetic = False):
+        """
+        RandomStreams class constructor
+        @param seed: int or list of int - master seed. If None, a seed is drawn from the
+                     operating system and can be read back from the seed property.
+        @param antithetic: bool - if True, every stream returns the antithetic uniforms
+                                  (1 - U) of the equally seeded ordinary streams
+        """
+
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+
+        self._seed = seed
+        self._antithetic = antithetic
+        self._streams = {}
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        msg = ""
+        msg += f'{type(self)} object at {id(self)}\n'
+        msg += f'\tHas seed {self._seed} and streams: {list(self._streams.keys())}\n'
+
+        return msg
+
+    @property
+    def seed(self):
+        return self._seed
+
+    @property
+    def antithetic(self):
+        return self._antithetic
+
+    @property
+    def numStreams(self):
+        return len(self._streams)
+
+    def getStream(self, purpose, id):
+        """
+        Returns the stream for the given purpose and stage/Server id, creating it on
+        first use
+
+        @param purpose: str - what the stream is used for, e.g. 'arrival', 'service',
+                              'downtime' or 'oos'
+        @param id: int or str - id of the stage or Server that owns the stream
+        @return: RandomStream
+        """
+        key = (purpose, id)
+
+        if key not in self._streams:
+            self._streams[key] = self._makeStream(self._seedSequence(purpose, id))
+
+        return self._streams[key]
+
+    def _seedSequence(self, purpose, id):
+        """
+        Private method deriving the seed of a stream from the master seed and the
+        stream's identity
+        @return: np.random.SeedSequence
+        """
+        name = f'{purpose}:{id}'.encode()
+
+        return np.random.SeedSequence(self._seed, spawn_key=(zlib.crc32(name),))
+
+    def _makeStream(self, seedSequence):
+        """
+        Private method constructing a stream from its seed
+        @return: RandomStream
+        """
+        return RandomStream(seedSequence, self._antithetic)
@@ -0,0 +1,267 @@
+import math
+
+import numpy as np
+
+from Sim.RandomStreams import RandomStreams
+from Sim.QuasiRandomStreams import QuasiRandomStreams
+from Sim.SimulationAnalysis import SimulationAnalysis
+
+
+class ReplicationRunner:
+    """
+    Runs independent replications of a simulation model and combines their
+    SimulationAnalysis results into point estimates and confidence intervals
+    """
+
+    # analysis measures to which control-variate adjustment is applied
+    CONTROLLED_MEASURES = ['AvgWaitTime', 'AvgSystemTime']
+
+    def __init__(self, buildSimulation, seed = None):
+        """
+        ReplicationRunner class constructor
+        @param buildSimulation: function accepting a RandomStreams instance and returning a
+                                newly built Simulation that uses those streams
+        @param seed: int - master seed from which every replication's streams are derived
+        """
+
+        if callable(buildSimulation):
+            self._buildSimulation = buildSimulation
+        else:
+            self._buildSimulation = None
+
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+
+        self._seed = seed
+        self._results = []
+        self._controls = []
+        self._controlVariates = False
+        self._numRequested = 0
+        self._sampling = 'random'
+        self._dimension = 64
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        msg = ""
+        msg += f'{type(self)} object at {id(self)}\n'
+        msg += f'\tIs a replication runner with {self.numReplications} replications\n'
+
+        return msg
+
+    @property
+    def seed(self):
+        return self._seed
+
+    @property
+    def numReplications(self):
+        return len(self._results)
+
+    def isValid(self):
+        """
+        Insures that the runner has a function with which to build its Simulations
+
+        @return: Bool
+        """
+        return self._buildSimulation is not None
+
+    def getReplicationResults(self):
+        """
+        Returns the analysis results of the individual replications. For antithetic runs,
+        each entry is the average of an antithetic pair.
+
+        @return: list of dictionaries
+        """
+        return self._results
+
+    def run(self, numReplications, maxTime = math.inf, maxEvents = 1000, warmUpTime = 0,
+            antithetic = False, controlVariates = True, sampling = 'random', dimension = 64):
+        """
+        Runs the replications and returns the average of their analysis results. In
+        antithetic mode, every replication is run twice, once with ordinary and once with
+        antithetic streams, and the average of the pair is used as a single observation;
+        the negative correlation within each pair reduces the variance of the estimates.
+
+        With control variates, the AvgWaitTime and AvgSystemTime estimates are adjusted by
+        regressing them on the deviations of the observed mean service and inter-arrival
+        times from their known expected values (see SimulationAnalysis.getControlVariates).
+
+        With 'sobol' or 'lhs' sampling, each replication draws the first uniforms of every
+        stream from its own point of a scrambled Sobol or Latin hypercube point set shared
+        by all replications (see QuasiRandomStreams).
+
+        @param numReplications: int - number of independent observations (antithetic pairs
+                                      in antithetic mode)
+        @param maxTime: double - simulated time at which each replication ends
+        @param maxEvents: int - number of events after which each replication ends
+        @param warmUpTime: double - Customers arriving before this time are excluded
+        @param antithetic: bool - run antithetic pairs
+        @param controlVariates: bool - apply control-variate adjustment
+        @param sampling: str - 'random', 'sobol' or 'lhs'
+        @param dimension: int - quasi-random uniforms per stream for 'sobol' and 'lhs' sampling
+        @return: dictionary of analysis measure -> mean over replications
+        """
+        self._results = []
+        self._controls = []
+        self._controlVariates = controlVariates
+        self._numRequested = numReplications
+        self._sampling = sampling
+        self._dimension = dimension
+
+        if not self.isValid():
+            return {}
+
+        for rep in range(numReplications):
+            results, controls = self._runReplication(rep, maxTime, maxEvents, warmUpTime, False)
+
+            if antithetic:
+                mirrored, mirroredControls = self._runReplication(rep, maxTime, maxEvents,
+                                                                  warmUpTime, True)
+                results = {key: (results[key] + mirrored[key]) / 2 for key in results}
+                controls = {key: (controls[key] + mirroredControls[key]) / 2
+                            for key in controls if key in mirroredControls}
+
+            self._results.append(results)
+            self._controls.append(controls)
+
+        return self.getEstimates()
+
+    def getEstimates(self):
+        """
+        Returns the mean of every analysis measure over the completed replications
+
+        @return: dictionary
+        """
+        if len(self._results) == 0:
+            return {}
+
+        return {key: np.mean(values) for key, values in self._getObservations().items()}
+
+    def getConfidenceIntervals(self, alpha = 0.05):
+        """
+        Returns a two-sided (1 - alpha) Student-t confidence interval for the mean of every
+        analysis measure over the completed replications. For a control-variate adjusted
+        measure, the standard error is that of the intercept of the least squares
+        regression of the measure on the controls, from its residual variance, with one
+        degree of freedom less per control; the interval is exact for normally
+        distributed measures and controls.
+
+        @param alpha: double - significance level
+        @return: dictionary of analysis measure -> (lower, upper)
+        """
+        n = len(self._results)
+        if n < 2:
+            return {}
+
+        import scipy.stats
+
+        controls = self._getControlMatrix()
+        numControls = controls.shape[1]
+
+        intervals = {}
+        for key, values in self._getObservations().items():
+            raw = np.array([r[key] for r in self._results], dtype=float)
+
+            if key in self.CONTROLLED_MEASURES and numControls > 0 and np.all(np.isfinite(raw)):
+                # each estimated control coefficient costs one degree of freedom
+                dof = n - 1 - numControls
+                standardError = self._getControlledStandardError(raw, controls)
+            else:
+                dof = n - 1
+                standardError = np.std(values, ddof=1) / math.sqrt(n)
+
+            t = scipy.stats.t.ppf(1 - alpha / 2, dof)
+            halfWidth = t * standardError
+            intervals[key] = (np.mean(values) - halfWidth, np.mean(values) + halfWidth)
+
+        return intervals
+
+    def _getObservations(self):
+        """
+        Private method collecting each analysis measure across the replications
+        @return: dictionary of analysis measure -> ndarray
+        """
+        observations = {key: np.array([r[key] for r in self._results], dtype=float)
+                        for key in self._results[0]}
+
+        controls = self._getControlMatrix()
+        if controls.shape[1] > 0:
+            for key in self.CONTROLLED_MEASURES:
+                observations[key] = self._adjust(observations[key], controls)
+
+        return observations
+
+    def _getControlMatrix(self):
+        """
+        Private method assembling the control variates that are usable for adjustment:
+        those observed in every replication, with non-zero variance, and few enough to
+        leave at least one degree of freedom for the confidence intervals
+        @return: ndarray of shape (replications, controls)
+        """
+        n = len(self._controls)
+        usable = np.empty((n, 0))
+
+        if not self._controlVariates or n == 0:
+            return usable
+
+        for key in sorted(set.intersection(*[set(c.keys()) for c in self._controls])):
+            column = np.array([c[key] for c in self._controls], dtype=float)
+
+            if np.all(np.isfinite(column)) and np.var(column) > 0 and usable.shape[1] + 2 < n:
+                usable = np.column_stack([usable, column])
+
+        return usable
+
+    def _adjust(self, values, controls):
+        """
+        Private method applying the control-variate adjustment Y - beta * C, where beta is
+        the least squares coefficient of Y on the (zero expectation) controls C
+        @return: ndarray
+        """
+        if not np.all(np.isfinite(values)):
+            return values
+
+        centered = controls - controls.mean(axis=0)
+        beta = np.linalg.lstsq(centered, values - values.mean(), rcond=None)[0]
+
+        return values - controls @ beta
+
+    def _getControlledStandardError(self, values, controls):
+        """
+        Private method computing the standard error of the control-variate adjusted mean,
+        which is the intercept of the least squares regression of Y on the controls C (the
+        fitted value at C = 0, their expectation): s * sqrt([(X'X)^-1]_00), where X is C
+        with a column of ones and s^2 the residual variance with n - 1 - q degrees of
+        freedom for q controls
+        @return: double
+        """
+        n, q = controls.shape
+        X = np.column_stack([np.ones(n), controls])
+
+        coefficients = np.linalg.lstsq(X, values, rcond=None)[0]
+        residuals = values - X @ coefficients
+        variance = residuals @ residuals / (n - 1 - q)
+
+        return math.sqrt(variance * np.linalg.pinv(X.T @ X)[0, 0])
+
+    def _runReplication(self, rep, maxTime, maxEvents, warmUpTime, antithetic):
+        """
+        Private method that builds, runs and analyzes a single replication
+        @return: tuple of dictionaries - analysis results and control variates
+        """
+        if self._sampling in QuasiRandomStreams.METHODS:
+            streams = QuasiRandomStreams(self._seed, rep, self._numRequested, self._sampling,
+                                         self._dimension, antithetic)
+        else:
+            streams = RandomStreams([self._seed, rep], antithetic)
+
+        sim = self._buildSimulation(streams)
+        if sim.randomStreams is not streams:
+            sim.setRandomStreams(streams)
+
+        sim.run(maxTime=maxTime, maxEvents=maxEvents)
+
+        analysis = SimulationAnalysis(sim, warmUpTime)
+
+        return analysis.analyzeSystemPerformance(), analysis.getControlVariates()
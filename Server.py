@@ -1,5 +1,3 @@
-import scipy
-from scipy import stats
 from Sim.Customer import Customer
 from Sim.Distribution import Distribution
 import math
@@ -35,6 +33,7 @@ class Server:
 
 
         self._id = id
+        self._index = None
         self.downTimeDistribution = downTimeDist
         self.oosDistribution = oosDist
         self.serviceTimeDistribution = svcTimeDist
@@ -45,6 +44,17 @@ class Server:
         self._nextEventTime = math.inf
         self._nextEventType = ServerEvent.SERVER_DOWN
         self._availableSince = math.inf
+        self._upSince = simtime
+
+        # sum and count of the service times drawn, used as a control variate in output analysis
+        self._serviceTimeTotal = 0
+        self._numServiceTimes = 0
+
+        # until setRandomStreams assigns the Server its streams, variates come from
+        # the global np.random state
+        self._downTimeStream = None
+        self._oosStream = None
+        self._serviceTimeStream = None
 
         if self.status != ServerState.INVALID:
             self._setAvailable(simtime)
@@ -107,6 +117,18 @@ class Server:
         """
         return self._id
 
+    @property
+    def index(self):
+        """
+        Position of the Server in its SimQueue, used internally instead of the id
+        @return: int, or None if the Server has not been added to a SimQueue
+        """
+        return self._index
+
+    @index.setter
+    def index(self, index):
+        self._index = index
+
     @property
     def isAvailable(self):
         """
@@ -129,6 +151,38 @@ class Server:
         else:
             return False
 
+    @property
+    def numServiceTimes(self):
+        """
+        Number of service times generated by the Server so far
+        @return: int
+        """
+        return self._numServiceTimes
+
+    @property
+    def observedMeanServiceTime(self):
+        """
+        Sample mean of the service times generated by the Server so far, or NaN if
+        none have been generated
+        @return: float
+        """
+        if self._numServiceTimes == 0:
+            return math.nan
+
+        return self._serviceTimeTotal / self._numServiceTimes
+
+    @property
+    def expectedServiceTime(self):
+        """
+        Theoretical mean of the Server's service time distribution, or NaN if the Server
+        has no valid service time distribution
+        @return: float
+        """
+        if self._serviceTimeDistribution is None:
+            return math.nan
+
+        return self._serviceTimeDistribution.mean()
+
     @property
     def nextEventTime(self):
         """
@@ -286,7 +340,8 @@ class Server:
         # if Server is OOS and returning to service, or is a newly
         # constructed Server, must calculate the next downtime
         if self.status == ServerState.OOS or math.isinf(self._nextDownTime):
-            self._nextDownTime = simtime + self._downTimeDistribution.getEvent()
+            self._nextDownTime = simtime + self._downTimeDistribution.getEvent(stream=self._downTimeStream)
+            self._upSince = simtime
 
         # need to set the nextEventTime and nextEventType
         self._nextEventType = ServerEvent.SERVER_DOWN
@@ -311,9 +366,19 @@ class Server:
         # move customer into service and calculate service completion time
         self._custInSvc = cust
         self._nextEventType = ServerEvent.SERVICE_COMPLETION
-        self._nextEventTime = simtime + self._serviceTimeDistribution.getEvent()
         self._availableSince = math.inf
 
+        if cust.remainingServiceTime is not None:
+            # resume an interrupted service, which the customer entered earlier
+            self._nextEventTime = simtime + cust.remainingServiceTime
+            cust.remainingServiceTime = None
+            return
+
+        serviceTime = self._serviceTimeDistribution.getEvent(stream=self._serviceTimeStream)
+        self._nextEventTime = simtime + serviceTime
+        self._serviceTimeTotal += serviceTime
+        self._numServiceTimes += 1
+
         # ensure customer logs service entry
         cust.logServiceEntry(simtime, self.id)
 
@@ -325,7 +390,7 @@ class Server:
         """
         # first, calculate the time at which the Server will return
         # to service
-        self._nextEventTime = simtime + self._oosDistribution.getEvent()
+        self._nextEventTime = simtime + self._oosDistribution.getEvent(stream=self._oosStream)
 
         # set next event to return Server to Available
         self._nextEventType = ServerEvent.SERVER_UP
@@ -388,6 +453,30 @@ class Server:
         else:
             return False
 
+    def preemptCustomer(self, simtime):
+        """
+        Interrupts the service of the Customer in service, which keeps the service time it
+        is still owed so that its service can later be resumed (preemptive resume). The
+        Server then transitions as if the service had been completed.
+        @param simtime: float - current simulation time
+        @return: Customer - the interrupted Customer, or None if the Server is not busy
+        """
+        if self.status != ServerState.BUSY or simtime > self._nextEventTime:
+            return None
+
+        cust = self._custInSvc
+        cust.remainingServiceTime = self._nextEventTime - simtime
+        self._custInSvc = None
+
+        if self._nextDownTime <= simtime:
+            # the Server should have gone out of service before now
+            self._nextEventTime = simtime
+            self._setPendingOOS(simtime)
+        else:
+            self._setAvailable(simtime)
+
+        return cust
+
     def processEvent(self, simtime):
         """
         Called by a Queue to request the Server process its next event.
@@ -414,6 +503,27 @@ class Server:
 
         return None
 
+    def setRandomStreams(self, streams):
+        """
+        Assigns the Server its own downtime, OOS and service time streams so that its
+        variates are synchronized with those of identically named Servers in other
+        Simulations built with the same RandomStreams seed. If the Server is in service,
+        its pending down time is redrawn from the new downtime stream.
+        @param streams: RandomStreams - factory providing the Server's streams
+        @return: None
+        """
+        self._downTimeStream = streams.getStream('downtime', self.id)
+        self._oosStream = streams.getStream('oos', self.id)
+        self._serviceTimeStream = streams.getStream('service', self.id)
+
+        status = self.status
+        if status in {ServerState.AVAILABLE, ServerState.BUSY}:
+            self._nextDownTime = self._upSince + \
+                                 self._downTimeDistribution.getEvent(stream=self._downTimeStream)
+
+            if status == ServerState.AVAILABLE:
+                self._nextEventTime = self._nextDownTime
+
     def resumeService(self, resumeTime):
         """
         Manually set's the next event time (i.e. resume time) when the server
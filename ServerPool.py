@@ -0,0 +1,275 @@
+import heapq
+import math
+
+from Sim.Customer import Customer
+from Sim.Distribution import Distribution
+from Sim.ServerEvent import ServerEvent
+from Sim.ServerState import ServerState
+
+
+class ServerPool:
+    """
+    ServerPool class represents a group of identical servers (e.g. the agents of a call
+    center) that a SimQueue treats as a single resource. Rather than one Server object per
+    server, the pool keeps a count of its free servers, one heap of service completion
+    times and one service time stream shared by all of its servers, so that each event
+    costs O(log c) for c servers. Servers in a pool do not go out of service.
+    """
+
+    def __init__(self, id, numServers, simtime, svcTimeDist):
+        """
+        ServerPool constructor.
+        @param id: string or int - Unique identifier
+        @param numServers: int - number of identical servers in the pool
+        @param simtime: time at which the servers begin work (i.e. are created)
+        @param svcTimeDist: Distribution used to generate service times
+        """
+
+        self._id = id
+        self._index = None
+        self._numServers = numServers
+
+        if isinstance(svcTimeDist, Distribution) and not svcTimeDist.RNG is None:
+            self._serviceTimeDistribution = svcTimeDist
+        else:
+            self._serviceTimeDistribution = None
+
+        # heap of (service completion time, sequence number, Customer) for every
+        # Customer in service
+        self._completions = []
+        self._numCompletions = 0
+
+        self._nextEventTime = math.inf
+        self._nextEventType = ServerEvent.SERVICE_COMPLETION
+        self._availableSince = simtime
+
+        # sum and count of the service times drawn, used as a control variate in output analysis
+        self._serviceTimeTotal = 0
+        self._numServiceTimes = 0
+
+        # until setRandomStreams assigns the pool its stream, service times come from
+        # the global np.random state
+        self._serviceTimeStream = None
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        msg = f'{type(self)} object at address {id(self)}\n'
+        msg += f'\tId: {self.id}\n'
+        msg += f'\tStatus: {self.status}\n'
+        msg += f'\tBusy servers: {self.numBusy} of {self.numServers}\n'
+        msg += f'\tnextEventTime {self._nextEventTime}\n'
+
+        return msg
+
+    @property
+    def availableSince(self):
+        """
+        The most recent time at which the pool went from having no free servers to having
+        a free server, or math.inf if all of its servers are busy.
+        @return: float
+        """
+        return self._availableSince
+
+    @property
+    def id(self):
+        """
+        Pool's identifier. Should be globally unique, but not enforced.
+        @return: id : string or int
+        """
+        return self._id
+
+    @property
+    def index(self):
+        """
+        Position of the pool in its SimQueue, used internally instead of the id
+        @return: int, or None if the pool has not been added to a SimQueue
+        """
+        return self._index
+
+    @index.setter
+    def index(self, index):
+        self._index = index
+
+    @property
+    def isAvailable(self):
+        """
+        Boolean property indicating whether or not a server of the pool is available to
+        serve a Customer.
+        @return: boolean
+        """
+        return self.status == ServerState.AVAILABLE
+
+    @property
+    def isBusy(self):
+        """
+        Boolean property indicating whether or not all servers of the pool are serving
+        Customers.
+        @return: boolean
+        """
+        return self.status == ServerState.BUSY
+
+    @property
+    def numServers(self):
+        """
+        Number of servers in the pool
+        @return: int
+        """
+        return self._numServers
+
+    @property
+    def numBusy(self):
+        """
+        Number of servers of the pool currently serving a Customer
+        @return: int
+        """
+        return len(self._completions)
+
+    @property
+    def numFree(self):
+        """
+        Number of servers of the pool available to serve a Customer
+        @return: int
+        """
+        if self.status == ServerState.INVALID:
+            return 0
+
+        return self._numServers - len(self._completions)
+
+    @property
+    def numServiceTimes(self):
+        """
+        Number of service times generated by the pool so far
+        @return: int
+        """
+        return self._numServiceTimes
+
+    @property
+    def observedMeanServiceTime(self):
+        """
+        Sample mean of the service times generated by the pool so far, or NaN if
+        none have been generated
+        @return: float
+        """
+        if self._numServiceTimes == 0:
+            return math.nan
+
+        return self._serviceTimeTotal / self._numServiceTimes
+
+    @property
+    def expectedServiceTime(self):
+        """
+        Theoretical mean of the pool's service time distribution, or NaN if the pool
+        has no valid service time distribution
+        @return: float
+        """
+        if self._serviceTimeDistribution is None:
+            return math.nan
+
+        return self._serviceTimeDistribution.mean()
+
+    @property
+    def nextEventTime(self):
+        """
+        Time of the pool's next service completion
+        @return: float
+        """
+        return self._nextEventTime
+
+    @property
+    def nextEventType(self):
+        """
+        The event type of the pool's next event, which is always a SERVICE_COMPLETION
+        @return: ServerEvent
+        """
+        return self._nextEventType
+
+    @property
+    def status(self):
+        """
+        Indicates the current state of the pool: AVAILABLE if at least one of its servers
+        is free, BUSY if all are serving Customers, and INVALID if the pool has no servers
+        or no valid service time distribution.
+        @return: ServerState
+        """
+        if self._serviceTimeDistribution is None or self.id is None or \
+                not isinstance(self._numServers, int) or self._numServers < 1:
+
+            return ServerState.INVALID
+
+        if len(self._completions) < self._numServers:
+            return ServerState.AVAILABLE
+
+        return ServerState.BUSY
+
+    def acceptCustomer(self, simtime, cust):
+        """
+        Requests that a Customer be accepted for service by a free server of the pool.
+        @param simtime: float - time at which service is requested
+        @param cust: Customer - customer for which the service is performed.
+        @return: boolean
+        """
+        if self.status != ServerState.AVAILABLE or not isinstance(cust, Customer):
+            return False
+
+        if cust.remainingServiceTime is not None:
+            # resume an interrupted service, which the customer entered earlier
+            serviceTime = cust.remainingServiceTime
+            cust.remainingServiceTime = None
+        else:
+            serviceTime = self._serviceTimeDistribution.getEvent(stream=self._serviceTimeStream)
+            self._serviceTimeTotal += serviceTime
+            self._numServiceTimes += 1
+
+            cust.logServiceEntry(simtime, self.id)
+
+        heapq.heappush(self._completions, (simtime + serviceTime, self._numCompletions, cust))
+        self._numCompletions += 1
+
+        self._nextEventTime = self._completions[0][0]
+
+        if self.status == ServerState.BUSY:
+            self._availableSince = math.inf
+
+        return True
+
+    def getNextEventTime(self):
+        """
+        Returns the time of the pool's next service completion.
+        @return: float - nextEventTime
+        """
+        return self._nextEventTime
+
+    def processEvent(self, simtime):
+        """
+        Called by a Queue to request the pool complete its earliest service.
+        @param simtime: float - Current simulation time
+        @return: Customer or None
+        """
+        if self._nextEventTime > simtime:
+            # it isn't yet time for the event, function was called prematurely
+            return None
+
+        wasBusy = self.status == ServerState.BUSY
+
+        completionTime, number, cust = heapq.heappop(self._completions)
+        cust.logServiceCompletion(simtime)
+
+        if len(self._completions) > 0:
+            self._nextEventTime = self._completions[0][0]
+        else:
+            self._nextEventTime = math.inf
+
+        if wasBusy:
+            self._availableSince = simtime
+
+        return cust
+
+    def setRandomStreams(self, streams):
+        """
+        Assigns the pool one service time stream, shared by all of its servers.
+        @param streams: RandomStreams - factory providing the pool's stream
+        @return: None
+        """
+        self._serviceTimeStream = streams.getStream('service', self.id)
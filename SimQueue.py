@@ -1,8 +1,12 @@
+import heapq
 import math
 
 from Sim.CustomerDestination import CustomerDestination
 from Sim.Customer import Customer
+from Sim.Distribution import Distribution
 from Sim.Server import Server
+from Sim.ServerPool import ServerPool
+from Sim.PriorityBuffer import PriorityBuffer
 from Sim.QueueEvent import QueueEvent
 from Sim.ServerState import ServerState
 from Sim.ServerEvent import ServerEvent
@@ -14,13 +18,42 @@ class SimQueue(CustomerDestination):
     Queue class representing a generic queue that a customer waits in until they enter service
     """
 
-    def __init__(self, id, assignDestination):
+    # what happens to a Customer arriving when the waiting line is full
+    OVERFLOW_POLICIES = ['reject', 'block', 'reroute']
+
+    # order in which waiting Customers enter service
+    DISCIPLINES = ['fifo', 'priority', 'preemptive']
+
+    def __init__(self, id, assignDestination, capacity = math.inf, overflowPolicy = 'reject',
+                 overflowDestination = None, discipline = 'fifo', patienceDist = None,
+                 balkThreshold = math.inf, abandonDestination = None):
         """
         Constructor
         @param id: int or str - Unique identifier/descriptor of the queue
         @param assignDestination: function - Function that accepts a dictionary of objects
                                              as an argument and returns a single selected
                                              object.
+        @param capacity: int - maximum number of Customers waiting (not counting those in
+                               service), so that a SimQueue with c Servers holds at most
+                               c + capacity Customers (an M/M/c/K queue has K = c + capacity)
+        @param overflowPolicy: str - what happens to a Customer arriving when the waiting
+                                     line is full: 'reject' loses the Customer, 'block' makes
+                                     the upstream stage keep the Customer until there is room,
+                                     and 'reroute' sends the Customer to overflowDestination
+        @param overflowDestination: CustomerDestination - receives rerouted Customers
+        @param discipline: str - 'fifo' serves Customers in order of arrival; 'priority'
+                                 serves the waiting Customer with the lowest priority value
+                                 first (first come first served within a class); 'preemptive'
+                                 also interrupts the service of a lower priority Customer
+                                 when a higher priority Customer is waiting, and later
+                                 resumes it where it left off
+        @param patienceDist: Distribution of the time a Customer is willing to wait for
+                             service before abandoning the SimQueue (reneging). If None,
+                             Customers wait until served.
+        @param balkThreshold: int - a Customer who would find at least this many Customers
+                              waiting does not join the SimQueue (balking)
+        @param abandonDestination: CustomerDestination - receives Customers who renege or
+                                   balk. If None, they leave the system.
         """
 
         # ensure that object is a valid SimulationStage/CustomerDestination
@@ -36,13 +69,67 @@ class SimQueue(CustomerDestination):
         else:
             self._assignDestination = None
 
-        self._buffer = deque()
+        self._discipline = discipline
+
+        if discipline in ['priority', 'preemptive']:
+            self._buffer = PriorityBuffer()
+        else:
+            self._buffer = deque()
         self._destination = {}
         self._nextEventTime = math.nan
         self._nextEventType = QueueEvent.SERVER_DOWN
         self._servers = {}
         self._assignServer = None
 
+        # the Servers in the order in which they were added; a Server's index is its
+        # position in this list and in other per-Server lists, so that the event loop
+        # works on lists rather than on dictionaries keyed by Server id
+        self._serverList = []
+        self._streams = None
+
+        self._capacity = capacity
+        self._overflowPolicy = overflowPolicy
+        self._overflowDestination = overflowDestination
+
+        # counts of the Customers offered to the SimQueue and of those refused because
+        # the waiting line was full
+        self._numArrivals = 0
+        self._numBlocked = 0
+
+        # upstream stages keeping Customers refused under the 'block' policy, in the
+        # order in which they were blocked
+        self._blockedStages = deque()
+
+        # (Server, destination, Customer) for every Customer that completed service here
+        # but was refused by a blocking destination, and the number of Customers each
+        # Server keeps by Server index (blocking after service)
+        self._held = []
+        self._numHeld = []
+
+        if isinstance(patienceDist, Distribution) and not patienceDist.RNG is None:
+            self._patienceDistribution = patienceDist
+        else:
+            self._patienceDistribution = None
+
+        self._patienceStream = None
+        self._balkThreshold = balkThreshold
+        self._abandonDestination = abandonDestination
+
+        # min-heap of (deadline, sequence number, Customer) abandonment events. Entries of
+        # Customers that entered service first are not removed but skipped when they reach
+        # the top of the heap (lazy deletion): a Customer's entry is current only if it
+        # matches the Customer's deadline in _deadline.
+        self._abandonments = []
+        self._numDeadlines = 0
+        self._deadline = {}
+
+        # Customers that reneged but are still in the buffer; they are discarded when they
+        # reach the front of the waiting line, rather than searched for
+        self._abandoned = set()
+
+        self._numAbandoned = 0
+        self._numBalked = 0
+
 
     def __repr__(self):
         return self.__str__()
@@ -72,6 +159,92 @@ class SimQueue(CustomerDestination):
         """
         return self._destination
 
+    @property
+    def capacity(self):
+        """
+        Getter property for the maximum number of Customers waiting
+
+        @return: int
+        """
+        return self._capacity
+
+    @property
+    def overflowPolicy(self):
+        """
+        Getter property for the policy applied to Customers arriving when the SimQueue is full
+
+        @return: str
+        """
+        return self._overflowPolicy
+
+    @property
+    def overflowDestination(self):
+        """
+        Getter property for the CustomerDestination receiving rerouted Customers
+
+        @return: CustomerDestination
+        """
+        return self._overflowDestination
+
+    @property
+    def discipline(self):
+        """
+        Getter property for the order in which waiting Customers enter service
+
+        @return: str
+        """
+        return self._discipline
+
+    @property
+    def numAbandoned(self):
+        """
+        Number of Customers that abandoned the waiting line before entering service
+
+        @return: int
+        """
+        return self._numAbandoned
+
+    @property
+    def numBalked(self):
+        """
+        Number of Customers that did not join the SimQueue because the waiting line was
+        too long
+
+        @return: int
+        """
+        return self._numBalked
+
+    @property
+    def numArrivals(self):
+        """
+        Number of Customers offered to the SimQueue, including those refused
+
+        @return: int
+        """
+        return self._numArrivals
+
+    @property
+    def numBlocked(self):
+        """
+        Number of Customers refused because the SimQueue was full
+
+        @return: int
+        """
+        return self._numBlocked
+
+    @property
+    def blockingProbability(self):
+        """
+        Fraction of the Customers offered to the SimQueue that were refused because it was
+        full, or NaN if no Customers have arrived
+
+        @return: double
+        """
+        if self._numArrivals == 0:
+            return math.nan
+
+        return self._numBlocked / self._numArrivals
+
     @property
     def nextEventTime(self):
         """
@@ -168,19 +341,32 @@ class SimQueue(CustomerDestination):
 
     def acceptArrival(self, simtime, customer):
         """
-        Accepts a Customer as long as: 1) the SimQueue has a valid state, and 2) the "customer"
-        is actually a Customer instance
+        Accepts a Customer as long as: 1) the SimQueue has a valid state, 2) the "customer"
+        is actually a Customer instance, 3) the waiting line is not so long that the
+        Customer balks, and 4) there is room in the waiting line. A Customer arriving when
+        the SimQueue is full is handled by the overflow policy. A Customer who balks has
+        been handled by the SimQueue, so the upstream stage must not keep it.
         @param customer: Customer
         @param simtime: double
-        @return: boolean: True if the Customer is accepted, False otherwise
+        @return: boolean: True if the Customer is accepted or balks, False otherwise
         """
         if isinstance(customer, Customer) and self.isValid():
 
-            # adds customer to list of waiting customers
-            self._buffer.append(customer)
+            self._numArrivals += 1
+
+            balkRoom = self._getRoom(self._balkThreshold)
+            room = self._getRoom(self._capacity)
+
+            if balkRoom == 0:
+                self._balk(simtime, [customer])
+                return True
 
-            # logs customer arrival
-            customer.logArrival(simtime, self.id)
+            if room == 0:
+                self._overflow(simtime, [customer])
+                return False
+
+            # adds customer to list of waiting customers and logs customer arrival
+            self._enqueue(simtime, customer)
 
             #tries to advance customer to service if possible
             self._advanceCustomers(simtime)
@@ -190,19 +376,103 @@ class SimQueue(CustomerDestination):
         else:
             return False
 
+    def acceptArrivals(self, simtime, customers):
+        """
+        Accepts several Customers arriving at the same time (e.g. a batch arrival). All
+        are added to the waiting line before customers are advanced to service, once.
+        If the waiting line becomes too long, the remaining Customers balk, or, if it fills
+        up first, they are handled by the overflow policy.
+        @param customers: list of Customer
+        @param simtime: double
+        @return: int - number of Customers accepted, counting those who balked; the others
+                 were refused for lack of room
+        """
+        if not self.isValid():
+            return 0
+
+        customers = [customer for customer in customers if isinstance(customer, Customer)]
+        self._numArrivals += len(customers)
+
+        balkRoom = self._getRoom(self._balkThreshold)
+        room = self._getRoom(self._capacity)
+
+        accepted = len(customers)
+
+        if min(balkRoom, room) < len(customers):
+            joining = min(balkRoom, room)
+
+            if balkRoom <= room:
+                self._balk(simtime, customers[joining:])
+            else:
+                self._overflow(simtime, customers[joining:])
+                accepted = joining
+
+            customers = customers[:joining]
+
+        for customer in customers:
+            self._enqueue(simtime, customer)
+
+        if len(customers) > 0:
+            self._advanceCustomers(simtime)
+
+        return accepted
+
+    def addBlockedStage(self, stage):
+        """
+        Records that an upstream stage keeps Customers this SimQueue refused, so that they
+        can be released to it once there is room. Only a SimQueue with the 'block' overflow
+        policy blocks upstream stages.
+        @param stage: SimulationStage - stage keeping the refused Customers
+        @return: boolean - True if the stage must keep the Customers
+        """
+        if self._overflowPolicy != 'block':
+            return False
+
+        if stage not in self._blockedStages:
+            self._blockedStages.append(stage)
+
+        return True
+
+    def releaseBlocked(self, simtime, dest, count):
+        """
+        Releases up to count of the Customers kept for dest because it was full, and lets
+        the Servers that kept them accept new Customers
+        @param simtime: double
+        @param dest: CustomerDestination - destination that now has room
+        @param count: int - maximum number of Customers to release
+        @return: list of Customer
+        """
+        released = []
+        kept = []
+
+        for server, heldDest, cust in self._held:
+            if heldDest is dest and len(released) < count:
+                self._numHeld[server.index] -= 1
+                released.append(cust)
+            else:
+                kept.append((server, heldDest, cust))
+
+        self._held = kept
+
+        if len(released) > 0:
+            self._advanceCustomers(simtime)
+
+        return released
+
     def getNumCustomersWaiting(self):
         """
         gets the length of the waiting line
         @return: int
         """
 
-        return len(self._buffer)
+        return len(self._buffer) - len(self._abandoned)
 
     def isValid(self):
         """
         Boolean function returning valid status of the SimQueue. To be valid, a
         SimQueue must have at least one CustomerDestination, at least one
-        Server, and valid assignDestination and assignServer functions
+        Server, valid assignDestination and assignServer functions, a non-negative
+        capacity, a valid overflow policy and a valid queue discipline
         @return: boolean
         """
 
@@ -222,6 +492,24 @@ class SimQueue(CustomerDestination):
             # no servers have been specified
             return False
 
+        if not self._capacity >= 0 or self._overflowPolicy not in self.OVERFLOW_POLICIES:
+            return False
+
+        if self._discipline not in self.DISCIPLINES:
+            return False
+
+        if not self._balkThreshold >= 0:
+            return False
+
+        if self._abandonDestination is not None and \
+                not isinstance(self._abandonDestination, CustomerDestination):
+            return False
+
+        if self._overflowPolicy == 'reroute' and \
+                not isinstance(self._overflowDestination, CustomerDestination):
+            # rerouted Customers need somewhere to go
+            return False
+
         return True
 
     def addCustomerDestination(self, dest):
@@ -244,31 +532,65 @@ class SimQueue(CustomerDestination):
 
     def addServer(self, server):
         """
-         Adds a Server to which a Customer can be assigned on service entry
-         @param server: Server - a new server
+         Adds a Server, or a ServerPool of identical servers, to which a Customer can be
+         assigned on service entry
+         @param server: Server or ServerPool - a new server
          @return: boolean
          """
-        if isinstance(server, Server) and server.id not in self._servers:
+        if isinstance(server, (Server, ServerPool)) and server.id not in self._servers:
 
             self._servers[server.id] = server
 
+            server.index = len(self._serverList)
+            self._serverList.append(server)
+            self._numHeld.append(0)
+
+            if self._streams is not None:
+                server.setRandomStreams(self._streams)
+
             return True
 
         else:
             return False
 
 
+    def setRandomStreams(self, streams):
+        """
+        Assigns per-purpose random streams to every current and future Server of the
+        SimQueue, and a patience stream to the SimQueue itself
+        @param streams: RandomStreams - factory providing the Servers' streams
+        @return: None
+        """
+        self._streams = streams
+        self._patienceStream = streams.getStream('patience', self.id)
+
+        for server in self._serverList:
+            server.setRandomStreams(streams)
+
     def removeServer(self, id):
         """
         Removes a Server from the SimQueue after which the SimQueue will
-        no longer assign Customers to that Server.
+        no longer assign Customers to that Server. A Server keeping Customers that its
+        destination refused cannot be removed until they are released.
         @param destId: str or int - identifier (id) of Server to be removed
-        @return: Server if existing or None if not found
+        @return: Server if removed or None if not found or keeping Customers
         """
         if id in self._servers.keys():
 
+            if self._numHeld[self._servers[id].index] > 0:
+                return None
+
             serv = self._servers.pop(id)
 
+            del self._serverList[serv.index]
+            del self._numHeld[serv.index]
+
+            # the Servers after the removed one move up one position
+            for index in range(serv.index, len(self._serverList)):
+                self._serverList[index].index = index
+
+            serv.index = None
+
             return serv
 
         else:
@@ -295,14 +617,15 @@ class SimQueue(CustomerDestination):
     def getNextEventTime(self):
         """
         Returns the next event time for the SimQueue, which is the earliest
-        nextEventTime for all of the SimQueue's Servers.
+        nextEventTime for all of the SimQueue's Servers, or the earliest time at which a
+        waiting Customer abandons the SimQueue, if sooner.
         @return: nextEventTime: float
         """
-        if len(self._servers) >= 1:
-            
-            event = min([i._nextEventTime for i in self._servers.values()])
+        if len(self._serverList) >= 1:
 
-            return event
+            event = min([i._nextEventTime for i in self._serverList])
+
+            return min(event, self._getNextAbandonmentTime())
 
         else:
 
@@ -314,11 +637,17 @@ class SimQueue(CustomerDestination):
         Returns the next event type for the Queue.
         @return: QueueEvent
         """
-        if len(self._servers) >= 1:
+        if len(self._serverList) >= 1:
+
+            nextEventTime = min([i._nextEventTime for i in self._serverList])
+
+            if self._getNextAbandonmentTime() <= nextEventTime:
 
-            for s in self.servers.values():
+                return QueueEvent.ABANDONMENT
 
-                if s._nextEventTime == min([i._nextEventTime for i in self._servers.values()]):
+            for s in self._serverList:
+
+                if s._nextEventTime == nextEventTime:
 
                     if s.nextEventType == ServerEvent.SERVICE_COMPLETION:
 
@@ -339,9 +668,11 @@ class SimQueue(CustomerDestination):
 
     def processEvent(self, simtime):
         """
-        Initiates the Queue's processing an event. If the event processed was a service
-        completion, then processEvent returns a Customer instance. Otherwise it
-        returns None.
+        Initiates the Queue's processing an event. Customers whose patience runs out at
+        simtime abandon the SimQueue, every Server whose event is due at simtime processes
+        it, and Customers completing service together are routed to their destinations
+        together. If a service was completed, then processEvent returns the (last) Customer
+        completing service. Otherwise it returns None.
         @param simtime:
         @return: Customer or None.
         """
@@ -356,29 +687,59 @@ class SimQueue(CustomerDestination):
         if not self.isValid():
             return None
 
-        if len(self.servers) >= 1 and simtime == self.getNextEventTime():
-
-            server = None
-
-            for s in self.servers.values():
+        if len(self._serverList) >= 1 and simtime == self.getNextEventTime():
 
-               if s._nextEventTime == self.getNextEventTime():
+            # every Server due at simtime processes its event before any Customer is
+            # routed or advanced, so that simultaneous completions are handled together
+            completed = []
 
-                    server = s
+            if self._getNextAbandonmentTime() == simtime:
+                self._processAbandonments(simtime)
 
+            for server in [s for s in self._serverList if s._nextEventTime == simtime]:
 
-            if server._nextEventTime == self.getNextEventTime():
-
+                eventType = server.nextEventType
                 cust = server.processEvent(simtime)
 
                 if isinstance(cust, Customer):
-                    dest = self.assignDestination(self._destination)
-                    dest.acceptArrival(simtime, cust)
+                    completed.append((server, cust))
+
+                if self._tracer is not None:
+                    self._tracer.record(simtime, self.index, server.index, eventType.value,
+                                        cust if isinstance(cust, Customer) else None)
+
+                # several servers of a pool may complete service at the same time
+                while isinstance(server, ServerPool) and server._nextEventTime == simtime:
+                    cust = server.processEvent(simtime)
+                    completed.append((server, cust))
+
+                    if self._tracer is not None:
+                        self._tracer.record(simtime, self.index, server.index,
+                                            eventType.value, cust)
+
+            # Customers routed to the same destination arrive there together. Destinations
+            # are grouped by object identity, which avoids hashing their ids
+            arrivals = {}
+            for server, cust in completed:
+                dest = self.assignDestination(self._destination)
+                arrivals.setdefault(dest, []).append((server, cust))
+
+            for dest, pairs in arrivals.items():
+                accepted = dest.acceptArrivals(simtime, [cust for server, cust in pairs])
+
+                if accepted < len(pairs) and dest.addBlockedStage(self):
+                    # blocking after service: a Server keeps the Customer its destination
+                    # refused, and cannot serve anyone else, until the destination has room
+                    for server, cust in pairs[accepted:]:
+                        self._held.append((server, dest, cust))
+                        self._numHeld[server.index] += 1
 
+            self._advanceCustomers(simtime)
 
+            if len(completed) > 0:
+                return completed[-1][1]
 
-                self._advanceCustomers(simtime)
-                return cust
+            return None
         else:
             return None
 
@@ -388,22 +749,31 @@ class SimQueue(CustomerDestination):
     def getNumAvailableServers(self):
         """
         Returns the number of Servers that are currently avaialble to accept
-        a Customer for service.
+        a Customer for service, counting every free server of a ServerPool.
         @return: int
         """
-        return len(self._getAvailableServers())
+        return sum(self._getNumFree(s) for s in self._getAvailableServers().values())
 
 
 
+    def getNumBlockedServers(self):
+        """
+        Returns the number of Servers keeping a Customer that its destination refused
+        @return: int
+        """
+        return len(self._held)
+
     def getNumBusyServers(self):
         """
         Returns the number of Servers that are currently busy serving
-        Customers.
+        Customers, counting every busy server of a ServerPool.
         @return: int
         """
         count = 0
-        for i in self.servers.values():
-            if i.status is ServerState.BUSY:
+        for i in self._serverList:
+            if isinstance(i, ServerPool):
+                count += i.numBusy
+            elif i.status is ServerState.BUSY:
                 count += 1
             else:
                 count = count
@@ -418,28 +788,47 @@ class SimQueue(CustomerDestination):
         to advancing customers to service
         @return: list of Server
         """
-        serv = {}
-        for i in self.servers.keys():
-
-            if self.servers[i].status is ServerState.AVAILABLE:
+        return {s.id: s for s in self._serverList if self._getNumFree(s) > 0}
 
-                serv[i] = self.servers[i]
+    def _getNumFree(self, server):
+        """
+        Private method returning the number of Customers a Server (or ServerPool) can
+        accept for service now, not counting servers keeping a blocked Customer
+        @return: int
+        """
+        if isinstance(server, ServerPool):
+            free = server.numFree
+        elif server.status is ServerState.AVAILABLE:
+            free = 1
+        else:
+            free = 0
 
-        return serv
+        return free - self._numHeld[server.index]
 
 
     def _advanceCustomers(self, time):
         """
         Private method to advance customers into service if possible. This method is used
-        by acceptArrival and processEvent.
+        by acceptArrival, acceptArrivals and processEvent.
         @param simtime: float - current simulation time
         @return: boolean
         """
 
-        ncust = min(self.getNumCustomersWaiting(), self.getNumAvailableServers())
+        # available servers are found once; each server accepting a customer is then
+        # removed from the set, rather than searching all servers again per customer
+        available = self._getAvailableServers()
+        ncust = min(self.getNumCustomersWaiting(),
+                    sum(self._getNumFree(s) for s in available.values()))
 
         if ncust == 0:
             # there are either no waiting customers or no available servers
+            if self._discipline == 'preemptive' and self.getNumCustomersWaiting() > 0:
+                self._preemptCustomers(time)
+
+            if len(self._blockedStages) > 0:
+                # available servers, or customers abandoning, may have made room
+                self._releaseBlockedStages(time)
+
             return False
 
         # if we fall through to here, there is at least one available customer
@@ -447,18 +836,199 @@ class SimQueue(CustomerDestination):
 
         for i in range(ncust):
             # we will advance ncust customers to service
-            srvr = self._assignServer(self._getAvailableServers())
+            srvr = self._assignServer(available)
 
             # remove the customer from the buffer and advance to service with srvr
-            cust = self._buffer.popleft()
-            if not srvr.acceptCustomer(time, cust):
+            cust = self._popWaiting()
+            if srvr.acceptCustomer(time, cust):
+                self._deadline.pop(cust, None)
+
+                if self._getNumFree(srvr) == 0:
+                    del available[srvr.id]
+            else:
                 # Server didn't accept customer, put the customer back at the
                 # front of the line - this should never happen
                 self._buffer.appendleft(cust)
 
+        if self._discipline == 'preemptive' and self.getNumCustomersWaiting() > 0:
+            self._preemptCustomers(time)
+
+        if len(self._blockedStages) > 0:
+            self._releaseBlockedStages(time)
+
         # there were customers to advance and servers to accept
         return True
 
+    def _preemptCustomers(self, time):
+        """
+        Private method interrupting the service of the lowest priority Customers in service
+        for as long as a higher priority Customer is waiting. Each interrupted Customer
+        returns to the front of its class in the waiting line.
+        @param time: float - current simulation time
+        @return: None
+        """
+        while self.getNumCustomersWaiting() > 0:
+            self._dropAbandoned()
+            waiting = self._buffer[0]
+
+            # Servers due to go out of service would not take the waiting Customer
+            # (the servers of a ServerPool are not preempted)
+            busy = [s for s in self._serverList if isinstance(s, Server) and
+                    s.status is ServerState.BUSY and s._nextDownTime > time]
+            if len(busy) == 0:
+                return
+
+            srvr = max(busy, key=lambda s: s._custInSvc.priority)
+            if srvr._custInSvc.priority <= waiting.priority:
+                return
+
+            cust = self._popWaiting()
+            self._deadline.pop(cust, None)
+            self._buffer.appendleft(srvr.preemptCustomer(time))
+            srvr.acceptCustomer(time, cust)
+
+    def _getRoom(self, limit):
+        """
+        Private method returning the number of Customers that can currently join the
+        waiting line without the number waiting exceeding limit (the capacity or the
+        balking threshold)
+        @return: int or math.inf
+        """
+        waiting = self.getNumCustomersWaiting()
+        room = limit - waiting
+
+        if waiting == 0 and room < math.inf:
+            # the waiting line is empty, so available Servers take Customers immediately
+            room += self.getNumAvailableServers()
+
+        return max(room, 0)
+
+    def _enqueue(self, simtime, customer):
+        """
+        Private method adding a Customer to the back of the waiting line, logging its
+        arrival and scheduling the time at which it will abandon the SimQueue
+        @return: None
+        """
+        self._buffer.append(customer)
+        customer.logArrival(simtime, self.id)
+
+        if self._patienceDistribution is not None:
+            deadline = simtime + self._patienceDistribution.getEvent(stream=self._patienceStream)
+
+            self._deadline[customer] = deadline
+            heapq.heappush(self._abandonments, (deadline, self._numDeadlines, customer))
+            self._numDeadlines += 1
+
+    def _popWaiting(self):
+        """
+        Private method removing and returning the Customer at the front of the waiting
+        line, discarding Customers that have abandoned it
+        @return: Customer
+        """
+        self._dropAbandoned()
+
+        return self._buffer.popleft()
+
+    def _dropAbandoned(self):
+        """
+        Private method discarding Customers that have abandoned the SimQueue from the
+        front of the waiting line
+        @return: None
+        """
+        while len(self._abandoned) > 0 and self._buffer[0] in self._abandoned:
+            self._abandoned.remove(self._buffer.popleft())
+
+    def _getNextAbandonmentTime(self):
+        """
+        Private method returning the earliest time at which a waiting Customer abandons
+        the SimQueue, first discarding the entries of Customers that entered service
+        @return: float
+        """
+        while len(self._abandonments) > 0:
+            deadline, number, customer = self._abandonments[0]
+
+            if self._deadline.get(customer) == deadline:
+                return deadline
+
+            heapq.heappop(self._abandonments)
+
+        return math.inf
+
+    def _processAbandonments(self, simtime):
+        """
+        Private method removing the Customers whose patience has run out by simtime from
+        the waiting line and sending them to the abandon destination
+        @return: None
+        """
+        while self._getNextAbandonmentTime() <= simtime:
+            deadline, number, customer = heapq.heappop(self._abandonments)
+
+            del self._deadline[customer]
+            self._abandoned.add(customer)
+            self._numAbandoned += 1
+
+            customer.logAbandonment(simtime)
+
+            if self._tracer is not None:
+                self._tracer.record(simtime, self.index, -1, QueueEvent.ABANDONMENT.value,
+                                    customer)
+
+            if self._abandonDestination is not None:
+                self._abandonDestination.acceptArrival(simtime, customer)
+
+        self._dropAbandoned()
+
+    def _balk(self, simtime, customers):
+        """
+        Private method handling Customers that do not join the SimQueue because the waiting
+        line is too long: they are counted and sent to the abandon destination
+        @return: None
+        """
+        self._numBalked += len(customers)
+
+        if self._abandonDestination is not None:
+            self._abandonDestination.acceptArrivals(simtime, customers)
+
+    def _overflow(self, simtime, customers):
+        """
+        Private method handling Customers that arrived when the SimQueue was full: they are
+        counted as blocked and, under the 'reroute' policy, sent to the overflow destination.
+        Under 'reject' they are lost; under 'block' the upstream stage keeps them.
+        @return: None
+        """
+        self._numBlocked += len(customers)
+
+        if self._overflowPolicy == 'reroute':
+            self._overflowDestination.acceptArrivals(simtime, customers)
+
+    def _releaseBlockedStages(self, simtime):
+        """
+        Private method taking Customers kept by blocked upstream stages, in the order in
+        which the stages were blocked, for as long as there is room for them
+        @return: None
+        """
+        released = 0
+
+        while len(self._blockedStages) > 0:
+            room = self._getRoom(self._capacity)
+            if room == 0:
+                break
+
+            stage = self._blockedStages.popleft()
+            customers = stage.releaseBlocked(simtime, self, room)
+
+            if len(customers) == room:
+                # the stage may keep more Customers than there was room for
+                self._blockedStages.appendleft(stage)
+
+            for customer in customers:
+                self._enqueue(simtime, customer)
+
+            released += len(customers)
+
+        if released > 0:
+            self._advanceCustomers(simtime)
+
 
 
 
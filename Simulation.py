@@ -1,8 +1,17 @@
 import math
+import sys
+import time
 
 
+from Sim.EventTracer import EventTracer
+from Sim.Instrumentation import Instrumentation
+
 from Sim.SimulationStage import SimulationStage
 
+from Sim.SimQueue import SimQueue
+
+from Sim.SourcePopulation import SourcePopulation
+
 from Sim.SystemExit import SystemExit
 
 
@@ -25,8 +34,25 @@ class Simulation:
         self._seedVal = np.random.seed(seedVal)
         self._customers = {}
         self._stages = {}
+
+        # the stages in the order in which they were added; a stage's index is its
+        # position in this list, which the event loop scans instead of the dictionary
+        self._stageList = []
         self._simtime = 0
         self._trials = 0
+        self._streams = None
+        self._instrumentation = None
+        self._tracer = None
+
+        # progress callbacks, each [callback, everyEvents, everySeconds, next event count,
+        # next wall time], and the event count at which run next checks them. Checking
+        # costs run one integer comparison per event; cancel brings the check forward.
+        self._progressCallbacks = []
+        self._nextProgressCheck = sys.maxsize
+        self._runStart = None
+        self._runStop = None
+        self._runTrials = 0
+        self._cancelled = False
 
 
 
@@ -46,7 +72,7 @@ class Simulation:
 
         @return: Customer iterable
         """
-        for stage in self._stages.values():
+        for stage in self._stageList:
 
             if isinstance(stage, SystemExit):
 
@@ -69,6 +95,36 @@ class Simulation:
     def simtime(self):
         return self._simtime
 
+    @property
+    def stages(self):
+        """
+        Getter property for the stages of the simulation, in the order of their indexes
+
+        @return: list of SimulationStage
+        """
+        return list(self._stageList)
+
+    @property
+    def randomStreams(self):
+        return self._streams
+
+    @property
+    def instrumentation(self):
+        return self._instrumentation
+
+    @property
+    def tracer(self):
+        return self._tracer
+
+    @property
+    def cancelled(self):
+        """
+        Whether the last (or current) run was cancelled before it completed
+
+        @return: Bool
+        """
+        return self._cancelled
+
 
     @seed.setter
     def seed(self, seed):
@@ -82,7 +138,21 @@ class Simulation:
         """
         if isinstance(stage, SimulationStage):
 
+            if stage.id in self._stages:
+                # a stage with the same id is replaced, keeping its index
+                stage.index = self._stages[stage.id].index
+                self._stageList[stage.index] = stage
+            else:
+                stage.index = len(self._stageList)
+                self._stageList.append(stage)
+
             self._stages[stage.id] = stage
+
+            if self._streams is not None:
+                stage.setRandomStreams(self._streams)
+
+            if self._tracer is not None:
+                stage.setTracer(self._tracer)
             return True
         else:
             return False
@@ -95,11 +165,171 @@ class Simulation:
         @return: Bool
         """
         if stage in self._stages.keys():
-            self._stages.pop(stage)
+            removed = self._stages.pop(stage)
+            del self._stageList[removed.index]
+
+            # the stages after the removed one move up one position
+            for index in range(removed.index, len(self._stageList)):
+                self._stageList[index].index = index
+
+            removed.index = None
             return True
         else:
             return False
 
+    def setRandomStreams(self, streams):
+        """
+        Assigns per-purpose random streams (one arrival stream per SourcePopulation and
+        downtime, OOS and service streams per Server) to every current and future stage.
+        Two Simulations given RandomStreams with the same seed use common random numbers,
+        which greatly reduces the variance of comparisons between them.
+
+        @param streams: RandomStreams - factory providing the streams
+        @return: None
+        """
+        self._streams = streams
+
+        for stage in self._stageList:
+            stage.setRandomStreams(streams)
+
+    def setInstrumentation(self, instrumentation):
+        """
+        Enables instrumentation of the event loop: while an Instrumentation is assigned,
+        run records the events processed by every stage, their types and the wall time
+        spent processing them. Assigning None disables instrumentation again, and run
+        returns to its plain event loop.
+
+        @param instrumentation: Instrumentation or None
+        @return: Bool
+        """
+        if instrumentation is None or isinstance(instrumentation, Instrumentation):
+            self._instrumentation = instrumentation
+            return True
+        else:
+            return False
+
+    def setTracer(self, tracer):
+        """
+        Enables event tracing: while an EventTracer is assigned, every current and future
+        stage records the events it processes into the tracer's trace file. Assigning None
+        disables tracing again. The tracer is not closed by the Simulation; close it once
+        the run is over to complete the trace.
+
+        @param tracer: EventTracer or None
+        @return: Bool
+        """
+        if tracer is None or isinstance(tracer, EventTracer):
+            self._tracer = tracer
+
+            for stage in self._stageList:
+                stage.setTracer(tracer)
+            return True
+        else:
+            return False
+
+    def addProgressCallback(self, callback, everyEvents = None, everySeconds = None):
+        """
+        Adds a callback that run invokes every everyEvents events, every everySeconds of
+        wall time, or whichever comes first if both are given, counted from the start of
+        each run. The callback is called as callback(simulation, progress), where progress
+        is a dictionary with the current 'simtime', the number of 'events' and the
+        'wallTime' of the run so far, its 'eventRate' (events per wall second), and the
+        numbers of Customer 'arrivals' and 'departures' and of Customers 'inSystem'. A
+        callback may stop the run by calling cancel.
+
+        Wall time is only read when a callback is due, so everySeconds is honoured
+        approximately: run estimates how many events will take everySeconds from the
+        event rate so far.
+
+        @param callback: callable
+        @param everyEvents: int or None
+        @param everySeconds: double or None
+        @return: Bool - False if callback is not callable or no positive interval is given
+        """
+        if not callable(callback):
+            return False
+
+        if everyEvents is not None and (not isinstance(everyEvents, int) or everyEvents < 1):
+            return False
+
+        if everySeconds is not None and (not isinstance(everySeconds, (int, float)) or everySeconds <= 0):
+            return False
+
+        if everyEvents is None and everySeconds is None:
+            return False
+
+        self._progressCallbacks.append([callback, everyEvents, everySeconds, sys.maxsize, math.inf])
+
+        if self._runStart is not None and self._runStop is None:
+            # added during a run, e.g. by another callback
+            now = time.perf_counter()
+            self._scheduleCallback(self._progressCallbacks[-1], now)
+            self._scheduleProgressCheck(now)
+
+        return True
+
+    def removeProgressCallback(self, callback):
+        """
+        Removes a callback added with addProgressCallback
+
+        @return: Bool
+        """
+        for hook in self._progressCallbacks:
+            if hook[0] is callback:
+                self._progressCallbacks.remove(hook)
+                return True
+
+        return False
+
+    def cancel(self):
+        """
+        Requests that the current run stops. The run completes the event it is processing
+        and returns; cancelled is then True until the next run starts. cancel may be called
+        by a progress callback or by another thread.
+
+        @return: None
+        """
+        self._cancelled = True
+        self._nextProgressCheck = -1
+
+    def getProgress(self):
+        """
+        Returns the progress of the current (or last) run, as passed to progress callbacks
+
+        @return: dictionary
+        """
+        events = self._trials - self._runTrials
+
+        if self._runStart is None:
+            wallTime = 0.0
+        else:
+            stop = self._runStop if self._runStop is not None else time.perf_counter()
+            wallTime = stop - self._runStart
+
+        arrivals = sum(stage.count - 1 for stage in self._stageList
+                       if isinstance(stage, SourcePopulation))
+        departures = sum(stage.numCustomers for stage in self._stageList
+                         if isinstance(stage, SystemExit))
+
+        # Customers lost by a SimQueue (refused, or abandoned without a destination) have
+        # neither departed nor are they in the system, so the Customers in the system are
+        # counted where they are: waiting, in service, or kept by a blocked stage
+        inSystem = 0
+        for stage in self._stageList:
+            if isinstance(stage, SimQueue):
+                inSystem += stage.getNumCustomersWaiting() + stage.getNumBusyServers() + \
+                            stage.getNumBlockedServers()
+            elif isinstance(stage, SourcePopulation):
+                inSystem += stage.numHeld
+
+        return {'simtime': self._simtime,
+                'events': events,
+                'wallTime': wallTime,
+                'eventRate': events / wallTime if wallTime > 0 else math.nan,
+                'arrivals': arrivals,
+                'departures': departures,
+                'inSystem': inSystem}
+
     def getSimulatedTime(self):
 
         """
@@ -121,30 +351,282 @@ class Simulation:
     def run(self, maxTime = math.inf, maxEvents = 1000):
 
         """
-        Performs the simulation with a specified maximum time or maximum amount of loops
+        Performs the simulation with a specified maximum time or maximum amount of loops,
+        or until no further event is scheduled
 
         @return: None
         """
 
-        complete = False
+        self._startProgress()
 
-        while not complete:
+        # the choice between plain and instrumented processing is made once per run, so
+        # the loop below costs nothing extra when instrumentation is disabled
+        instrumentation = self._instrumentation
 
-            sorted_stages = sorted([stage for stage in self._stages.values()],
-                                   key= lambda stg: stg.getNextEventTime())
-            stage = sorted_stages[0]
+        if instrumentation is None:
+            process = self._processEvent
+        else:
+            process = self._processInstrumented
+            instrumentation.startRun()
+
+        complete = False
 
+        while not complete:
 
-            #sets the simulation time to the next event time
-            self._simtime = stage.getNextEventTime()
+            # finds the stage with the earliest next event time
+            stage, simtime = self._getNextStage()
 
-            #processes the next event time
-            stage.processEvent(self._simtime)
+            if stage is None:
+                break
 
-            #adds 1 to the number of events that have happened
-            self._trials += 1
+            #processes the next event, which sets the simulation time and counts the event
+            process(stage, simtime)
 
             #checks to see if the simulation should be complete and ends the loops if the if statement is executed
             if self._trials >= maxEvents or self._simtime >= maxTime:
 
                 complete = True
+
+            #invokes the progress callbacks that are due, which may cancel the run
+            if self._trials >= self._nextProgressCheck:
+
+                complete = self._checkProgress() or complete
+
+        if instrumentation is not None:
+            instrumentation.stopRun()
+
+        self._runStop = time.perf_counter()
+
+    def step(self):
+
+        """
+        Processes the next event only. Progress callbacks, cancel and Instrumentation apply
+        to run, not to individual steps; traced stages still record the event.
+
+        @return: tuple (simtime, stage id, event type) describing the event, or None if no
+                 further event is scheduled. The event type is the stage's next event type
+                 (e.g. a QueueEvent), Instrumentation.ARRIVAL for a source population, or
+                 None for other stages.
+        """
+        stage, simtime = self._getNextStage()
+
+        if stage is None:
+            return None
+
+        eventType = self._getEventType(stage)
+        self._processEvent(stage, simtime)
+
+        return (simtime, stage.id, eventType)
+
+    def events(self, chunkSize = 1, maxTime = math.inf):
+
+        """
+        Generator processing events on demand, so that a controller can make decisions
+        between chunks of events. Each iteration processes up to chunkSize events and
+        yields them as a list of tuples, as returned by step. The generator ends when no
+        further event is scheduled or once an event at or after maxTime was processed,
+        like run; it can also simply be abandoned and the Simulation driven otherwise.
+        As with step, progress callbacks, cancel and Instrumentation do not apply.
+
+        @param chunkSize: int - number of events processed per iteration
+        @param maxTime: double
+        @return: generator of lists of tuples (simtime, stage id, event type)
+        """
+        chunkSize = max(1, int(chunkSize))
+
+        while True:
+            chunk = []
+
+            while len(chunk) < chunkSize:
+                event = self.step()
+
+                if event is None:
+                    break
+
+                chunk.append(event)
+
+                if self._simtime >= maxTime:
+                    break
+
+            if len(chunk) > 0:
+                yield chunk
+
+            if len(chunk) < chunkSize:
+                return
+
+    def runUntil(self, simtime):
+
+        """
+        Processes every event scheduled at or before simtime, then advances the simulation
+        time to simtime. Unlike run with maxTime, no event after simtime is processed, so
+        the Simulation can be resumed from simtime, e.g. after a controller changes it.
+        As with step, progress callbacks, cancel and Instrumentation do not apply.
+
+        @param simtime: double
+        @return: int - number of events processed
+        """
+        count = 0
+
+        while True:
+            stage, nextTime = self._getNextStage()
+
+            if stage is None or nextTime > simtime:
+                break
+
+            self._processEvent(stage, nextTime)
+            count += 1
+
+        self._simtime = max(self._simtime, simtime)
+
+        return count
+
+    def _getNextStage(self):
+
+        """
+        Private method finding the stage with the earliest next event time (the first
+        added, on ties)
+
+        @return: tuple (SimulationStage, next event time), or (None, math.inf) if no event
+                 is scheduled
+        """
+        if len(self._stageList) == 0:
+            return (None, math.inf)
+
+        times = [stage.getNextEventTime() for stage in self._stageList]
+        index = min(range(len(times)), key=times.__getitem__)
+
+        if times[index] == math.inf:
+            return (None, math.inf)
+
+        return (self._stageList[index], times[index])
+
+    def _processEvent(self, stage, simtime):
+
+        """
+        Private method processing the next event of a stage, which must be the earliest
+
+        @return: None
+        """
+        self._simtime = simtime
+
+        stage.processEvent(simtime)
+        self._trials += 1
+
+    def _processInstrumented(self, stage, simtime):
+
+        """
+        Private method processing the next event of a stage like _processEvent, recording
+        it with the Simulation's Instrumentation
+
+        @return: None
+        """
+        instrumentation = self._instrumentation
+        clock = instrumentation.clock
+
+        eventType = self._getEventType(stage)
+
+        start = clock()
+        self._processEvent(stage, simtime)
+        instrumentation.recordEvent(stage.id, eventType, clock() - start)
+
+    def _getEventType(self, stage):
+
+        """
+        Private method returning the type of a stage's next event
+
+        @return: the stage's next event type (e.g. a QueueEvent), Instrumentation.ARRIVAL
+                 for a source population, or None for other stages
+        """
+        if hasattr(stage, 'getNextEventType'):
+            return stage.getNextEventType()
+        elif isinstance(stage, SourcePopulation):
+            return Instrumentation.ARRIVAL
+        else:
+            return None
+
+    def _startProgress(self):
+
+        """
+        Private method starting the progress callbacks' counts and clocks for a new run
+
+        @return: None
+        """
+        now = time.perf_counter()
+
+        self._runStart = now
+        self._runStop = None
+        self._runTrials = self._trials
+        self._cancelled = False
+
+        for hook in self._progressCallbacks:
+            self._scheduleCallback(hook, now)
+
+        self._scheduleProgressCheck(now)
+
+    def _checkProgress(self):
+
+        """
+        Private method invoking the progress callbacks that are due and scheduling the
+        next check
+
+        @return: Bool - True if the run was cancelled
+        """
+        if self._cancelled:
+            return True
+
+        now = time.perf_counter()
+
+        due = [hook for hook in self._progressCallbacks
+               if self._trials >= hook[3] or now >= hook[4]]
+
+        if len(due) > 0:
+            progress = self.getProgress()
+
+            for hook in due:
+                self._scheduleCallback(hook, now)
+                hook[0](self, progress)
+
+        if not self._cancelled:
+            self._scheduleProgressCheck(time.perf_counter())
+
+        return self._cancelled
+
+    def _scheduleCallback(self, hook, now):
+
+        """
+        Private method setting the event count and wall time at which a progress callback
+        is next due
+
+        @return: None
+        """
+        callback, everyEvents, everySeconds = hook[:3]
+
+        hook[3] = self._trials + everyEvents if everyEvents is not None else sys.maxsize
+        hook[4] = now + everySeconds if everySeconds is not None else math.inf
+
+    def _scheduleProgressCheck(self, now):
+
+        """
+        Private method setting the event count at which run next checks the progress
+        callbacks: the earliest count at which one is due, where a wall time is converted
+        to a count with the event rate of the run so far
+
+        @return: None
+        """
+        check = sys.maxsize
+
+        events = self._trials - self._runTrials
+        elapsed = now - self._runStart
+
+        for hook in self._progressCallbacks:
+            check = min(check, hook[3])
+
+            if hook[4] < math.inf:
+                if events > 0 and elapsed > 0:
+                    # at least one event ahead, so a late check cannot stall the run
+                    remaining = max(0.0, hook[4] - now)
+                    check = min(check, self._trials + max(1, int(remaining * events / elapsed)))
+                else:
+                    check = min(check, self._trials + 1)
+
+        self._nextProgressCheck = check
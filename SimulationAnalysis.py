@@ -0,0 +1,160 @@
+import math
+
+import numpy as np
+
+from Sim.Simulation import Simulation
+from Sim.SimQueue import SimQueue
+from Sim.SourcePopulation import SourcePopulation
+
+
+class SimulationAnalysis:
+    """
+    Computes summary performance measures for the Customers that have exited a Simulation
+    """
+
+    def __init__(self, sim, startTime = 0):
+        """
+        SimulationAnalysis class constructor
+        @param sim: Simulation - the simulation to be analyzed
+        @param startTime: double - only Customers arriving at or after this time are
+                                   included (e.g. to discard a warm-up period)
+        """
+
+        self._sim = sim
+        self._startTime = startTime
+
+    def __repr__(self):
+        return self.__str__()
+
+    def __str__(self):
+        msg = ""
+        msg += f'{type(self)} object at {id(self)}\n'
+        msg += f'\tIs an analysis of simulation: {id(self._sim)}\n'
+
+        return msg
+
+    @property
+    def simulation(self):
+        return self._sim
+
+    @property
+    def startTime(self):
+        return self._startTime
+
+    def isValid(self):
+        """
+        Insures that the analysis has a Simulation with at least one completed Customer
+
+        @return: Bool
+        """
+        if not isinstance(self._sim, Simulation):
+            return False
+
+        return len(self._getTimes()[0]) > 0
+
+    def analyzeSystemPerformance(self):
+        """
+        Summarizes the total waiting and system times of the Customers that have exited
+        the Simulation
+
+        @return: dictionary
+        """
+        wait, system = self._getTimes()
+
+        results = {}
+        results['NumCustomers'] = len(wait)
+
+        if len(wait) == 0:
+            for key in ['AvgWaitTime', 'AvgSystemTime', 'MaxWaitTime', 'MaxSystemTime',
+                        '90%WaitTime', '90%SystemTime']:
+                results[key] = math.nan
+
+            return results
+
+        results['AvgWaitTime'] = np.mean(wait)
+        results['AvgSystemTime'] = np.mean(system)
+        results['MaxWaitTime'] = np.max(wait)
+        results['MaxSystemTime'] = np.max(system)
+        results['90%WaitTime'] = np.quantile(wait, 0.90, method='higher')
+        results['90%SystemTime'] = np.quantile(system, 0.90, method='higher')
+
+        return results
+
+    def comparePerformance(self, sim):
+        """
+        Compares the performance of this analysis' Simulation with another Simulation
+
+        @param sim: Simulation or SimulationAnalysis - the system to compare against
+        @return: dictionary of differences (this system minus the other system)
+        """
+        if not isinstance(sim, SimulationAnalysis):
+            sim = SimulationAnalysis(sim, self._startTime)
+
+        mine = self.analyzeSystemPerformance()
+        other = sim.analyzeSystemPerformance()
+
+        return {key: mine[key] - other[key] for key in mine}
+
+    def getControlVariates(self):
+        """
+        Returns the control variates of the Simulation: the deviation of the pooled sample
+        mean of all generated service times ('ServiceTime') and of all generated
+        inter-arrival times ('InterarrivalTime') from their known expected values. Each
+        has expectation zero, and each is correlated with waiting and system times.
+
+        @return: dictionary
+        """
+        controls = {}
+
+        if not isinstance(self._sim, Simulation):
+            return controls
+
+        service = []
+        interarrival = []
+
+        for stage in self._sim.stages:
+            if isinstance(stage, SourcePopulation):
+                interarrival.append((stage.numInterarrivalTimes,
+                                     stage.observedMeanInterarrivalTime,
+                                     stage.expectedInterarrivalTime))
+
+            elif isinstance(stage, SimQueue):
+                for server in stage.servers.values():
+                    service.append((server.numServiceTimes,
+                                    server.observedMeanServiceTime,
+                                    server.expectedServiceTime))
+
+        for key, samples in [('ServiceTime', service), ('InterarrivalTime', interarrival)]:
+            samples = [s for s in samples if s[0] > 0]
+            count = sum(s[0] for s in samples)
+
+            if count > 0:
+                controls[key] = sum(n * (observed - expected)
+                                    for n, observed, expected in samples) / count
+
+        return controls
+
+    def _getTimes(self):
+        """
+        Private method collecting the total waiting and system times of every Customer
+        that exited the Simulation. Customers that passed through no queue neither waited
+        nor spent time in the system.
+
+        @return: tuple of ndarray
+        """
+        wait = []
+        system = []
+
+        if isinstance(self._sim, Simulation):
+            for cust in self._sim:
+                if cust.systemArrivalTime < self._startTime:
+                    continue
+
+                if len(cust.getExperiences()) == 0:
+                    wait.append(0.0)
+                    system.append(0.0)
+                else:
+                    wait.append(cust.totalWaitTime)
+                    system.append(cust.totalSystemTime)
+
+        return np.array(wait, dtype=float), np.array(system, dtype=float)
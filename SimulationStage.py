@@ -13,10 +13,29 @@ class SimulationStage:
         """
         self._id = id
 
+        # dense integer index of the stage, assigned when it is added to a Simulation
+        self._index = None
+
+        # EventTracer recording the events of the stage, if it is traced
+        self._tracer = None
+
     @property
     def id(self):
         return self._id
 
+    @property
+    def index(self):
+        """
+        Position of the stage in its Simulation, used internally instead of the id
+
+        @return: int, or None if the stage has not been added to a Simulation
+        """
+        return self._index
+
+    @index.setter
+    def index(self, index):
+        self._index = index
+
     def getNextEventTime(self):
         """
         Because a SimulationStage is an abstract class/interface, it can have no real
@@ -44,4 +63,26 @@ class SimulationStage:
         @return: None
         """
 
-        return None
\ No newline at end of file
+        return None
+
+    def setRandomStreams(self, streams):
+        """
+        Because a SimulationStage is an abstract class/interface, it generates no random
+        variates. Therefore, this method does nothing except return None.
+        @param streams: RandomStreams - factory providing per-purpose random streams
+        @return: None
+        """
+
+        return None
+
+    def setTracer(self, tracer):
+        """
+        Assigns the EventTracer recording the events processed by the stage. Stages record
+        nothing while their tracer is None, which is the default.
+        @param tracer: EventTracer or None
+        @return: None
+        """
+        self._tracer = tracer
+
+        if tracer is not None:
+            tracer.addStage(self)
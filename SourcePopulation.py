@@ -7,20 +7,24 @@ from Sim.Assigner import Assigner
 from inspect import signature
 import types
 import numpy as np
-import scipy
-from scipy import stats
 
 class SourcePopulation(SimulationStage):
     """
     Represents a source population object that creates customer classes based on a probability distribution
 
     """
-    def __init__(self, id, dist, assignDestination):
+    def __init__(self, id, dist, assignDestination, batchSizeDist = None, priority = 0):
         """
         Source Population constructor
         :param id: simulation stage id
         :param dist: arrival time distribution
         :param assignDestination: function that assigns customer to their next destination
+        :param batchSizeDist: optional distribution of the number of customers arriving
+                              together at each arrival event (rounded to an integer).
+                              If None, customers arrive one at a time.
+        :param priority: priority class of the customers created (lower values are served
+                         first by priority queues), or a distribution from which each
+                         customer's class is drawn (rounded to an integer)
 
         """
         # inherits id attribute from simulation stage
@@ -43,7 +47,7 @@ class SourcePopulation(SimulationStage):
         self._dist = dist
 
 
-        if not dist.RNG is None:
+        if not dist is None and not dist.RNG is None:
             # sets arrival time distribution to the dist attribute
             self._arrivalTimeDistribution = dist
         else:
@@ -52,12 +56,39 @@ class SourcePopulation(SimulationStage):
         # destination dictionary will be filled when addDestination method is called
         self._destination = {}
 
+        if isinstance(batchSizeDist, Distribution) and not batchSizeDist.RNG is None:
+            self._batchSizeDistribution = batchSizeDist
+        else:
+            self._batchSizeDistribution = None
+
+        self._batchStream = None
+
+        self._priority = priority
+        self._priorityStream = None
+
+        # Customers refused by a full destination that blocks its upstream stages, and
+        # that destination; no further arrivals occur until they have been released
+        self._heldCustomers = []
+        self._heldDestination = None
+
+        # until setRandomStreams assigns an arrival stream, inter-arrival times come
+        # from the global np.random state
+        self._arrivalStream = None
+        self._lastArrivalTime = 0
+
+        # sum and count of the inter-arrival times generated, used as a control variate
+        # in output analysis
+        self._interarrivalTimeTotal = 0
+        self._numInterarrivalTimes = 0
+
 
 
         if not self._arrivalTimeDistribution is None:
 
             # getEvent() creates a random number
             self._nextArrivalTime = self._arrivalTimeDistribution.getEvent()
+            self._interarrivalTimeTotal = self._nextArrivalTime
+            self._numInterarrivalTimes = 1
         else:
             self._nextArrivalTime = math.nan
 
@@ -81,6 +112,49 @@ class SourcePopulation(SimulationStage):
         return msg
 
 
+    @property
+    def numHeld(self):
+        """
+        Number of created Customers kept because their destination refused them
+
+        @return: int
+        """
+        return len(self._heldCustomers)
+
+    @property
+    def numInterarrivalTimes(self):
+        """
+        Number of inter-arrival times generated so far
+
+        @return: int
+        """
+        return self._numInterarrivalTimes
+
+    @property
+    def observedMeanInterarrivalTime(self):
+        """
+        Sample mean of the inter-arrival times generated so far, or NaN if none have been
+        generated
+
+        @return: double
+        """
+        if self._numInterarrivalTimes == 0:
+            return math.nan
+
+        return self._interarrivalTimeTotal / self._numInterarrivalTimes
+
+    @property
+    def expectedInterarrivalTime(self):
+        """
+        Theoretical mean of the arrival time distribution, or NaN if it is not valid
+
+        @return: double
+        """
+        if self._arrivalTimeDistribution is None:
+            return math.nan
+
+        return self._arrivalTimeDistribution.mean()
+
     def addCustomerDestination(self, dest):
 
         """
@@ -111,6 +185,10 @@ class SourcePopulation(SimulationStage):
 
             return math.nan
 
+        if len(self._heldCustomers) > 0:
+            # blocked until the destination has room for the held Customers
+            return math.inf
+
         return self._nextArrivalTime
 
 
@@ -125,7 +203,7 @@ class SourcePopulation(SimulationStage):
         """
 
 
-        if not self._dist.RNG is None and not self._destination == {} and not self._assignDestination == None:
+        if not self._dist is None and not self._dist.RNG is None and not self._destination == {} and not self._assignDestination == None:
                 return True
         else:
                 return False
@@ -149,8 +227,9 @@ class SourcePopulation(SimulationStage):
         @return: Customer
         """
 
-        if simtime < self._nextArrivalTime:
+        if simtime < self._nextArrivalTime or math.isinf(self._nextArrivalTime):
 
+            # no arrival is due (or no further arrivals will occur)
             self.cust = None
 
         else:
@@ -162,24 +241,125 @@ class SourcePopulation(SimulationStage):
             # Generate a new customer:
             # 1. Assemble customer's name (really just a sequence number)
             # 2. Create the new instance
-            name = f'{self.id}-{self.count}'
-            self.cust = Customer(name, simtime)
+            if self._batchSizeDistribution is None:
+                self.cust = self._createCustomer(simtime)
 
-            self.count += 1
+                self.count += 1
 
-            # decides where to send next customer
-            stage = self._assignDestination(self._destination)
+                if self._tracer is not None:
+                    self._tracer.record(simtime, self.index, -1, self._tracer.ARRIVAL, self.cust)
 
-            # asks next stage to accept customer
-            stage.acceptArrival(simtime, self.cust)
+                # decides where to send next customer
+                stage = self._assignDestination(self._destination)
+
+                # asks next stage to accept customer
+                if not stage.acceptArrival(simtime, self.cust) and stage.addBlockedStage(self):
+                    self._hold(stage, [self.cust])
+
+            else:
+                # a whole batch arrives in this one event and is sent to a single destination
+                customers = []
+                for i in range(self._getBatchSize()):
+                    customers.append(self._createCustomer(simtime))
+                    self.count += 1
+
+                    if self._tracer is not None:
+                        self._tracer.record(simtime, self.index, -1, self._tracer.ARRIVAL,
+                                            customers[-1])
+
+                # an empty batch brings no customer
+                self.cust = customers[-1] if len(customers) > 0 else None
+
+                if len(customers) > 0:
+
+                    stage = self._assignDestination(self._destination)
+                    accepted = stage.acceptArrivals(simtime, customers)
+
+                    if accepted < len(customers) and stage.addBlockedStage(self):
+                        self._hold(stage, customers[accepted:])
 
             # finds new arrival time
-            self._nextArrivalTime = self._nextArrivalTime + self._arrivalTimeDistribution.getEvent()
+            self._lastArrivalTime = self._nextArrivalTime
+            self._scheduleNextArrival()
 
 
 
         return None
 
+    def releaseBlocked(self, simtime, dest, count):
+        """
+        Releases up to count of the Customers kept because their destination was full.
+        Once all have been released, arrivals resume; an arrival that fell due while the
+        SourcePopulation was blocked is postponed until simtime.
+
+        @param simtime: double
+        @param dest: CustomerDestination - destination that now has room
+        @param count: int - maximum number of Customers to release
+        @return: list of Customer
+        """
+        if not dest is self._heldDestination:
+            return []
+
+        released = self._heldCustomers[:count]
+        self._heldCustomers = self._heldCustomers[len(released):]
+
+        if len(self._heldCustomers) == 0:
+            self._heldDestination = None
+            self._nextArrivalTime = max(self._nextArrivalTime, simtime)
+
+        return released
+
+    def _hold(self, stage, customers):
+        """
+        Private method keeping Customers refused by a blocking destination
+
+        @return: None
+        """
+        self._heldCustomers = customers
+        self._heldDestination = stage
+
+    def _createCustomer(self, simtime):
+        """
+        Private method creating the Customer for the current arrival. The Customer's name
+        is really just a sequence number, which the Customer formats only if asked for it.
+
+        @return: Customer
+        """
+        return Customer(self.count, simtime, priority=self._getPriority(), source=self.id)
+
+    def _getPriority(self):
+        """
+        Private method returning the priority class of the next customer
+
+        @return: int
+        """
+        if isinstance(self._priority, Distribution):
+            return int(round(self._priority.getEvent(stream=self._priorityStream)))
+
+        return self._priority
+
+    def _getBatchSize(self):
+        """
+        Private method drawing the number of customers in the next batch
+
+        @return: int
+        """
+        size = self._batchSizeDistribution.getEvent(stream=self._batchStream)
+
+        return max(int(round(size)), 0)
+
+    def _scheduleNextArrival(self):
+        """
+        Private method setting the next arrival time by drawing an inter-arrival time from
+        the arrival time distribution
+
+        @return: None
+        """
+        interarrivalTime = self._arrivalTimeDistribution.getEvent(stream=self._arrivalStream)
+        self._nextArrivalTime = self._nextArrivalTime + interarrivalTime
+        self._interarrivalTimeTotal += interarrivalTime
+        self._numInterarrivalTimes += 1
+
 
 
 
@@ -220,6 +400,26 @@ class SourcePopulation(SimulationStage):
 
 
 
+    def setRandomStreams(self, streams):
+        """
+        Assigns the SourcePopulation its own arrival stream so that its arrivals are
+        synchronized with those of identically named SourcePopulations in other
+        Simulations built with the same RandomStreams seed. The pending arrival is
+        redrawn from the new stream.
+
+        @return: None
+        """
+        self._arrivalStream = streams.getStream('arrival', self.id)
+        self._batchStream = streams.getStream('batch', self.id)
+        self._priorityStream = streams.getStream('priority', self.id)
+
+        if not self._arrivalTimeDistribution is None:
+            interarrivalTime = self._arrivalTimeDistribution.getEvent(stream=self._arrivalStream)
+
+            # the redrawn inter-arrival time replaces the pending one in the control variate
+            self._interarrivalTimeTotal += interarrivalTime - (self._nextArrivalTime - self._lastArrivalTime)
+            self._nextArrivalTime = self._lastArrivalTime + interarrivalTime
+
     def setAssignDestination(self, assignDestination):
 
         """
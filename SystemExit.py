@@ -13,9 +13,12 @@ class SystemExit(CustomerDestination):
         # inherits id attribute from Customer Destination
         super().__init__(id)
 
-        # customer will be added when accept arrival is called
+        # customer will be added when accept arrival is called, keyed by Customer key
         self._customers = {}
 
+        # the customers keyed by name, built when first requested
+        self._customersByName = None
+
 
 
     def __repr__(self):
@@ -46,19 +49,34 @@ class SystemExit(CustomerDestination):
     @property
     def customer(self):
         """
-        Getter property for customer dictionary
+        Getter property for customer dictionary, keyed by customer name. Customers are
+        stored by key (see Customer.key), so that the names of Customers created by a
+        source population are only formatted when this dictionary is first requested.
 
         @return: dictionary
         """
-        return self._customers
+        if self._customersByName is None:
+            self._customersByName = {cust.name: cust for cust in self._customers.values()}
+
+        return self._customersByName
+
+    @property
+    def numCustomers(self):
+        """
+        Getter property for the number of customers that have exited
+
+        @return: int
+        """
+        return len(self._customers)
 
 
 
     def acceptArrival(self, simtime, customer):
         """
-        Accepts a Customer and adds the customer to the customers dictionary. Customer,
-        should have a unique identifier. If not, it will be rejected by the SystemExit
-        which will return True if the Customer is admitted and False otherwise.
+        Accepts a Customer and adds the customer to the customers dictionary, keyed by the
+        Customer's key. Customer, should have a unique identifier. If not, it will be
+        rejected by the SystemExit which will return True if the Customer is admitted and
+        False otherwise.
         @param customer: Customer
         @param simtime: double
         @return: boolean
@@ -66,9 +84,10 @@ class SystemExit(CustomerDestination):
 
         if self.isValid():
 
-            if not customer.name in self._customers.keys():
+            if not customer.key in self._customers:
 
-                self._customers[customer.name] = customer
+                self._customers[customer.key] = customer
+                self._customersByName = None
 
                 return True
 
@@ -0,0 +1,218 @@
+import math
+import os
+
+import numpy as np
+
+from Sim.SourcePopulation import SourcePopulation
+from Sim.Customer import Customer
+
+
+class TraceSourcePopulation(SourcePopulation):
+    """
+    Represents a source population that replays recorded arrivals instead of generating
+    them from a Distribution. Absolute arrival timestamps (and optional Customer attributes)
+    are streamed from a CSV, Parquet or binary file in chunks, so arbitrarily long traces
+    are replayed in constant memory.
+    """
+
+    FORMATS = ['csv', 'parquet', 'binary']
+
+    def __init__(self, id, path, assignDestination, timeColumn = 'time', attributeColumns = None,
+                 chunkSize = 65536, timeOffset = 0, format = None, priorityColumn = None):
+        """
+        TraceSourcePopulation constructor
+        :param id: simulation stage id
+        :param path: path of the trace file. Timestamps must be in ascending order.
+        :param assignDestination: function that assigns customer to their next destination
+        :param timeColumn: name of the timestamp column (CSV and Parquet)
+        :param attributeColumns: list of columns copied into each Customer's attributes
+                                 (CSV and Parquet)
+        :param chunkSize: number of arrivals read from the file at a time
+        :param timeOffset: value subtracted from every timestamp (e.g. the trace's start time)
+        :param format: 'csv', 'parquet' or 'binary' (float64 timestamps, raw or .npy).
+                       If None, inferred from the file extension.
+        :param priorityColumn: name of the column holding each Customer's priority class
+                               (CSV and Parquet). If None, all Customers have priority 0.
+        """
+        super().__init__(id, None, assignDestination)
+
+        if format is None:
+            format = self._inferFormat(path)
+
+        self._path = path
+        self._format = format
+        self._timeColumn = timeColumn
+        self._attributeColumns = list(attributeColumns) if attributeColumns else []
+        self._priorityColumn = priorityColumn
+
+        if priorityColumn is not None and priorityColumn not in self._attributeColumns:
+            self._attributeColumns.append(priorityColumn)
+        self._chunkSize = chunkSize
+        self._timeOffset = timeOffset
+
+        # current chunk of the trace and the position of the next arrival within it
+        self._times = np.empty(0)
+        self._attributes = {}
+        self._position = 0
+        self._currentAttributes = {}
+        self._numReplayed = 0
+
+        # number of rows of the trace read so far, where reading resumes when unpickled
+        self._numRowsRead = 0
+
+        self._valid = format in self.FORMATS and os.path.exists(path)
+
+        if self._valid:
+            self._chunks = self._readChunks()
+            self._nextArrivalTime = self._lastArrivalTime
+            self._scheduleNextArrival()
+
+    def __str__(self):
+        msg = ""
+        msg += f'{type(self)} object at {id(self)}\n'
+        msg += f'\tIs a trace source population replaying: {self._path}\n'
+
+        return msg
+
+    def __getstate__(self):
+        """
+        Pickles the trace by path and position, since the reader of an open file cannot
+        be pickled. The current chunk is pickled, and reading resumes after it.
+        """
+        state = self.__dict__.copy()
+        state.pop('_chunks', None)
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+        if self._valid:
+            self._chunks = self._readChunks(self._numRowsRead)
+
+    @property
+    def numReplayed(self):
+        """
+        Number of arrivals replayed so far
+
+        @return: int
+        """
+        return self._numReplayed
+
+    def isValid(self):
+        """
+        Insures that the trace source population instance is valid
+
+        @return: Bool
+        """
+        return self._valid and not self._destination == {} and not self._assignDestination is None
+
+    def setRandomStreams(self, streams):
+        """
+        Replayed arrivals are not random, so this method does nothing except return None.
+
+        @return: None
+        """
+        return None
+
+    def _createCustomer(self, simtime):
+        """
+        Private method creating the Customer for the current arrival, with the attributes
+        recorded for it in the trace
+
+        @return: Customer
+        """
+        self._numReplayed += 1
+
+        priority = 0
+        if self._priorityColumn is not None:
+            priority = int(self._currentAttributes[self._priorityColumn])
+
+        return Customer(self.count, simtime, self._currentAttributes, priority, self.id)
+
+    def _scheduleNextArrival(self):
+        """
+        Private method setting the next arrival time to the next timestamp in the trace,
+        reading the next chunk when the current one is used up. Once the trace is exhausted
+        the next arrival time is infinite. Out of order timestamps are replayed at the
+        previous arrival time.
+
+        @return: None
+        """
+        while self._position >= len(self._times):
+            try:
+                self._times, self._attributes = next(self._chunks)
+                self._position = 0
+                self._numRowsRead += len(self._times)
+            except StopIteration:
+                self._nextArrivalTime = math.inf
+                self._currentAttributes = {}
+                return
+
+        i = self._position
+        self._position += 1
+
+        self._nextArrivalTime = max(self._times[i] - self._timeOffset, self._lastArrivalTime)
+        self._currentAttributes = {column: values[i] for column, values in self._attributes.items()}
+
+    def _readChunks(self, skip = 0):
+        """
+        Private generator yielding the trace in chunks of (timestamps, attributes)
+        @param skip: int - number of rows at the start of the trace to skip
+        @return: generator of (ndarray, dictionary of ndarray)
+        """
+        columns = [self._timeColumn] + self._attributeColumns
+
+        if self._format == 'csv':
+            import pandas as pd
+
+            for df in pd.read_csv(self._path, usecols=columns, chunksize=self._chunkSize,
+                                  skiprows=range(1, skip + 1)):
+                yield self._splitColumns({c: df[c].to_numpy() for c in columns})
+
+        elif self._format == 'parquet':
+            import pyarrow.parquet
+
+            trace = pyarrow.parquet.ParquetFile(self._path)
+            for batch in trace.iter_batches(batch_size=self._chunkSize, columns=columns):
+                if skip >= batch.num_rows:
+                    skip -= batch.num_rows
+                    continue
+
+                batch = batch.slice(skip)
+                skip = 0
+
+                yield self._splitColumns({c: batch.column(c).to_numpy(zero_copy_only=False)
+                                          for c in columns})
+
+        else:
+            if self._path.endswith('.npy'):
+                times = np.load(self._path, mmap_mode='r')
+            else:
+                times = np.memmap(self._path, dtype='float64', mode='r')
+
+            for start in range(skip, len(times), self._chunkSize):
+                yield np.asarray(times[start:start + self._chunkSize], dtype=float), {}
+
+    def _splitColumns(self, columns):
+        """
+        Private method separating the timestamps of a chunk from its attributes
+        @return: tuple of (ndarray, dictionary of ndarray)
+        """
+        times = np.asarray(columns.pop(self._timeColumn), dtype=float)
+
+        return times, columns
+
+    def _inferFormat(self, path):
+        """
+        Private method inferring the trace format from the file extension
+        @return: str
+        """
+        extension = os.path.splitext(path)[1].lower()
+
+        if extension == '.csv':
+            return 'csv'
+        elif extension in ['.parquet', '.pq']:
+            return 'parquet'
+
+        return 'binary'
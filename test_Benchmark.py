@@ -0,0 +1,72 @@
+import json
+import math
+import os
+import tempfile
+from unittest import TestCase, main
+from Sim.Benchmark import Benchmark
+
+
+class TestBenchmark(TestCase):
+
+    def setUp(self) -> None:
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'baselines.json')
+
+        # a tiny scale keeps the benchmarks quick
+        self.benchmark = Benchmark(self.path, threshold=0.2, repeat=1, scale=0.002)
+
+        self.assertTrue(isinstance(self.benchmark.__str__(), str))
+        self.assertTrue(isinstance(self.benchmark.__repr__(), str))
+
+    def tearDown(self) -> None:
+        self.dir.cleanup()
+
+    def test_run(self):
+        results = self.benchmark.run()
+        self.assertEqual(list(Benchmark.BENCHMARKS), list(results))
+
+        for name, result in results.items():
+            with self.subTest(name=name):
+                self.assertEqual(self.benchmark.getSize(name), result['size'])
+                self.assertEqual(Benchmark.BENCHMARKS[name][1], result['unit'])
+                self.assertGreater(result['rate'], 0)
+                self.assertGreater(result['seconds'], 0)
+
+        # unknown benchmarks are ignored
+        self.assertEqual(['mm1'], list(self.benchmark.run(['mm1', 'nope'])))
+
+    def test_baselines(self):
+        self.assertEqual({}, self.benchmark.loadBaselines())
+
+        results = {'mm1': {'rate': 1000.0, 'unit': 'events/s', 'size': 20, 'seconds': 0.02}}
+        self.benchmark.saveBaselines(results)
+        self.assertEqual(results, self.benchmark.loadBaselines())
+
+        # saving keeps the baselines of benchmarks that were not run
+        other = {'tandem50': {'rate': 50.0, 'unit': 'events/s', 'size': 20, 'seconds': 0.4}}
+        self.benchmark.saveBaselines(other)
+        with open(self.path) as file:
+            self.assertEqual(['mm1', 'tandem50'], sorted(json.load(file)))
+
+    def test_compare(self):
+        baselines = {'mm1': {'rate': 1000.0}, 'mmc100': {'rate': 1000.0}}
+        results = {'mm1': {'rate': 850.0}, 'mmc100': {'rate': 700.0}, 'tandem50': {'rate': 10.0}}
+
+        comparison = self.benchmark.compare(results, baselines)
+
+        self.assertAlmostEqual(-0.15, comparison['mm1']['change'])
+        self.assertFalse(comparison['mm1']['regressed'])
+        self.assertTrue(comparison['mmc100']['regressed'])
+
+        # benchmarks without a baseline cannot regress
+        self.assertEqual(None, comparison['tandem50']['baseline'])
+        self.assertTrue(math.isnan(comparison['tandem50']['change']))
+        self.assertFalse(comparison['tandem50']['regressed'])
+
+        for name in results:
+            results[name].update(unit='events/s', size=1)
+        self.assertIn('REGRESSED', self.benchmark.report(results, comparison))
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
@@ -0,0 +1,107 @@
+from unittest import TestCase, main
+from Sim.BranchRunner import BranchRunner
+from Sim.Simulation import Simulation
+from Sim.SourcePopulation import SourcePopulation
+from Sim.SystemExit import SystemExit
+from Sim.SimQueue import SimQueue
+from Sim.Assigner import Assigner
+from Sim.Distribution import Distribution
+from Sim.Server import Server
+import numpy as np
+
+
+def addServer(sim):
+    queue = sim._stages['Q0']
+    queue.addServer(Server('Server1', sim.simtime, queue._servers['Server0']._downTimeDistribution,
+                           queue._servers['Server0']._oosDistribution,
+                           queue._servers['Server0']._serviceTimeDistribution))
+
+
+class TestBranchRunner(TestCase):
+
+    def setUp(self) -> None:
+        self.sim = Simulation(100)
+
+        self.assigner = Assigner()
+        ar = Distribution("scipy.stats.expon(scale=180)")
+        dt = Distribution("scipy.stats.triang(c=0, loc=14400, scale= 3600)")
+        oos = Distribution("scipy.stats.triang(c=1/3, loc=300, scale= 900)")
+        st = Distribution("scipy.stats.expon(scale=170)")
+
+        se = SystemExit('SE0')
+        queue = SimQueue('Q0', self.assigner.assignInSequence)
+        queue.addServer(Server('Server0', 0, dt, oos, st))
+        queue.addCustomerDestination(se)
+        queue.assignServer = self.assigner.assignByAvailableTime
+
+        sp = SourcePopulation('SP0', ar, self.assigner.assignInSequence)
+        sp.addCustomerDestination(queue)
+
+        for stage in [sp, queue, se]:
+            self.sim.addStage(stage)
+
+        # warm up the simulation before branching
+        self.sim.run(maxEvents=200)
+
+    def test_addBranch(self):
+        runner = BranchRunner(self.sim)
+        self.assertFalse(runner.isValid())
+
+        self.assertTrue(runner.addBranch('base'))
+        self.assertTrue(runner.addBranch('twoServers', addServer))
+        self.assertEqual(2, runner.numBranches)
+        self.assertTrue(runner.isValid())
+
+        # duplicate names and non-callables are rejected
+        self.assertFalse(runner.addBranch('base'))
+        self.assertFalse(runner.addBranch('bad', 5))
+        self.assertEqual(2, runner.numBranches)
+
+        self.assertTrue(runner.removeBranch('base'))
+        self.assertTrue(runner.removeBranch('twoServers'))
+        self.assertFalse(runner.removeBranch('twoServers'))
+        self.assertEqual(0, runner.numBranches)
+
+        self.assertFalse(BranchRunner(5).isValid())
+
+    def test_run(self):
+        runner = BranchRunner(self.sim)
+        runner.addBranch('base')
+        runner.addBranch('twoServers', addServer)
+
+        simtime = self.sim.simtime
+        trials = self.sim.getTrialsCompleted()
+        rstate = np.random.get_state()
+
+        forked = runner.run(maxEvents=400, processes=2)
+        inline = runner.run(maxEvents=400, processes=1)
+
+        # the snapshot is left untouched, and the branches do not draw from the global
+        # random number state
+        self.assertEqual(simtime, self.sim.simtime)
+        self.assertEqual(trials, self.sim.getTrialsCompleted())
+        self.assertTrue(self.sim.randomStreams is None)
+        self.assertTrue(np.array_equal(rstate[1], np.random.get_state()[1]))
+
+        # forked and in-process branches see identical random numbers
+        for name in ['base', 'twoServers']:
+            for key, value in forked[name].items():
+                with self.subTest(name=name, key=key):
+                    self.assertAlmostEqual(value, inline[name][key])
+
+        self.assertLess(forked['twoServers']['AvgWaitTime'], forked['base']['AvgWaitTime'])
+
+        # runners with the same seed give the same results, whatever the global state
+        np.random.seed(1)
+        first = BranchRunner(self.sim, seed=runner.seed)
+        first.addBranch('base')
+        np.random.seed(2)
+        self.assertEqual(inline['base'], first.run(maxEvents=400, processes=1)['base'])
+
+        # custom analysis functions are supported
+        results = runner.run(maxEvents=10, processes=1, analyze=lambda sim: sim.getTrialsCompleted())
+        self.assertEqual(trials + 10, results['base'])
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
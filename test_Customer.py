@@ -32,6 +32,22 @@ class TestCustomer(TestCase):
                 self.assertEqual(self.arrivalTimes[i], self.cust[i].systemArrivalTime)
                 self.assertTrue(self.cust[i].currLocation is None)
 
+    def test_key(self):
+        # named customers are identified by their name
+        self.assertEqual('Cust 0', self.cust[0].key)
+
+        # customers of a source population are keyed by source and number, and are named
+        # on demand
+        cust = [Customer(i, 0, source='SP0') for i in range(1, 3)]
+        self.assertEqual([('SP0', 1), ('SP0', 2)], [c.key for c in cust])
+        self.assertTrue(cust[0]._name is None)
+        self.assertEqual('SP0-1', cust[0].name)
+        self.assertEqual('SP0-2', cust[1].name)
+
+        # keys do not depend on the Customers created before, and differ between sources
+        self.assertEqual(('SP0', 2), Customer(2, 0, source='SP0').key)
+        self.assertNotEqual(Customer(2, 0, source='SP0').key, Customer(2, 0, source='SP1').key)
+
     def test_getExperiences(self):
 
         # first, getting the experience dictionary for all customers
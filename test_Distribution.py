@@ -1,5 +1,8 @@
+import pickle
 from unittest import TestCase, main
 import numpy as np
+import scipy
+from scipy import stats
 from Sim.Distribution import Distribution
 
 
@@ -146,6 +149,71 @@ class TestDistribution(TestCase):
                 actual = dist1.getEvent()
                 self.assertAlmostEqual(expected[i], actual)
 
+    def test_tabulate(self):
+        specs = ['scipy.stats.triang(c=1/3, loc=300, scale= 900)',
+                 'scipy.stats.lognorm(0.8, scale=100)',
+                 'scipy.stats.gamma(2, scale=3)']
+
+        u = np.concatenate([np.linspace(0.0001, 0.9999, 1001), [0.0005, 0.9995]])
+
+        for spec in specs:
+            for interpolation in Distribution.INTERPOLATIONS:
+                with self.subTest(spec=spec, interpolation=interpolation):
+                    # nearest-entry lookup needs much larger tables for the same accuracy
+                    tolerance = 1e-3 if interpolation == 'linear' else 1e-2
+                    dist = Distribution(spec, tabulate=True, tolerance=tolerance,
+                                        interpolation=interpolation)
+                    rv = eval(spec)
+                    self.assertTrue(dist.isTabulated)
+                    self.assertGreater(dist.tableSize, 0)
+                    self.assertLess(dist.tableSize, Distribution.MAX_TABLE_SIZE)
+
+                    # lookups are within tolerance of the exact quantiles
+                    bound = tolerance * (rv.ppf(0.75) - rv.ppf(0.25))
+                    error = np.abs(dist._lookup(u) - rv.ppf(u))
+                    self.assertLessEqual(np.max(error), bound * 1.01)
+
+                    # tail draws are exact
+                    self.assertAlmostEqual(rv.ppf(0.0005), dist._lookup(np.array([0.0005]))[0])
+
+                    # samples are drawn from the global state or a stream
+                    self.assertTrue(np.isfinite(dist.getEvent()))
+
+        # coarser tolerances give smaller tables
+        fine = Distribution(specs[1], tabulate=True, tolerance=1e-4)
+        coarse = Distribution(specs[1], tabulate=True, tolerance=1e-2)
+        self.assertLess(coarse.tableSize, fine.tableSize)
+
+        # discrete and invalid distributions are not tabulated
+        self.assertFalse(Distribution('scipy.stats.poisson(5)', tabulate=True).isTabulated)
+        self.assertFalse(Distribution('nrml(100,20)', tabulate=True).isTabulated)
+        self.assertFalse(Distribution(specs[0]).isTabulated)
+        self.assertEqual(0, Distribution(specs[0]).tableSize)
+
+    def test_pickle(self):
+        dists = [Distribution('scipy.stats.expon(scale=144)'),
+                 Distribution(scipy.stats.expon(scale=144)),
+                 Distribution(scipy.stats.gamma(2, scale=3), tabulate=True),
+                 Distribution(scipy.stats.poisson(5))]
+
+        for dist in dists:
+            with self.subTest(dist=dist.RNG):
+                copy = pickle.loads(pickle.dumps(dist))
+                self.assertEqual(dist.mean(), copy.mean())
+                self.assertEqual(dist.tableSize, copy.tableSize)
+
+                # the copy draws from the global state, like the original
+                np.random.seed(5)
+                expected = [dist.getEvent() for i in range(5)]
+                np.random.seed(5)
+                self.assertEqual(expected, [copy.getEvent() for i in range(5)])
+
+        # scipy distributions are pickled by name and parameters, not with their state, and
+        # tables are not pickled
+        self.assertLess(len(pickle.dumps(dists[1])), 1000)
+        self.assertGreater(dists[2].tableSize, 1000)
+        self.assertLess(len(pickle.dumps(dists[2])), 1000)
+
 
 if __name__ == '__main__':
     main(verbosity=2)
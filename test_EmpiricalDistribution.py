@@ -0,0 +1,170 @@
+from unittest import TestCase, main
+from Sim.EmpiricalDistribution import EmpiricalDistribution
+from Sim.Distribution import Distribution
+from Sim.RandomStreams import RandomStreams
+from Sim.SourcePopulation import SourcePopulation
+from Sim.Assigner import Assigner
+import numpy as np
+import os
+import pickle
+import tempfile
+
+
+class TestEmpiricalDistribution(TestCase):
+
+    def setUp(self) -> None:
+        np.random.seed(100)
+        self.dir = tempfile.TemporaryDirectory()
+        self.values = np.random.exponential(144, 10000)
+
+        self.npyPath = os.path.join(self.dir.name, 'service.npy')
+        np.save(self.npyPath, self.values)
+
+        self.rawPath = os.path.join(self.dir.name, 'service.bin')
+        self.values.tofile(self.rawPath)
+
+        self.sortedPath = os.path.join(self.dir.name, 'sorted.npy')
+        np.save(self.sortedPath, np.sort(self.values))
+
+    def tearDown(self) -> None:
+        self.dir.cleanup()
+
+    def test_init(self):
+        for path in [self.npyPath, self.rawPath]:
+            with self.subTest(path=path):
+                dist = EmpiricalDistribution(path)
+                self.assertTrue(isinstance(dist, Distribution))
+                self.assertTrue(dist.isValid())
+                self.assertEqual(path, dist.RNG)
+                self.assertEqual(10000, dist.numValues)
+                self.assertEqual('resample', dist.method)
+
+                # the data is mapped, not read into memory
+                self.assertTrue(isinstance(dist._data, np.memmap))
+
+        # arrays are accepted as is
+        self.assertTrue(EmpiricalDistribution(self.values).isValid())
+
+        # missing files, empty data and unknown methods
+        invalid = EmpiricalDistribution(os.path.join(self.dir.name, 'missing.npy'))
+        self.assertFalse(invalid.isValid())
+        self.assertTrue(invalid.RNG is None)
+        self.assertTrue(invalid.getEvent() is None)
+        self.assertFalse(EmpiricalDistribution(np.array([])).isValid())
+        self.assertEqual('resample', EmpiricalDistribution(self.values, 'kde').method)
+
+        # alias sampling requires one non-negative weight per value
+        self.assertFalse(EmpiricalDistribution(self.values, 'alias').isValid())
+        self.assertFalse(EmpiricalDistribution([1.0, 2.0], 'alias', weights=[1.0]).isValid())
+        self.assertFalse(EmpiricalDistribution(np.array([1.0, 2.0]), 'alias',
+                                               weights=np.array([1.0, -1.0])).isValid())
+
+    def test_resample(self):
+        dist = EmpiricalDistribution(self.npyPath)
+        draws = [dist.getEvent() for i in range(100)]
+        self.assertTrue(np.all(np.isin(draws, self.values)))
+        self.assertAlmostEqual(np.mean(self.values), dist.mean())
+
+        # uniforms map directly to observations
+        self.assertEqual(self.values[0], dist.ppf(np.array([0.0]))[0])
+        self.assertEqual(self.values[-1], dist.ppf(np.array([0.99999999]))[0])
+
+    def test_ecdf(self):
+        dist = EmpiricalDistribution(self.sortedPath, 'ecdf')
+        data = np.sort(self.values)
+
+        u = np.linspace(0, 0.999999, 1001)
+        quantiles = dist.ppf(u)
+        self.assertTrue(np.all(np.diff(quantiles) >= 0))
+        self.assertAlmostEqual(data[0], quantiles[0])
+        self.assertAlmostEqual(np.quantile(data, 0.5), dist.ppf(np.array([0.5]))[0])
+
+        # the mean of the interpolated inverse CDF matches the mean of its draws
+        self.assertAlmostEqual(dist.mean(), np.mean(dist.ppf((np.arange(100000) + 0.5) / 100000)),
+                               places=2)
+
+        stream = RandomStreams(1).getStream('service', 'Server0')
+        self.assertTrue(data[0] <= dist.getEvent(stream=stream) <= data[-1])
+
+        # unsorted data cannot be interpolated
+        for values in [np.array([5.0, 1.0, 9.0, 3.0]), np.array([1.0, np.nan, 3.0])]:
+            with self.subTest(values=values):
+                dist = EmpiricalDistribution(values, 'ecdf')
+                self.assertFalse(dist.isValid())
+                self.assertTrue(dist.getEvent() is None)
+
+        self.assertFalse(EmpiricalDistribution(self.npyPath, 'ecdf').isValid())
+        self.assertTrue(EmpiricalDistribution(np.array([4.0]), 'ecdf').isValid())
+
+        # the order is checked across the chunks the data is compared in
+        chunkSize = EmpiricalDistribution.CHUNK_SIZE
+        try:
+            EmpiricalDistribution.CHUNK_SIZE = 3
+            values = np.arange(9.0)
+            self.assertTrue(EmpiricalDistribution(values, 'ecdf').isValid())
+
+            values[3] = 1.5
+            self.assertFalse(EmpiricalDistribution(values, 'ecdf').isValid())
+        finally:
+            EmpiricalDistribution.CHUNK_SIZE = chunkSize
+
+    def test_alias(self):
+        values = np.array([10.0, 20.0, 30.0, 40.0])
+        weights = np.array([1.0, 2.0, 3.0, 4.0])
+        weightsPath = os.path.join(self.dir.name, 'weights.npy')
+        np.save(weightsPath, weights)
+
+        dist = EmpiricalDistribution(values, 'alias', weights=weightsPath)
+        self.assertTrue(dist.isValid())
+        self.assertAlmostEqual(30, dist.mean())
+
+        # every column of the table is split between the value and its alias in proportion
+        # to the weights
+        draws = dist.ppf((np.arange(100000) + 0.5) / 100000)
+        for i in range(4):
+            with self.subTest(i=i):
+                self.assertAlmostEqual(weights[i] / 10, np.mean(draws == values[i]), places=3)
+
+        # with many values, some with zero weight, the table gives each value exactly its
+        # share: its own part of its column plus the parts of the columns aliased to it
+        weights = np.random.pareto(1.0, 10000) * np.random.randint(0, 2, 10000)
+        dist = EmpiricalDistribution(np.arange(10000.0), 'alias', weights=weights)
+        self.assertTrue(dist.isValid())
+
+        mass = dist._probability.copy()
+        np.add.at(mass, dist._alias, 1 - dist._probability)
+        self.assertTrue(np.allclose(weights / np.sum(weights), mass / 10000, rtol=0, atol=1e-12))
+
+    def test_pickle(self):
+        dist = EmpiricalDistribution(self.npyPath)
+        state = pickle.dumps(dist)
+
+        # file-backed data is pickled by path, not by value
+        self.assertLess(len(state), 1000)
+
+        copy = pickle.loads(state)
+        self.assertTrue(copy.isValid())
+        self.assertTrue(isinstance(copy._data, np.memmap))
+        u = np.array([0.1, 0.5, 0.9])
+        self.assertTrue(np.array_equal(dist.ppf(u), copy.ppf(u)))
+
+        # nor is the alias table, which is rebuilt from the mapped weights
+        weightsPath = os.path.join(self.dir.name, 'weights.npy')
+        np.save(weightsPath, np.random.random_sample(10000))
+
+        dist = EmpiricalDistribution(self.npyPath, 'alias', weights=weightsPath)
+        state = pickle.dumps(dist)
+        self.assertLess(len(state), 1000)
+
+        copy = pickle.loads(state)
+        self.assertTrue(copy.isValid())
+        self.assertTrue(np.array_equal(dist.ppf(u), copy.ppf(u)))
+
+    def test_sourcePopulation(self):
+        sp = SourcePopulation('SP0', EmpiricalDistribution(self.rawPath), Assigner().assignInSequence)
+        self.assertFalse(sp._arrivalTimeDistribution is None)
+        self.assertTrue(np.isin(sp._nextArrivalTime, self.values))
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
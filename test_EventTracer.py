@@ -0,0 +1,147 @@
+import os
+import struct
+import tempfile
+from unittest import TestCase, main
+from Sim.EventTracer import EventTracer
+from Sim.EventTraceReader import EventTraceReader
+from Sim.Customer import Customer
+from Sim.Simulation import Simulation
+from Sim.SourcePopulation import SourcePopulation
+from Sim.SystemExit import SystemExit
+from Sim.SimQueue import SimQueue
+from Sim.Assigner import Assigner
+from Sim.Distribution import Distribution
+from Sim.Server import Server
+from Sim.RandomStreams import RandomStreams
+
+
+class TestEventTracer(TestCase):
+
+    def setUp(self) -> None:
+        self.dist = {}
+        self.dist['ar'] = Distribution("scipy.stats.expon(scale=180)")
+        self.dist['dt'] = Distribution("scipy.stats.triang(c=0, loc=14400, scale= 3600)")
+        self.dist['oos'] = Distribution("scipy.stats.triang(c=1/3, loc=300, scale= 900)")
+        self.dist['st'] = Distribution("scipy.stats.expon(scale=144)")
+
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'events.trace')
+
+    def tearDown(self) -> None:
+        self.dir.cleanup()
+
+    def buildSim(self):
+        sim = Simulation()
+        sim.setRandomStreams(RandomStreams(11))
+
+        se = SystemExit('SE0')
+        queue = SimQueue('Q0', Assigner().assignInSequence)
+        queue.assignServer = Assigner().assignByAvailableTime
+        queue.addCustomerDestination(se)
+
+        sp = SourcePopulation('SP0', self.dist['ar'], Assigner().assignInSequence)
+        sp.addCustomerDestination(queue)
+
+        for stage in [sp, queue, se]:
+            sim.addStage(stage)
+
+        for i in range(2):
+            queue.addServer(Server(f'Server{i}', 0, self.dist['dt'], self.dist['oos'], self.dist['st']))
+
+        return sim
+
+    def test_roundTrip(self):
+        # a chunk size of 4 writes the 10 events in three chunks
+        tracer = EventTracer(self.path, chunkSize=4)
+        self.assertTrue(tracer.isValid())
+        self.assertTrue(isinstance(tracer.__str__(), str))
+
+        customers = [Customer(i, i, source='SP0') for i in range(10)]
+        for i, cust in enumerate(customers):
+            tracer.record(i * 0.5, i % 2, i % 3 - 1, EventTracer.ARRIVAL, cust)
+
+        self.assertEqual(10, tracer.numEvents)
+        tracer.close()
+        self.assertFalse(tracer.isValid())
+
+        reader = EventTraceReader(self.path)
+        self.assertTrue(reader.isValid())
+        self.assertEqual(10, len(reader))
+        self.assertEqual([i * 0.5 for i in range(10)], reader.simtime.tolist())
+        self.assertEqual([i % 2 for i in range(10)], reader.stage.tolist())
+        self.assertEqual([i % 3 - 1 for i in range(10)], reader.server.tolist())
+        self.assertEqual([c.key for c in customers],
+                         [reader.getCustomerKey(c) for c in reader.customer])
+        self.assertEqual(list(range(10)), reader.customer.tolist())
+        self.assertEqual('ARRIVAL', reader.getEventName(reader.eventType[0]))
+
+        # Customers identified by name, and events without a Customer, are recorded as -1
+        tracer = EventTracer(self.path)
+        tracer.record(1.0, 0, -1, EventTracer.ARRIVAL, Customer('Cust1', 1.0))
+        tracer.record(2.0, 0, -1, EventTracer.SERVER_DOWN, None)
+        tracer.close()
+        reader = EventTraceReader(self.path)
+        self.assertEqual([-1, -1], reader.customer.tolist())
+        self.assertEqual(None, reader.getCustomerKey(-1))
+
+    def test_unclosed(self):
+        tracer = EventTracer(self.path, chunkSize=3)
+        for i in range(7):
+            tracer.record(i, 0, -1, EventTracer.ARRIVAL, None)
+
+        # only the complete chunks were written, and the trace has no footer
+        reader = EventTraceReader(self.path)
+        self.assertTrue(reader.isValid())
+        self.assertEqual(6, reader.numEvents)
+        self.assertEqual(None, reader.getStageId(0))
+        tracer.close()
+
+        # traces of another version are not read
+        with open(self.path, 'r+b') as file:
+            file.seek(len(EventTracer.MAGIC))
+            file.write(struct.pack('<I', EventTracer.VERSION + 1))
+        self.assertFalse(EventTraceReader(self.path).isValid())
+
+        for path in [os.path.join(self.dir.name, 'missing.trace'), __file__]:
+            with self.subTest(path=path):
+                reader = EventTraceReader(path)
+                self.assertFalse(reader.isValid())
+                self.assertEqual(0, len(reader))
+                self.assertEqual(None, reader.simtime)
+
+    def test_run(self):
+        sim = self.buildSim()
+        tracer = EventTracer(self.path, chunkSize=64)
+        self.assertTrue(sim.setTracer(tracer))
+        self.assertTrue(sim.tracer is tracer)
+        self.assertFalse(sim.setTracer('tracer'))
+
+        sim.run(maxEvents=300)
+        tracer.close()
+
+        # every event of the run is traced, in order
+        reader = EventTraceReader(self.path)
+        self.assertEqual(300, reader.numEvents)
+        self.assertTrue((reader.simtime[1:] >= reader.simtime[:-1]).all())
+        self.assertEqual({0: 'SP0', 1: 'Q0', 2: 'SE0'}, reader.stageIds)
+        self.assertEqual('Server1', reader.getServerId(1, 1))
+        self.assertEqual(None, reader.getServerId(1, 2))
+
+        arrivals = reader.eventType == EventTracer.ARRIVAL
+        completions = reader.eventType == EventTracer.SERVICE_COMPLETION
+        self.assertTrue((reader.stage[arrivals] == 0).all())
+        self.assertTrue((reader.stage[completions] == 1).all())
+        self.assertEqual(len(list(sim)), completions.sum())
+        self.assertEqual(sorted(c.key for c in sim),
+                         sorted(reader.getCustomerKey(c) for c in reader.customer[completions]))
+
+        # traced runs process the same events, and identify Customers by the same keys,
+        # as plain runs
+        other = self.buildSim()
+        other.run(maxEvents=300)
+        self.assertEqual([c.systemArrivalTime for c in other], [c.systemArrivalTime for c in sim])
+        self.assertEqual([c.key for c in other], [c.key for c in sim])
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
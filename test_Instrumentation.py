@@ -0,0 +1,101 @@
+import math
+from unittest import TestCase, main
+from Sim.Instrumentation import Instrumentation
+from Sim.Simulation import Simulation
+from Sim.SourcePopulation import SourcePopulation
+from Sim.SystemExit import SystemExit
+from Sim.SimQueue import SimQueue
+from Sim.QueueEvent import QueueEvent
+from Sim.Assigner import Assigner
+from Sim.Distribution import Distribution
+from Sim.Server import Server
+from Sim.RandomStreams import RandomStreams
+
+
+class TestInstrumentation(TestCase):
+
+    def setUp(self) -> None:
+        self.dist = {}
+        self.dist['ar'] = Distribution("scipy.stats.expon(scale=180)")
+        self.dist['dt'] = Distribution("scipy.stats.triang(c=0, loc=14400, scale= 3600)")
+        self.dist['oos'] = Distribution("scipy.stats.triang(c=1/3, loc=300, scale= 900)")
+        self.dist['st'] = Distribution("scipy.stats.expon(scale=144)")
+
+        self.instrumentation = Instrumentation()
+        self.assertTrue(isinstance(self.instrumentation.__str__(), str))
+        self.assertTrue(isinstance(self.instrumentation.__repr__(), str))
+
+    def buildSim(self):
+        sim = Simulation()
+        sim.setRandomStreams(RandomStreams(11))
+
+        se = SystemExit('SE0')
+        queue = SimQueue('Q0', Assigner().assignInSequence)
+        queue.assignServer = Assigner().assignByAvailableTime
+        queue.addCustomerDestination(se)
+
+        sp = SourcePopulation('SP0', self.dist['ar'], Assigner().assignInSequence)
+        sp.addCustomerDestination(queue)
+
+        for stage in [sp, queue, se]:
+            sim.addStage(stage)
+
+        for i in range(2):
+            queue.addServer(Server(f'Server{i}', 0, self.dist['dt'], self.dist['oos'], self.dist['st']))
+
+        return sim
+
+    def test_recordEvent(self):
+        # a fake clock advancing one second per reading
+        ticks = iter(range(100))
+        instrumentation = Instrumentation(clock=lambda: next(ticks))
+        self.assertTrue(math.isnan(instrumentation.eventRate))
+
+        instrumentation.startRun()
+        instrumentation.recordEvent('SP0', Instrumentation.ARRIVAL, 0.5)
+        instrumentation.recordEvent('Q0', QueueEvent.SERVICE_COMPLETION, 0.25)
+        instrumentation.recordEvent('Q0', QueueEvent.SERVICE_COMPLETION, 0.25)
+        instrumentation.stopRun()
+
+        self.assertEqual(3, instrumentation.numEvents)
+        self.assertEqual(1, instrumentation.wallTime)
+        self.assertEqual(3, instrumentation.eventRate)
+        self.assertEqual({'SP0': 1, 'Q0': 2}, instrumentation.stageCounts)
+        self.assertEqual({'SP0': 0.5, 'Q0': 0.5}, instrumentation.stageTimes)
+        self.assertEqual(2, instrumentation.eventTypeCounts[('Q0', QueueEvent.SERVICE_COMPLETION)])
+        self.assertIn('SERVICE_COMPLETION', instrumentation.report())
+
+        instrumentation.reset()
+        self.assertEqual(0, instrumentation.numEvents)
+        self.assertEqual({}, instrumentation.stageCounts)
+
+    def test_run(self):
+        sim = self.buildSim()
+        self.assertTrue(sim.setInstrumentation(self.instrumentation))
+        self.assertTrue(sim.instrumentation is self.instrumentation)
+        self.assertFalse(sim.setInstrumentation('profiler'))
+
+        sim.run(maxEvents=300)
+
+        # every event is attributed to a stage and an event type
+        self.assertEqual(300, self.instrumentation.numEvents)
+        self.assertEqual(300, sum(self.instrumentation.stageCounts.values()))
+        self.assertEqual(300, sum(self.instrumentation.eventTypeCounts.values()))
+        self.assertGreater(self.instrumentation.eventTypeCounts[('SP0', Instrumentation.ARRIVAL)], 0)
+        self.assertGreater(self.instrumentation.eventTypeCounts[('Q0', QueueEvent.SERVICE_COMPLETION)], 0)
+        self.assertGreater(self.instrumentation.eventRate, 0)
+
+        # instrumented runs process the same events as plain runs
+        other = self.buildSim()
+        other.run(maxEvents=300)
+        self.assertEqual([c.systemArrivalTime for c in other], [c.systemArrivalTime for c in sim])
+
+        # once disabled, nothing more is recorded
+        sim.setInstrumentation(None)
+        sim.run(maxEvents=400)
+        self.assertEqual(300, self.instrumentation.numEvents)
+        self.assertEqual(400, sim.getTrialsCompleted())
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
@@ -0,0 +1,178 @@
+import copy
+import json
+import os
+import pickle
+import tempfile
+from unittest import TestCase, main
+from Sim.ModelLoader import ModelLoader
+from Sim.Simulation import Simulation
+from Sim.SimQueue import SimQueue
+from Sim.ServerPool import ServerPool
+from Sim.RandomStreams import RandomStreams
+
+
+class TestModelLoader(TestCase):
+
+    def setUp(self) -> None:
+        self.model = {
+            'seed': 100,
+            'distributions': {'service': 'scipy.stats.expon(scale=144)'},
+            'stages': [
+                {'type': 'SourcePopulation', 'id': 'SP0', 'dist': 'scipy.stats.expon(scale=180)',
+                 'assignDestination': 'assignInSequence', 'destinations': ['Q0']},
+                {'type': 'SimQueue', 'id': 'Q0', 'assignDestination': 'assignInSequence',
+                 'assignServer': 'assignByAvailableTime', 'capacity': 20,
+                 'overflowDestination': 'SE1', 'destinations': ['SE0'],
+                 'servers': [{'id': 'Server', 'count': 2,
+                              'downTimeDist': 'scipy.stats.triang(c=0, loc=14400, scale=3600)',
+                              'oosDist': 'scipy.stats.triang(c=1/3, loc=300, scale=900)',
+                              'svcTimeDist': 'service'}]},
+                {'type': 'SystemExit', 'id': 'SE0'},
+                {'type': 'SystemExit', 'id': 'SE1'}]}
+
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.dir.cleanup()
+
+    def test_build(self):
+        loader = ModelLoader(self.model)
+        self.assertTrue(loader.isValid(), loader.errors)
+        self.assertEqual(4, loader.numStages)
+        self.assertTrue(isinstance(loader.__str__(), str))
+
+        sim = loader.build()
+        self.assertTrue(isinstance(sim, Simulation))
+
+        queue = [stage for stage in sim._stages.values() if isinstance(stage, SimQueue)][0]
+        self.assertEqual(2, queue.getNumAvailableServers())
+
+        sim.run(maxEvents=500)
+        self.assertGreater(len(list(sim)), 50)
+
+        # every build is a new, independent Simulation reproducing the same run
+        other = loader.build()
+        other.run(maxEvents=500)
+        self.assertEqual([c.systemArrivalTime for c in sim],
+                         [c.systemArrivalTime for c in other])
+
+        # builds accept the streams argument passed by ReplicationRunner
+        self.assertTrue(isinstance(loader.build(RandomStreams(5)), Simulation))
+
+    def test_serverPool(self):
+        self.model['stages'][1]['servers'] = [{'id': 'Pool', 'numServers': 5,
+                                               'svcTimeDist': 'service'}]
+
+        sim = ModelLoader(self.model).build()
+        queue = [stage for stage in sim._stages.values() if isinstance(stage, SimQueue)][0]
+        self.assertTrue(isinstance(queue.servers["Pool"], ServerPool))
+        self.assertEqual(5, queue.getNumAvailableServers())
+
+        sim.run(maxEvents=200)
+        self.assertGreater(len(list(sim)), 20)
+
+    def test_file(self):
+        path = os.path.join(self.dir.name, 'model.json')
+        with open(path, 'w') as file:
+            json.dump(self.model, file)
+
+        loader = ModelLoader(path)
+        self.assertTrue(loader.isValid(), loader.errors)
+        self.assertTrue(isinstance(loader.build(), Simulation))
+
+        for model in [os.path.join(self.dir.name, 'missing.json'), 42]:
+            with self.subTest(model=model):
+                loader = ModelLoader(model)
+                self.assertFalse(loader.isValid())
+                self.assertEqual(1, len(loader.errors))
+                self.assertEqual(None, loader.build())
+
+        path = os.path.join(self.dir.name, 'broken.json')
+        with open(path, 'w') as file:
+            file.write('{"stages": [')
+
+        self.assertFalse(ModelLoader(path).isValid())
+
+    def test_invalid(self):
+        changes = {'type': lambda m: m['stages'][0].update(type='Queue'),
+                   'argument': lambda m: m['stages'][0].update(rate=3),
+                   'distribution': lambda m: m['stages'][0].update(dist='scipy.stats.nope(1)'),
+                   'assigner': lambda m: m['stages'][1].update(assignServer='assignAtRandom'),
+                   'destination': lambda m: m['stages'][0].update(destinations=['Q9']),
+                   'overflow': lambda m: m['stages'][1].update(overflowDestination='Q9'),
+                   'servers': lambda m: m['stages'][1].update(servers=[]),
+                   'count': lambda m: m['stages'][1]['servers'][0].update(count='2'),
+                   'duplicate': lambda m: m['stages'][3].update(id='SE0'),
+                   'unhashable': lambda m: m['stages'][0].update(destinations=[['Q0']]),
+                   'negative': lambda m: m['stages'][1].update(capacity=-3),
+                   'capacity': lambda m: m['stages'][1].update(capacity='ten'),
+                   'options': lambda m: m['distributions'].update(
+                       service={'data': [1.0, 2.0], 'bins': 10}),
+                   'empty': lambda m: m.update(stages=[])}
+
+        for name, change in changes.items():
+            with self.subTest(change=name):
+                model = copy.deepcopy(self.model)
+                change(model)
+
+                loader = ModelLoader(model)
+                self.assertFalse(loader.isValid())
+                self.assertGreater(len(loader.errors), 0)
+                self.assertEqual(None, loader.build())
+
+    def test_cycle(self):
+        self.model['stages'].append({'type': 'SimQueue', 'id': 'Q1',
+                                     'assignDestination': 'assignInSequence',
+                                     'assignServer': 'assignInSequence', 'destinations': ['SE0'],
+                                     'overflowDestination': 'Q0',
+                                     'servers': [{'id': 'Server9', 'svcTimeDist': 'service'}]})
+        self.model['stages'][1]['overflowDestination'] = 'Q1'
+
+        loader = ModelLoader(self.model)
+        self.assertFalse(loader.isValid())
+        self.assertTrue(any('circular' in error for error in loader.errors))
+
+    def test_cache(self):
+        path = os.path.join(self.dir.name, 'model.cache')
+
+        loader = ModelLoader(self.model, cachePath=path)
+        self.assertFalse(loader.fromCache)
+        self.assertTrue(os.path.exists(path))
+
+        cached = ModelLoader(self.model, cachePath=path)
+        self.assertTrue(cached.fromCache)
+        self.assertTrue(cached.isValid())
+
+        # stages draw from the global random state, so each build is run before the next
+        sim1 = loader.build()
+        sim1.run(maxEvents=300)
+        sim2 = cached.build()
+        sim2.run(maxEvents=300)
+        self.assertEqual([c.systemArrivalTime for c in sim1],
+                         [c.systemArrivalTime for c in sim2])
+
+        # a cache that cannot be read, or does not hold a compiled model, is ignored and
+        # replaced; a forged cache with the right digest is not trusted to be complete
+        with open(path, 'rb') as file:
+            digest = pickle.load(file)['digest']
+
+        for contents in [b'not a pickle', pickle.dumps([1, 2]),
+                         pickle.dumps({'digest': digest, 'stages': [{'type': 'SimQueue'}],
+                                       'order': [0]}),
+                         pickle.dumps({'digest': digest, 'stages': 'SP0', 'order': 'SP0'})]:
+            with self.subTest(contents=contents):
+                with open(path, 'wb') as file:
+                    file.write(contents)
+
+                loader = ModelLoader(self.model, cachePath=path)
+                self.assertFalse(loader.fromCache)
+                self.assertTrue(loader.isValid())
+
+        # a changed definition is compiled again and replaces the cache
+        self.model['seed'] = 101
+        self.assertFalse(ModelLoader(self.model, cachePath=path).fromCache)
+        self.assertTrue(ModelLoader(self.model, cachePath=path).fromCache)
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
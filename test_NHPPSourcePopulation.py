@@ -0,0 +1,117 @@
+from unittest import TestCase, main
+from Sim.NHPPSourcePopulation import NHPPSourcePopulation
+from Sim.SourcePopulation import SourcePopulation
+from Sim.RandomStreams import RandomStreams
+from Sim.SystemExit import SystemExit
+from Sim.Assigner import Assigner
+import numpy as np
+import math
+
+
+class TestNHPPSourcePopulation(TestCase):
+
+    def setUp(self) -> None:
+        np.random.seed(100)
+
+        # daily cycle in hours: quiet night, busy day, moderate evening
+        self.times = [0, 8, 18]
+        self.rates = [5, 60, 20]
+
+    def arrivals(self, sp, n):
+        times = []
+        for i in range(n):
+            t = sp._nextArrivalTime
+            times.append(t)
+            sp.processEvent(t)
+
+        return np.array(times)
+
+    def test_init(self):
+        sp = NHPPSourcePopulation('SP0', self.times, self.rates, Assigner().assignInSequence, period=24)
+        self.assertTrue(isinstance(sp, SourcePopulation))
+        self.assertFalse(sp.isValid())
+        sp.addCustomerDestination(SystemExit('SE0'))
+        self.assertTrue(sp.isValid())
+        self.assertGreater(sp.getNextEventTime(), 0)
+
+        self.assertEqual(5, sp.getRate(3))
+        self.assertEqual(60, sp.getRate(8))
+        self.assertEqual(20, sp.getRate(23))
+        self.assertEqual(60, sp.getRate(24 + 10))
+
+        # invalid rate specifications
+        invalid = [([0, 8], [5]),                   # lengths differ
+                   ([1, 8], [5, 6]),                # does not start at 0
+                   ([0, 8, 8], [5, 6, 7]),          # not ascending
+                   ([0, 8], [5, -1]),               # negative rate
+                   ([0, 8], [5, 0])]                # no arrivals after the last time
+        for times, rates in invalid:
+            with self.subTest(times=times, rates=rates):
+                sp = NHPPSourcePopulation('SP0', times, rates, Assigner().assignInSequence)
+                sp.addCustomerDestination(SystemExit('SE0'))
+                self.assertFalse(sp.isValid())
+
+        # the period must cover the specified times
+        self.assertFalse(NHPPSourcePopulation('SP0', self.times, self.rates, Assigner().assignInSequence,
+                                              period=12)._valid)
+        self.assertFalse(NHPPSourcePopulation('SP0', self.times, self.rates, Assigner().assignInSequence,
+                                              kind='linear')._valid)
+
+    def test_piecewise(self):
+        sp = NHPPSourcePopulation('SP0', self.times, self.rates, Assigner().assignInSequence,
+                                  period=24, blockSize=500)
+        sp.addCustomerDestination(SystemExit('SE0'))
+
+        # expected arrivals per day: 8 * 5 + 10 * 60 + 6 * 20 = 760
+        t = self.arrivals(sp, 7600)
+        self.assertTrue(np.all(np.diff(t) >= 0))
+        self.assertAlmostEqual(10, t[-1] / 24, delta=0.5)
+
+        # arrivals per period of the day are proportional to the integrated rate
+        hour = np.mod(t, 24)
+        days = t[-1] / 24
+        self.assertAlmostEqual(40, np.sum(hour < 8) / days, delta=8)
+        self.assertAlmostEqual(600, np.sum((hour >= 8) & (hour < 18)) / days, delta=40)
+        self.assertAlmostEqual(120, np.sum(hour >= 18) / days, delta=20)
+
+        # a zero rate produces no arrivals
+        sp = NHPPSourcePopulation('SP0', [0, 10], [0, 2], Assigner().assignInSequence)
+        sp.addCustomerDestination(SystemExit('SE0'))
+        self.assertTrue(np.all(self.arrivals(sp, 100) >= 10))
+
+    def test_spline(self):
+        sp = NHPPSourcePopulation('SP0', [0, 6, 12, 18], [10, 40, 80, 40], Assigner().assignInSequence,
+                                  kind='spline', period=24, blockSize=256)
+        sp.addCustomerDestination(SystemExit('SE0'))
+        self.assertAlmostEqual(80, sp.getRate(12))
+        self.assertAlmostEqual(sp.getRate(1), sp.getRate(25))
+
+        grid = np.linspace(0, 24, 10001)
+        expected = np.mean(sp.getRate(grid)) * 24
+
+        # thinning is bounded by the spline's maximum, which may lie between the knots
+        for other in [sp, NHPPSourcePopulation('SP1', [0, 1, 2, 3], [5, 1, 30, 2],
+                                               Assigner().assignInSequence, kind='spline')]:
+            rates = other.getRate(np.linspace(0, 24, 100001))
+            self.assertGreaterEqual(other._maxRate, np.max(rates))
+            self.assertAlmostEqual(np.max(rates), other._maxRate, places=4)
+
+        t = self.arrivals(sp, 20000)
+        self.assertTrue(np.all(np.diff(t) >= 0))
+        self.assertAlmostEqual(expected, len(t) / (t[-1] / 24), delta=0.03 * expected)
+
+    def test_setRandomStreams(self):
+        first = []
+        for i in range(2):
+            sp = NHPPSourcePopulation('SP0', self.times, self.rates, Assigner().assignInSequence,
+                                      period=24, blockSize=64)
+            sp.addCustomerDestination(SystemExit('SE0'))
+            sp.setRandomStreams(RandomStreams(42))
+            first.append(self.arrivals(sp, 200))
+
+        # identically seeded streams reproduce the same arrivals
+        self.assertTrue(np.array_equal(first[0], first[1]))
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
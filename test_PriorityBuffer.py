@@ -0,0 +1,52 @@
+from unittest import TestCase, main
+from Sim.PriorityBuffer import PriorityBuffer
+from Sim.Customer import Customer
+
+
+class TestPriorityBuffer(TestCase):
+
+    def setUp(self) -> None:
+        # customers of classes 2, 0, 1, 0, 2, 1 arriving in that order
+        self.cust = [Customer(f'Cust{i}', i * 10, priority=p)
+                     for i, p in enumerate([2, 0, 1, 0, 2, 1])]
+
+    def test_init(self):
+        buffer = PriorityBuffer()
+        self.assertTrue(isinstance(buffer.__str__(), str))
+        self.assertEqual(0, len(buffer))
+        self.assertListEqual([], list(buffer))
+
+        with self.assertRaises(IndexError):
+            buffer.popleft()
+
+    def test_popleft(self):
+        buffer = PriorityBuffer()
+        for cust in self.cust:
+            buffer.append(cust)
+
+        self.assertEqual(6, len(buffer))
+
+        # served in priority order, first come first served within a class
+        expected = ['Cust1', 'Cust3', 'Cust2', 'Cust5', 'Cust0', 'Cust4']
+        self.assertListEqual(expected, [cust.name for cust in buffer])
+        self.assertEqual('Cust1', buffer[0].name)
+        self.assertEqual('Cust4', buffer[-1].name)
+
+        served = [buffer.popleft().name for i in range(6)]
+        self.assertListEqual(expected, served)
+        self.assertEqual(0, len(buffer))
+
+    def test_appendleft(self):
+        buffer = PriorityBuffer()
+        for cust in self.cust[2:5]:
+            buffer.append(cust)
+
+        # an interrupted customer returns to the front of its own class only
+        buffer.appendleft(self.cust[0])
+        buffer.appendleft(self.cust[5])
+        self.assertListEqual(['Cust3', 'Cust5', 'Cust2', 'Cust0', 'Cust4'],
+                             [cust.name for cust in buffer])
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
@@ -0,0 +1,100 @@
+from unittest import TestCase, main
+from Sim.QuasiRandomStreams import QuasiRandomStreams
+from Sim.QuasiRandomStream import QuasiRandomStream
+from Sim.ReplicationRunner import ReplicationRunner
+from Sim.Simulation import Simulation
+from Sim.SourcePopulation import SourcePopulation
+from Sim.SystemExit import SystemExit
+from Sim.SimQueue import SimQueue
+from Sim.Assigner import Assigner
+from Sim.Distribution import Distribution
+from Sim.Server import Server
+import numpy as np
+
+
+def buildSimulation(streams):
+    sim = Simulation()
+    sim.setRandomStreams(streams)
+    assigner = Assigner()
+
+    se = SystemExit('SE0')
+    queue = SimQueue('Q0', assigner.assignInSequence)
+    queue.assignServer = assigner.assignByAvailableTime
+    queue.addCustomerDestination(se)
+    queue.addServer(Server('Server0', 0,
+                           Distribution("scipy.stats.triang(c=0, loc=14400, scale= 3600)"),
+                           Distribution("scipy.stats.triang(c=1/3, loc=300, scale= 900)"),
+                           Distribution("scipy.stats.expon(scale=144)")))
+
+    sp = SourcePopulation('SP0', Distribution("scipy.stats.expon(scale=180)"),
+                          assigner.assignInSequence)
+    sp.addCustomerDestination(queue)
+
+    for stage in [sp, queue, se]:
+        sim.addStage(stage)
+
+    return sim
+
+
+class TestQuasiRandomStreams(TestCase):
+
+    def points(self, method, n, count):
+        return np.array([QuasiRandomStreams(100, rep, n, method, dimension=8)
+                         .getStream('service', 'Server0').uniforms(count) for rep in range(n)])
+
+    def test_getStream(self):
+        streams = QuasiRandomStreams(100, 2, 8, 'lhs', dimension=8)
+        self.assertEqual('lhs', streams.method)
+        self.assertEqual(2, streams.replication)
+
+        stream = streams.getStream('arrival', 'SP0')
+        self.assertTrue(isinstance(stream, QuasiRandomStream))
+        self.assertEqual(8, stream.dimension)
+        self.assertTrue(stream is streams.getStream('arrival', 'SP0'))
+
+        # unknown methods fall back to Sobol points
+        self.assertEqual('sobol', QuasiRandomStreams(100, method='halton').method)
+
+    def test_latinHypercube(self):
+        points = self.points('lhs', 10, 8)
+
+        # every coordinate places exactly one replication in each of the 10 strata
+        for d in range(8):
+            with self.subTest(d=d):
+                strata = np.sort(np.floor(points[:, d] * 10))
+                self.assertTrue(np.array_equal(np.arange(10), strata))
+
+    def test_sobol(self):
+        points = self.points('sobol', 8, 8)
+        self.assertTrue(np.all((points > 0) & (points < 1)))
+
+        # scrambled Sobol points are balanced: one point per stratum of width 1/8
+        for d in range(8):
+            with self.subTest(d=d):
+                strata = np.sort(np.floor(points[:, d] * 8))
+                self.assertTrue(np.array_equal(np.arange(8), strata))
+
+    def test_uniforms(self):
+        # after the quasi-random coordinates, each replication continues pseudo-randomly
+        points = self.points('sobol', 4, 12)
+        self.assertTrue(np.all((points > 0) & (points < 1)))
+        self.assertEqual(4, len(np.unique(points[:, 10])))
+
+        # antithetic streams mirror both the quasi-random and pseudo-random uniforms
+        u = QuasiRandomStreams(100, 1, 4, 'lhs', 8).getStream('oos', 'S').uniforms(12)
+        v = QuasiRandomStreams(100, 1, 4, 'lhs', 8, antithetic=True).getStream('oos', 'S').uniforms(12)
+        self.assertTrue(np.allclose(1, u + v))
+
+    def test_run(self):
+        runner = ReplicationRunner(buildSimulation, 100)
+        estimates = runner.run(4, maxEvents=100, sampling='lhs', controlVariates=False)
+        self.assertEqual(4, runner.numReplications)
+        self.assertTrue(np.isfinite(estimates['AvgSystemTime']))
+
+        # replications use distinct points and therefore give distinct results
+        values = [r['AvgSystemTime'] for r in runner.getReplicationResults()]
+        self.assertEqual(4, len(np.unique(values)))
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
@@ -8,8 +8,9 @@ class TestQueueEvent(TestCase):
         self.assertTrue('SERVICE_COMPLETION' in QueueEvent.__members__)
         self.assertTrue('SERVER_DOWN' in QueueEvent.__members__)
         self.assertTrue('SERVER_UP' in QueueEvent.__members__)
+        self.assertTrue('ABANDONMENT' in QueueEvent.__members__)
 
-        self.assertEqual(3, len(QueueEvent.__members__))
+        self.assertEqual(4, len(QueueEvent.__members__))
 
 
 if __name__ == '__main__':
@@ -0,0 +1,104 @@
+from unittest import TestCase, main
+from Sim.RandomStreams import RandomStreams
+from Sim.RandomStream import RandomStream
+from Sim.Simulation import Simulation
+from Sim.SimulationAnalysis import SimulationAnalysis
+from Sim.SourcePopulation import SourcePopulation
+from Sim.SystemExit import SystemExit
+from Sim.SimQueue import SimQueue
+from Sim.Assigner import Assigner
+from Sim.Distribution import Distribution
+from Sim.Server import Server
+import numpy as np
+
+
+class TestRandomStreams(TestCase):
+
+    def setUp(self) -> None:
+        self.dist = {}
+        self.dist['ar'] = Distribution("scipy.stats.expon(scale=180)")
+        self.dist['dt'] = Distribution("scipy.stats.triang(c=0, loc=14400, scale= 3600)")
+        self.dist['oos'] = Distribution("scipy.stats.triang(c=1/3, loc=300, scale= 900)")
+        self.dist['st'] = Distribution("scipy.stats.expon(scale=144)")
+
+    def buildSim(self, streams, numServers):
+        sim = Simulation()
+        assigner = Assigner()
+
+        se = SystemExit('SE0')
+        queue = SimQueue('Q0', assigner.assignInSequence)
+        queue.assignServer = assigner.assignByAvailableTime
+        queue.addCustomerDestination(se)
+
+        sp = SourcePopulation('SP0', self.dist['ar'], assigner.assignInSequence)
+        sp.addCustomerDestination(queue)
+
+        sim.setRandomStreams(streams)
+
+        for stage in [sp, queue, se]:
+            sim.addStage(stage)
+
+        # servers added after the queue joins the simulation also receive streams
+        for i in range(numServers):
+            queue.addServer(Server(f'Server{i}', 0, self.dist['dt'],
+                                   self.dist['oos'], self.dist['st']))
+
+        return sim
+
+    def test_getStream(self):
+        streams = RandomStreams(100)
+        self.assertEqual(100, streams.seed)
+
+        stream = streams.getStream('service', 'Server0')
+        self.assertTrue(isinstance(stream, RandomStream))
+        self.assertTrue(stream is streams.getStream('service', 'Server0'))
+        self.assertEqual(1, streams.numStreams)
+
+        # streams for different purposes are independent
+        other = streams.getStream('arrival', 'Server0')
+        self.assertFalse(np.array_equal(stream.uniforms(10), other.uniforms(10)))
+
+        # the same purpose and id produce the same numbers for the same seed
+        u1 = RandomStreams(100).getStream('arrival', 'SP0').uniforms(100)
+        u2 = RandomStreams(100).getStream('arrival', 'SP0').uniforms(100)
+        u3 = RandomStreams(101).getStream('arrival', 'SP0').uniforms(100)
+        self.assertTrue(np.array_equal(u1, u2))
+        self.assertFalse(np.array_equal(u1, u3))
+        self.assertTrue(np.all((u1 > 0) & (u1 < 1)))
+
+        # an unseeded factory still records its seed
+        self.assertFalse(RandomStreams().seed is None)
+
+    def test_getEvent(self):
+        stream = RandomStreams(5).getStream('service', 'Server0')
+        u = RandomStreams(5).getStream('service', 'Server0').uniforms(3)
+
+        for i in range(3):
+            with self.subTest(i=i):
+                self.assertAlmostEqual(-144 * np.log(1 - u[i]),
+                                       self.dist['st'].getEvent(stream=stream))
+
+    def test_commonRandomNumbers(self):
+        sim1 = self.buildSim(RandomStreams(42), 1)
+        sim2 = self.buildSim(RandomStreams(42), 2)
+
+        # unrelated use of the global random state does not affect the streams
+        np.random.seed(7)
+        sim1.run(maxEvents=300)
+        np.random.seed(8)
+        sim2.run(maxEvents=300)
+
+        # both configurations see the same arrival process
+        arrivals1 = sorted(c.systemArrivalTime for c in sim1)
+        arrivals2 = sorted(c.systemArrivalTime for c in sim2)
+        n = min(len(arrivals1), len(arrivals2))
+        self.assertGreater(n, 50)
+        self.assertTrue(np.allclose(arrivals1[:n], arrivals2[:n]))
+
+        # adding a server can only reduce waiting under common random numbers
+        diffs = SimulationAnalysis(sim1).comparePerformance(sim2)
+        self.assertGreater(diffs['AvgWaitTime'], 0)
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
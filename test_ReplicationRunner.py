@@ -0,0 +1,133 @@
+from unittest import TestCase, main
+from Sim.ReplicationRunner import ReplicationRunner
+from Sim.RandomStreams import RandomStreams
+from Sim.SimulationAnalysis import SimulationAnalysis
+from Sim.Simulation import Simulation
+from Sim.SourcePopulation import SourcePopulation
+from Sim.SystemExit import SystemExit
+from Sim.SimQueue import SimQueue
+from Sim.Assigner import Assigner
+from Sim.Distribution import Distribution
+from Sim.Server import Server
+import numpy as np
+
+
+def buildSimulation(streams):
+    sim = Simulation()
+    sim.setRandomStreams(streams)
+    assigner = Assigner()
+
+    se = SystemExit('SE0')
+    queue = SimQueue('Q0', assigner.assignInSequence)
+    queue.assignServer = assigner.assignByAvailableTime
+    queue.addCustomerDestination(se)
+    queue.addServer(Server('Server0', 0,
+                           Distribution("scipy.stats.triang(c=0, loc=14400, scale= 3600)"),
+                           Distribution("scipy.stats.triang(c=1/3, loc=300, scale= 900)"),
+                           Distribution("scipy.stats.expon(scale=144)")))
+
+    sp = SourcePopulation('SP0', Distribution("scipy.stats.expon(scale=180)"),
+                          assigner.assignInSequence)
+    sp.addCustomerDestination(queue)
+
+    for stage in [sp, queue, se]:
+        sim.addStage(stage)
+
+    return sim
+
+
+class TestReplicationRunner(TestCase):
+
+    def test_init(self):
+        runner = ReplicationRunner(buildSimulation, 100)
+        self.assertTrue(runner.isValid())
+        self.assertEqual(100, runner.seed)
+        self.assertEqual(0, runner.numReplications)
+        self.assertEqual({}, runner.getEstimates())
+        self.assertEqual({}, runner.getConfidenceIntervals())
+
+        self.assertFalse(ReplicationRunner(5).isValid())
+        self.assertEqual({}, ReplicationRunner(5).run(3))
+
+    def test_antitheticStreams(self):
+        u = RandomStreams(3).getStream('service', 'Server0').uniforms(100)
+        v = RandomStreams(3, antithetic=True).getStream('service', 'Server0').uniforms(100)
+        self.assertTrue(np.allclose(1, u + v))
+
+    def test_run(self):
+        runner = ReplicationRunner(buildSimulation, 100)
+        estimates = runner.run(4, maxEvents=200, controlVariates=False)
+
+        self.assertEqual(4, runner.numReplications)
+        for key in ['AvgWaitTime', 'AvgSystemTime', 'MaxWaitTime', 'NumCustomers']:
+            with self.subTest(key=key):
+                values = [r[key] for r in runner.getReplicationResults()]
+                self.assertAlmostEqual(np.mean(values), estimates[key])
+
+                low, high = runner.getConfidenceIntervals()[key]
+                self.assertLessEqual(low, estimates[key])
+                self.assertGreaterEqual(high, estimates[key])
+
+        # the same seed reproduces the same replications
+        self.assertEqual(estimates, ReplicationRunner(buildSimulation, 100).run(4, maxEvents=200,
+                                                                               controlVariates=False))
+
+    def test_runAntithetic(self):
+        runner = ReplicationRunner(buildSimulation, 100)
+        estimates = runner.run(2, maxEvents=200, antithetic=True)
+        self.assertEqual(2, runner.numReplications)
+
+        # each observation is the average of an ordinary and an antithetic replication
+        ordinary = runner._runReplication(0, np.inf, 200, 0, False)[0]
+        mirrored = runner._runReplication(0, np.inf, 200, 0, True)[0]
+        self.assertNotAlmostEqual(ordinary['AvgSystemTime'], mirrored['AvgSystemTime'])
+        self.assertAlmostEqual((ordinary['AvgSystemTime'] + mirrored['AvgSystemTime']) / 2,
+                               runner.getReplicationResults()[0]['AvgSystemTime'])
+        self.assertTrue('AvgWaitTime' in estimates)
+
+    def test_getControlVariates(self):
+        sim = buildSimulation(RandomStreams(100))
+        sim.run(maxEvents=200)
+
+        sp = sim._stages['SP0']
+        server = sim._stages['Q0'].servers['Server0']
+        self.assertAlmostEqual(180, sp.expectedInterarrivalTime)
+        self.assertAlmostEqual(144, server.expectedServiceTime)
+        self.assertGreater(sp.numInterarrivalTimes, 0)
+        self.assertGreater(server.numServiceTimes, 0)
+
+        controls = SimulationAnalysis(sim).getControlVariates()
+        self.assertAlmostEqual(sp.observedMeanInterarrivalTime - 180, controls['InterarrivalTime'])
+        self.assertAlmostEqual(server.observedMeanServiceTime - 144, controls['ServiceTime'])
+
+    def test_runControlVariates(self):
+        runner = ReplicationRunner(buildSimulation, 100)
+        estimates = runner.run(8, maxEvents=200)
+
+        # adjust the raw observations by hand: Y - beta * C with least squares beta
+        controls = np.array([[c['InterarrivalTime'], c['ServiceTime']] for c in runner._controls])
+        centered = controls - controls.mean(axis=0)
+
+        for key in ['AvgWaitTime', 'AvgSystemTime']:
+            with self.subTest(key=key):
+                y = np.array([r[key] for r in runner.getReplicationResults()])
+                beta = np.linalg.lstsq(centered, y - y.mean(), rcond=None)[0]
+                self.assertAlmostEqual(np.mean(y - controls @ beta), estimates[key])
+
+                # the interval uses the residual variance of the regression, with 8 - 1 - 2
+                # degrees of freedom, and the variance of the intercept at the controls' mean
+                residuals = y - y.mean() - centered @ beta
+                variance = residuals @ residuals / 5
+                mean = controls.mean(axis=0)
+                se = np.sqrt(variance * (1 / 8 + mean @ np.linalg.inv(centered.T @ centered) @ mean))
+
+                low, high = runner.getConfidenceIntervals(0.05)[key]
+                self.assertAlmostEqual(2.5706 * se, (high - low) / 2, delta=1e-4 * se)
+
+        # measures other than waiting and system times are not adjusted
+        self.assertAlmostEqual(np.mean([r['MaxWaitTime'] for r in runner.getReplicationResults()]),
+                               estimates['MaxWaitTime'])
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
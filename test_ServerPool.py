@@ -0,0 +1,117 @@
+import math
+from unittest import TestCase, main
+from Sim.ServerPool import ServerPool
+from Sim.Distribution import Distribution
+from Sim.ServerState import ServerState
+from Sim.Customer import Customer
+from Sim.SimQueue import SimQueue
+from Sim.SystemExit import SystemExit
+from Sim.Assigner import Assigner
+from Sim.RandomStreams import RandomStreams
+import numpy as np
+
+
+class TestServerPool(TestCase):
+
+    def setUp(self) -> None:
+        self.dist = {}
+        self.dist['st'] = Distribution("scipy.stats.expon(scale=300)")
+        self.dist['fixed'] = Distribution("scipy.stats.randint(100, 101)")
+
+        self.pool = ServerPool('P1', 3, 0, self.dist['fixed'])
+        self.cust = [Customer(f'Cust{i}', 0) for i in range(6)]
+        for cust in self.cust:
+            cust.logArrival(0, 'Q1')
+
+        self.assertTrue(isinstance(self.pool.__str__(), str))
+        self.assertTrue(isinstance(self.pool.__repr__(), str))
+
+    def test_init(self):
+        self.assertEqual('P1', self.pool.id)
+        self.assertEqual(3, self.pool.numServers)
+        self.assertEqual(3, self.pool.numFree)
+        self.assertEqual(0, self.pool.availableSince)
+        self.assertEqual(ServerState.AVAILABLE, self.pool.status)
+        self.assertEqual(math.inf, self.pool.getNextEventTime())
+
+        # pools without servers or without a valid service time distribution are invalid
+        for pool in [ServerPool('P2', 0, 0, self.dist['fixed']),
+                     ServerPool('P3', 2, 0, self.dist['fixed'].RNG),
+                     ServerPool('P4', 2, 0, Distribution('nrml(1,2)'))]:
+            with self.subTest(pool=pool.id):
+                self.assertEqual(ServerState.INVALID, pool.status)
+                self.assertEqual(0, pool.numFree)
+                self.assertFalse(pool.acceptCustomer(0, self.cust[0]))
+
+    def test_acceptCustomer(self):
+        for i in range(3):
+            with self.subTest(i=i):
+                self.assertTrue(self.pool.acceptCustomer(i * 10, self.cust[i]))
+                self.assertEqual(i + 1, self.pool.numBusy)
+
+        self.assertTrue(self.pool.isBusy)
+        self.assertEqual(math.inf, self.pool.availableSince)
+        self.assertFalse(self.pool.acceptCustomer(30, self.cust[3]))
+        self.assertFalse(ServerPool('P2', 1, 0, self.dist['fixed']).acceptCustomer(0, 'teddy'))
+
+        self.assertEqual(100, self.pool.getNextEventTime())
+
+    def test_processEvent(self):
+        for i in range(3):
+            self.pool.acceptCustomer(i * 10, self.cust[i])
+
+        # premature requests are ignored
+        self.assertTrue(self.pool.processEvent(50) is None)
+
+        # services complete in order of completion time
+        for i in range(3):
+            with self.subTest(i=i):
+                self.assertEqual(100 + i * 10, self.pool.getNextEventTime())
+                self.assertTrue(self.pool.processEvent(100 + i * 10) is self.cust[i])
+                self.assertEqual(100 + i * 10, self.cust[i].exp.serviceCompletionTime)
+
+        # the pool became available when the first service completed
+        self.assertEqual(100, self.pool.availableSince)
+        self.assertEqual(math.inf, self.pool.getNextEventTime())
+        self.assertEqual(3, self.pool.numServiceTimes)
+        self.assertAlmostEqual(100, self.pool.observedMeanServiceTime)
+        self.assertAlmostEqual(100, self.pool.expectedServiceTime)
+
+    def test_setRandomStreams(self):
+        # all servers of the pool share one service time stream
+        pool = ServerPool('P1', 3, 0, self.dist['st'])
+        pool.setRandomStreams(RandomStreams(10))
+        u = RandomStreams(10).getStream('service', 'P1').uniforms(3)
+
+        for i in range(3):
+            pool.acceptCustomer(0, self.cust[i])
+
+        times = sorted(t for t, n, c in pool._completions)
+        self.assertTrue(np.allclose(sorted(-300 * np.log(1 - u)), times))
+
+    def test_simQueue(self):
+        testq = SimQueue('Q1', Assigner().assignInSequence)
+        testq.assignServer = Assigner().assignByAvailableTime
+        exit = SystemExit('Exit1')
+        testq.addCustomerDestination(exit)
+        self.assertTrue(testq.addServer(self.pool))
+
+        # five customers arrive together - three enter service with the pool, two wait
+        self.assertEqual(5, testq.acceptArrivals(0, self.cust[:5]))
+        self.assertEqual(3, testq.getNumBusyServers())
+        self.assertEqual(0, testq.getNumAvailableServers())
+        self.assertEqual(2, testq.getNumCustomersWaiting())
+
+        # the three services complete in a single event, after which the waiting
+        # customers enter service
+        self.assertEqual(100, testq.getNextEventTime())
+        testq.processEvent(100)
+        self.assertEqual(3, len(exit._customers))
+        self.assertEqual(2, testq.getNumBusyServers())
+        self.assertEqual(1, testq.getNumAvailableServers())
+        self.assertEqual(0, testq.getNumCustomersWaiting())
+        self.assertEqual(200, testq.getNextEventTime())
+
+
+if __name__ == '__main__':
+    main(verbosity=2)
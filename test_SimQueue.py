@@ -6,6 +6,7 @@ from Sim.SimulationStage import SimulationStage
 from Sim.CustomerDestination import CustomerDestination
 from Sim.Customer import Customer
 from Sim.SimQueue import SimQueue
+from Sim.SourcePopulation import SourcePopulation
 from Sim.Assigner import Assigner
 from Sim.Server import Server
 from Sim.SystemExit import SystemExit
@@ -237,6 +238,10 @@ class TestSimQueue(TestCase):
         self.assertTrue(isinstance(testq.removeServer('Server1'), Server))
         self.assertEqual(2, len(testq._servers))
 
+        # the remaining Servers are renumbered
+        self.assertEqual(None, self.servers[0].index)
+        self.assertEqual([0, 1], [self.servers[1].index, self.servers[2].index])
+
     def test_getNumAvailableServers(self):
         testq = copy.deepcopy(self.testq)
         testq._assignServer = Assigner().assignInSequence
@@ -464,6 +469,305 @@ class TestSimQueue(TestCase):
         #
         # self.assertListEqual([], testq._getAvailableServers())
 
+    def test_acceptArrivals(self):
+        testq = copy.deepcopy(self.testq)
+        testq._assignServer = Assigner().assignInSequence
+        testq.addCustomerDestination(self.dest[3])
+
+        # every service takes exactly 100, so services starting together end together
+        svc = Distribution("scipy.stats.randint(100, 101)")
+        servers = [Server(f'Server{i}', 0, self.dist['dt'], self.dist['oos'], svc)
+                   for i in range(1, 4)]
+
+        # an invalid SimQueue accepts none of the customers
+        self.assertEqual(0, testq.acceptArrivals(0, self.cust[:5]))
+
+        for srvr in servers:
+            testq.addServer(srvr)
+
+        # five customers arrive together - three enter service, two wait
+        self.assertEqual(5, testq.acceptArrivals(0, self.cust[:5] + ['not a customer']))
+        self.assertEqual(3, testq.getNumBusyServers())
+        self.assertEqual(2, testq.getNumCustomersWaiting())
+
+        exps = [list(self.cust[i].getExperiences().values())[0] for i in range(3)]
+        self.assertListEqual([0, 0, 0], [exp.serviceEntryTime for exp in exps])
+        self.assertSetEqual({srvr.id for srvr in servers}, {exp.serverId for exp in exps})
+
+        # all three servers complete service in a single event, after which the
+        # waiting customers enter service
+        self.assertEqual(100, testq.getNextEventTime())
+        self.assertTrue(isinstance(testq.processEvent(100), Customer))
+        self.assertEqual(3, len(self.dest[3]._customers))
+        self.assertEqual(2, testq.getNumBusyServers())
+        self.assertEqual(0, testq.getNumCustomersWaiting())
+        self.assertEqual(200, testq.getNextEventTime())
+
+    def buildQueue(self, id, numServers, serviceTime, **kwargs):
+        testq = SimQueue(id, Assigner().assignInSequence, **kwargs)
+        testq.assignServer = Assigner().assignInSequence
+
+        svc = Distribution(f"scipy.stats.randint({serviceTime}, {serviceTime + 1})")
+        for i in range(numServers):
+            testq.addServer(Server(f'{id}-Server{i}', 0, self.dist['dt'], self.dist['oos'], svc))
+
+        return testq
+
+    def test_capacity(self):
+        # invalid capacities and overflow policies
+        for kwargs in [{'capacity': -1}, {'overflowPolicy': 'drop'}, {'overflowPolicy': 'reroute'}]:
+            with self.subTest(kwargs=kwargs):
+                testq = self.buildQueue('Q1', 1, 100, **kwargs)
+                testq.addCustomerDestination(self.dest[3])
+                self.assertFalse(testq.isValid())
+
+        # one server and room for two waiting customers - two of five are lost
+        testq = self.buildQueue('Q1', 1, 100, capacity=2)
+        testq.addCustomerDestination(self.dest[3])
+        self.assertTrue(math.isnan(testq.blockingProbability))
+
+        accepted = [testq.acceptArrival(0, self.cust[i]) for i in range(5)]
+        self.assertListEqual([True, True, True, False, False], accepted)
+        self.assertEqual(1, testq.getNumBusyServers())
+        self.assertEqual(2, testq.getNumCustomersWaiting())
+        self.assertEqual(5, testq.numArrivals)
+        self.assertEqual(2, testq.numBlocked)
+        self.assertAlmostEqual(0.4, testq.blockingProbability)
+
+        # a batch fills the remaining room after a service completion
+        testq.processEvent(100)
+        self.assertEqual(1, testq.acceptArrivals(100, self.cust[5:7]))
+        self.assertEqual(3, testq.numBlocked)
+
+    def test_reroute(self):
+        # without waiting room, a customer is only accepted by an available server
+        overflow = SystemExit('Overflow')
+        testq = self.buildQueue('Q1', 2, 100, capacity=0, overflowPolicy='reroute',
+                                overflowDestination=overflow)
+        testq.addCustomerDestination(self.dest[3])
+
+        self.assertEqual(2, testq.acceptArrivals(0, self.cust[:3]))
+        self.assertFalse(testq.acceptArrival(0, self.cust[3]))
+        self.assertEqual(2, len(overflow._customers))
+        self.assertEqual(2, testq.numBlocked)
+
+    def test_block(self):
+        # tandem queues: Q2 has no waiting room and blocks Q1's servers when full
+        q2 = self.buildQueue('Q2', 1, 1000, capacity=0, overflowPolicy='block')
+        q2.addCustomerDestination(self.dest[3])
+
+        q1 = self.buildQueue('Q1', 2, 100)
+        q1.addCustomerDestination(q2)
+
+        self.assertEqual(2, q1.acceptArrivals(0, self.cust[:2]))
+
+        # both complete service at Q1; one enters service at Q2, the other is kept
+        # by its server at Q1, which cannot serve the next customer
+        q1.processEvent(100)
+        self.assertEqual(1, q2.getNumBusyServers())
+        self.assertEqual(1, q2.numBlocked)
+        self.assertEqual(1, q1.getNumBlockedServers())
+        self.assertEqual(1, q1.getNumAvailableServers())
+
+        # the Server keeping the customer cannot be removed
+        held = q1._held[0][0]
+        self.assertEqual(None, q1.removeServer(held.id))
+        self.assertEqual(2, len(q1._servers))
+
+        q1.acceptArrivals(150, self.cust[2:4])
+        self.assertEqual(1, q1.getNumCustomersWaiting())
+
+        # when Q2's server becomes available, it takes the kept customer, and Q1's
+        # freed server takes the waiting customer
+        self.assertEqual(1100, q2.getNextEventTime())
+        q2.processEvent(1100)
+        self.assertEqual(0, q1.getNumBlockedServers())
+        self.assertEqual(0, q1.getNumCustomersWaiting())
+        self.assertEqual(2, q1.getNumBusyServers())
+        self.assertEqual(1, q2.getNumBusyServers())
+
+        # the customer kept at Q1 entered service at Q2 when it was released
+        entries = sorted(list(c.getExperiences().values())[1].serviceEntryTime
+                         for c in self.cust[:2])
+        self.assertListEqual([100, 1100], entries)
+
+        # once released, the Server can be removed
+        self.assertTrue(q1.removeServer(held.id) is held)
+
+    def test_blockSource(self):
+        # a blocked SourcePopulation suspends its arrivals until released
+        testq = self.buildQueue('Q1', 1, 100, capacity=0, overflowPolicy='block')
+        testq.addCustomerDestination(self.dest[3])
+
+        sp = SourcePopulation('SP1', Distribution("scipy.stats.randint(30, 31)"),
+                              Assigner().assignInSequence)
+        sp.addCustomerDestination(testq)
+
+        sp.processEvent(30)
+        sp.processEvent(60)
+        self.assertEqual(math.inf, sp.getNextEventTime())
+        self.assertEqual(1, testq.numBlocked)
+
+        # the service completion releases the held customer and arrivals resume
+        testq.processEvent(130)
+        self.assertEqual(1, testq.getNumBusyServers())
+        self.assertEqual(130, sp.getNextEventTime())
+
+    def test_priority(self):
+        testq = self.buildQueue('Q1', 1, 100, discipline='priority')
+        testq.addCustomerDestination(self.dest[3])
+        self.assertEqual('priority', testq.discipline)
+
+        cust = [Customer(f'Cust{i}', 0, priority=p) for i, p in enumerate([1, 1, 0, 2, 0])]
+        self.assertEqual(5, testq.acceptArrivals(0, cust))
+
+        # customers arriving together are served by priority, first come first served
+        # within a class
+        served = [testq.processEvent(t) for t in range(100, 600, 100)]
+        self.assertListEqual(['Cust2', 'Cust4', 'Cust0', 'Cust1', 'Cust3'],
+                             [c.name for c in served])
+
+        # an invalid discipline makes the SimQueue invalid
+        testq = self.buildQueue('Q1', 1, 100, discipline='lifo')
+        testq.addCustomerDestination(self.dest[3])
+        self.assertFalse(testq.isValid())
+
+    def test_preemptive(self):
+        testq = self.buildQueue('Q1', 1, 100, discipline='preemptive')
+        testq.addCustomerDestination(self.dest[3])
+
+        low = Customer('Low', 0, priority=1)
+        high = Customer('High', 30, priority=0)
+
+        testq.acceptArrival(0, low)
+        self.assertEqual(100, testq.getNextEventTime())
+
+        # the high priority customer interrupts the low priority customer's service
+        testq.acceptArrival(30, high)
+        self.assertEqual(1, testq.getNumCustomersWaiting())
+        self.assertAlmostEqual(70, low.remainingServiceTime)
+        self.assertEqual(130, testq.getNextEventTime())
+
+        # the low priority customer then resumes, finishing its remaining 70
+        self.assertTrue(testq.processEvent(130) is high)
+        self.assertTrue(low.remainingServiceTime is None)
+        self.assertEqual(200, testq.getNextEventTime())
+        self.assertTrue(testq.processEvent(200) is low)
+
+        exp = list(low.getExperiences().values())[0]
+        self.assertEqual(0, exp.waitingTime)
+        self.assertEqual(200, exp.systemTime)
+
+        # equal priority customers do not interrupt each other
+        testq.acceptArrival(300, Customer('A', 300, priority=1))
+        testq.acceptArrival(310, Customer('B', 310, priority=1))
+        self.assertEqual(400, testq.getNextEventTime())
+
+    def test_renege(self):
+        # every customer waits at most 50 before abandoning
+        abandoned = SystemExit('Abandoned')
+        testq = self.buildQueue('Q1', 1, 100,
+                                patienceDist=Distribution("scipy.stats.randint(50, 51)"),
+                                abandonDestination=abandoned)
+        testq.addCustomerDestination(self.dest[3])
+
+        for i in range(3):
+            testq.acceptArrival(i * 10, self.cust[i])
+
+        # the first customer is served; the others abandon at 60 and 70
+        self.assertEqual(2, testq.getNumCustomersWaiting())
+        self.assertEqual(60, testq.getNextEventTime())
+        self.assertEqual(QueueEvent.ABANDONMENT, testq.getNextEventType())
+
+        self.assertTrue(testq.processEvent(60) is None)
+        self.assertEqual(1, testq.getNumCustomersWaiting())
+        self.assertEqual(1, testq.numAbandoned)
+        self.assertTrue(self.cust[1] in list(abandoned))
+
+        exp = list(self.cust[1].getExperiences().values())[0]
+        self.assertEqual(60, exp.abandonmentTime)
+        self.assertEqual(50, exp.waitingTime)
+        self.assertEqual(50, self.cust[1].totalWaitTime)
+
+        # a customer entering service before its deadline does not abandon; the stale
+        # deadline is skipped
+        testq.acceptArrival(65, self.cust[3])
+        self.assertEqual(70, testq.getNextEventTime())
+        testq.processEvent(70)
+        self.assertEqual(2, testq.numAbandoned)
+        self.assertEqual(100, testq.getNextEventTime())
+
+        testq.processEvent(100)
+        exp = list(self.cust[3].getExperiences().values())[0]
+        self.assertEqual(100, exp.serviceEntryTime)
+        self.assertEqual(0, testq.getNumCustomersWaiting())
+        self.assertEqual(200, testq.getNextEventTime())
+        self.assertEqual(2, testq.numAbandoned)
+
+    def test_renegeFromMiddle(self):
+        # customers with shorter patience leave from the middle of the waiting line
+        testq = self.buildQueue('Q1', 1, 100)
+        testq._patienceDistribution = Distribution("scipy.stats.randint(50, 51)")
+        testq.addCustomerDestination(self.dest[3])
+
+        testq.acceptArrival(0, self.cust[0])
+        testq.acceptArrival(0, self.cust[1])
+        testq._patienceDistribution = Distribution("scipy.stats.randint(20, 21)")
+        testq.acceptArrival(0, self.cust[2])
+        testq._patienceDistribution = None
+        testq.acceptArrival(0, self.cust[3])
+
+        testq.processEvent(20)
+        self.assertEqual(2, testq.getNumCustomersWaiting())
+
+        # the abandoned customer is skipped when it reaches the front
+        testq.processEvent(50)
+        self.assertEqual(1, testq.getNumCustomersWaiting())
+        testq.processEvent(100)
+        exp = list(self.cust[3].getExperiences().values())[0]
+        self.assertEqual(100, exp.serviceEntryTime)
+        self.assertEqual(0, testq.getNumCustomersWaiting())
+
+    def test_balk(self):
+        balked = SystemExit('Balked')
+        testq = self.buildQueue('Q1', 1, 100, balkThreshold=2, abandonDestination=balked)
+        testq.addCustomerDestination(self.dest[3])
+
+        # one customer is served, two wait, the rest balk; balking Customers are handled
+        # by the SimQueue, so they are counted as accepted
+        self.assertEqual(4, testq.acceptArrivals(0, self.cust[:4]))
+        self.assertTrue(testq.acceptArrival(10, self.cust[4]))
+        self.assertEqual(2, testq.numBalked)
+        self.assertEqual(2, len(balked._customers))
+        self.assertEqual(0, testq.numBlocked)
+        self.assertEqual(3, testq.getNumCustomersWaiting() + testq.getNumBusyServers())
+
+        # under the 'block' policy, a balking Customer is not kept (and sent again) by the
+        # upstream stage
+        balked = SystemExit('Balked')
+        testq = self.buildQueue('Q1', 1, 100, capacity=5, overflowPolicy='block',
+                                balkThreshold=2, abandonDestination=balked)
+        testq.addCustomerDestination(self.dest[3])
+
+        sp = SourcePopulation('SP1', Distribution("scipy.stats.randint(10, 11)"),
+                              Assigner().assignInSequence)
+        sp.addCustomerDestination(testq)
+
+        for t in range(10, 110, 10):
+            sp.processEvent(t)
+
+        self.assertEqual(110, sp.getNextEventTime())
+        self.assertEqual(7, testq.numBalked)
+        self.assertEqual(7, len(balked._customers))
+        self.assertEqual(0, testq.numBlocked)
+
+        # an invalid threshold or abandon destination makes the SimQueue invalid
+        for kwargs in [{'balkThreshold': -1}, {'abandonDestination': 'exit'}]:
+            with self.subTest(kwargs=kwargs):
+                testq = self.buildQueue('Q1', 1, 100, **kwargs)
+                testq.addCustomerDestination(self.dest[3])
+                self.assertFalse(testq.isValid())
+
     def test_getNextEventTime(self):
         # first, set up the SimQueue
         testq = copy.deepcopy(self.testq)
@@ -1,3 +1,5 @@
+import subprocess
+import sys
 from unittest import TestCase, main
 from Sim.Simulation import Simulation
 from Sim.SourcePopulation import SourcePopulation
@@ -7,6 +9,9 @@ from Sim.Assigner import Assigner
 from Sim.Distribution import Distribution
 from Sim.Customer import Customer
 from Sim.Server import Server
+from Sim.RandomStreams import RandomStreams
+from Sim.Instrumentation import Instrumentation
+from Sim.QueueEvent import QueueEvent
 import numpy as np
 import pandas as pd
 import shelve
@@ -103,6 +108,178 @@ class TestSimulation(TestCase):
         self.assertFalse(self.sim.removeStage('Q2'))
         self.assertEqual(1, self.sim.numStages)
 
+    def test_index(self):
+        # stages are numbered in the order in which they are added
+        for i, id in enumerate(['SP1', 'SE0', 'SE1']):
+            self.sim.addStage(self.stages[id])
+            self.assertEqual(i, self.stages[id].index)
+
+        # replacing a stage keeps its index
+        se = SystemExit('SE0')
+        self.sim.addStage(se)
+        self.assertEqual(1, se.index)
+        self.assertEqual(3, self.sim.numStages)
+
+        # removing a stage renumbers the stages after it
+        self.assertTrue(self.sim.removeStage('SE0'))
+        self.assertEqual(None, se.index)
+        self.assertEqual(0, self.stages['SP1'].index)
+        self.assertEqual(1, self.stages['SE1'].index)
+        self.assertEqual([self.stages['SP1'], self.stages['SE1']], self.sim.stages)
+
+    def test_progress(self):
+        for id in ['SP0', 'SE0']:
+            self.sim.addStage(self.stages[id])
+
+        calls = []
+        self.assertTrue(self.sim.addProgressCallback(lambda sim, progress: calls.append(progress),
+                                                     everyEvents=25))
+        self.assertFalse(self.sim.addProgressCallback('callback', everyEvents=25))
+        self.assertFalse(self.sim.addProgressCallback(print))
+        self.assertFalse(self.sim.addProgressCallback(print, everyEvents=0))
+
+        self.sim.run(maxEvents=100)
+        self.assertEqual([25, 50, 75, 100], [progress['events'] for progress in calls])
+        self.assertEqual(100, calls[-1]['arrivals'])
+        self.assertEqual(100, calls[-1]['departures'])
+        self.assertEqual(0, calls[-1]['inSystem'])
+        self.assertEqual(self.sim.simtime, calls[-1]['simtime'])
+        self.assertGreater(calls[-1]['eventRate'], 0)
+
+        # events are counted from the start of each run
+        self.sim.run(maxEvents=130)
+        self.assertEqual([25], [progress['events'] for progress in calls[4:]])
+
+        # a callback cancels the run cooperatively
+        self.sim.addProgressCallback(lambda sim, progress: sim.cancel(), everyEvents=10)
+        self.sim.run(maxEvents=1000)
+        self.assertTrue(self.sim.cancelled)
+        self.assertEqual(140, self.sim.getTrialsCompleted())
+
+        # wall-clock callbacks are due at least every few events at this interval
+        for callback in [hook[0] for hook in self.sim._progressCallbacks]:
+            self.assertTrue(self.sim.removeProgressCallback(callback))
+        self.assertFalse(self.sim.removeProgressCallback(print))
+
+        calls.clear()
+        self.sim.addProgressCallback(lambda sim, progress: calls.append(progress), everySeconds=1e-9)
+        self.sim.run(maxEvents=160)
+        self.assertFalse(self.sim.cancelled)
+        self.assertGreater(len(calls), 5)
+
+    def test_progressLosses(self):
+        # a SimQueue without waiting room loses Customers, who are not in the system
+        sim = Simulation()
+        sim.setRandomStreams(RandomStreams(5))
+
+        se = SystemExit('SE0')
+        queue = SimQueue('Q0', self.assigner.assignInSequence, capacity=0)
+        queue.assignServer = self.assigner.assignByAvailableTime
+        queue.addCustomerDestination(se)
+        sp = SourcePopulation('SP0', self.dist['ar'], self.assigner.assignInSequence)
+        sp.addCustomerDestination(queue)
+
+        for stage in [sp, queue, se]:
+            sim.addStage(stage)
+        queue.addServer(Server('Server0', 0, self.dist['dt'], self.dist['oos'], self.dist['st']))
+
+        sim.run(maxEvents=500)
+        progress = sim.getProgress()
+        self.assertGreater(queue.numBlocked, 0)
+        self.assertEqual(queue.getNumBusyServers(), progress['inSystem'])
+        self.assertEqual(progress['arrivals'] - progress['departures'] - queue.numBlocked,
+                         progress['inSystem'])
+
+    def test_step(self):
+        def build():
+            sim = Simulation()
+            sim.setRandomStreams(RandomStreams(7))
+
+            se = SystemExit('SE0')
+            queue = SimQueue('Q0', self.assigner.assignInSequence)
+            queue.assignServer = self.assigner.assignByAvailableTime
+            queue.addCustomerDestination(se)
+            sp = SourcePopulation('SP0', self.dist['ar'], self.assigner.assignInSequence)
+            sp.addCustomerDestination(queue)
+
+            for stage in [sp, queue, se]:
+                sim.addStage(stage)
+            queue.addServer(Server('Server0', 0, self.dist['dt'], self.dist['oos'], self.dist['st']))
+
+            return sim
+
+        # nothing to step without stages
+        self.assertEqual(None, Simulation().step())
+
+        sim = build()
+        simtime, id, eventType = sim.step()
+        self.assertEqual(('SP0', Instrumentation.ARRIVAL), (id, eventType))
+        self.assertEqual(simtime, sim.simtime)
+        self.assertEqual(1, sim.getTrialsCompleted())
+
+        # events are yielded in chunks, in time order
+        chunks = sim.events(chunkSize=50)
+        for i in range(3):
+            chunk = next(chunks)
+            self.assertEqual(50, len(chunk))
+            self.assertEqual(sorted(event[0] for event in chunk), [event[0] for event in chunk])
+        self.assertTrue(any(event[2] == QueueEvent.SERVICE_COMPLETION for event in chunk))
+        self.assertEqual(151, sim.getTrialsCompleted())
+
+        # runUntil stops before the first event after simtime and resumes from there
+        count = sim.runUntil(sim.simtime + 3600)
+        self.assertGreater(count, 0)
+        self.assertEqual(151 + count, sim.getTrialsCompleted())
+        self.assertGreater(min(stage.getNextEventTime() for stage in sim._stageList), sim.simtime)
+        self.assertEqual(0, sim.runUntil(sim.simtime))
+
+        # stepping reproduces run
+        other = build()
+        other.run(maxEvents=sim.getTrialsCompleted())
+        self.assertEqual([c.systemArrivalTime for c in other], [c.systemArrivalTime for c in sim])
+
+        # the generator ends with the run's maxTime, after the event reaching it
+        events = [event for chunk in build().events(chunkSize=7, maxTime=7200) for event in chunk]
+        self.assertGreaterEqual(events[-1][0], 7200)
+        self.assertTrue(all(event[0] < 7200 for event in events[:-1]))
+
+    def test_lazyImports(self):
+        # the engine loads without pandas or scipy, which are imported on first use
+        code = """if True:
+            import sys
+            from Sim.Simulation import Simulation
+            from Sim.SimQueue import SimQueue
+            from Sim.SourcePopulation import SourcePopulation
+            from Sim.ReplicationRunner import ReplicationRunner
+            print('pandas' in sys.modules, 'scipy' in sys.modules)
+
+            from Sim.Distribution import Distribution
+            Distribution('scipy.stats.expon(scale=180)')
+            print('scipy' in sys.modules)
+
+            # running a model does not import pandas either
+            from Sim.SystemExit import SystemExit
+            from Sim.Assigner import Assigner
+            from Sim.Server import Server
+            sim = Simulation()
+            se = SystemExit('SE0')
+            queue = SimQueue('Q0', Assigner().assignInSequence)
+            queue.assignServer = Assigner().assignByAvailableTime
+            queue.addCustomerDestination(se)
+            sp = SourcePopulation('SP0', Distribution('scipy.stats.expon(scale=180)'),
+                                  Assigner().assignInSequence)
+            sp.addCustomerDestination(queue)
+            for stage in [sp, queue, se]:
+                sim.addStage(stage)
+            queue.addServer(Server('Server0', 0, Distribution('scipy.stats.expon(scale=1e6)'),
+                                   Distribution('scipy.stats.expon(scale=60)'),
+                                   Distribution('scipy.stats.expon(scale=144)')))
+            sim.run(maxEvents=200)
+            print(se.numCustomers > 0, 'pandas' in sys.modules)"""
+
+        result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+        self.assertEqual(['False False', 'True', 'True False'], result.stdout.splitlines())
+
     def test_iter(self):
         self.sim.addStage(self.stages['SE0'])
         self.sim.addStage(self.stages['SE1'])
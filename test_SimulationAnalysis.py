@@ -283,5 +283,29 @@ class TestSimulation(TestCase):
             self.assertAlmostEqual(0, v)
 
 
+class TestSimulationAnalysisExits(TestCase):
+
+    def test_noQueue(self):
+        # Customers going straight from a source population to a system exit are analyzed
+        # as Customers that neither waited nor spent time in the system
+        sim = Simulation()
+        se = SystemExit('SE0')
+        sp = SourcePopulation('SP0', Distribution("scipy.stats.expon(scale=180)"),
+                              Assigner().assignInSequence)
+        sp.addCustomerDestination(se)
+        sim.addStage(sp)
+        sim.addStage(se)
+
+        sim.run(maxEvents=10)
+
+        analysis = SimulationAnalysis(sim)
+        self.assertTrue(analysis.isValid())
+
+        results = analysis.analyzeSystemPerformance()
+        self.assertEqual(10, results['NumCustomers'])
+        self.assertEqual(0, results['AvgWaitTime'])
+        self.assertEqual(0, results['MaxSystemTime'])
+
+
 if __name__ == '__main__':
     main(verbosity=2)
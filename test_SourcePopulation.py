@@ -6,6 +6,8 @@ from Sim.Assigner import Assigner
 from Sim.CustomerDestination import CustomerDestination
 from Sim.SimulationStage import SimulationStage
 from Sim.SimQueue import SimQueue
+from Sim.Server import Server
+from Sim.SystemExit import SystemExit
 import numpy as np
 import sys
 import scipy
@@ -161,6 +163,63 @@ class TestSourcePopulation(TestCase):
                 self.assertAlmostEqual(arrival_times[i], self.sp.getNextEventTime())
                 self.sp.processEvent(self.sp.getNextEventTime())
 
+    def test_processEventBatch(self):
+        # every arrival event brings 2, 3 or 4 customers to a single destination
+        sp = SourcePopulation("Source2", Distribution(scipy.stats.expon(scale=10)),
+                              Assigner().assignInSequence,
+                              Distribution("scipy.stats.randint(2, 5)"))
+        dest = SimQueue('test_dest', Assigner().assignInSequence)
+        dest.assignServer = Assigner().assignInSequence
+        dest.addCustomerDestination(SystemExit('Exit1'))
+        dest.addServer(Server('Server1', 0, Distribution("scipy.stats.uniform(1e9, 1)"),
+                              Distribution("scipy.stats.uniform(100, 1)"),
+                              Distribution("scipy.stats.uniform(1e9, 1)")))
+        self.assertTrue(sp.addCustomerDestination(dest))
+
+        total = 0
+        for i in range(10):
+            with self.subTest(i = i):
+                before = sp.count
+                sp.processEvent(sp.getNextEventTime())
+                self.assertTrue(2 <= sp.count - before <= 4)
+                self.assertEqual(f'Source2-{sp.count - 1}', sp.cust.name)
+                total = sp.count - 1
+
+        # the single server never finishes, so all but one customer are waiting
+        self.assertEqual(total - 1, dest.getNumCustomersWaiting())
+
+        # an empty batch brings no customer, and does not report the previous one
+        sp = SourcePopulation("Source4", Distribution(scipy.stats.expon(scale=10)),
+                              Assigner().assignInSequence,
+                              Distribution("scipy.stats.randint(0, 2)"))
+        sp.addCustomerDestination(SystemExit('Exit2'))
+        sizes = []
+        for i in range(20):
+            before = sp.count
+            sp.processEvent(sp.getNextEventTime())
+            sizes.append(sp.count - before)
+
+            self.assertEqual(sizes[-1] == 0, sp.cust is None)
+        self.assertIn(0, sizes)
+        self.assertIn(1, sizes)
+
+        # an invalid batch size distribution is ignored
+        sp = SourcePopulation("Source3", Distribution(scipy.stats.expon(scale=10)),
+                              Assigner().assignInSequence, Distribution('nrml(2, 1)'))
+        self.assertTrue(sp._batchSizeDistribution is None)
+
+    def test_priority(self):
+        # customers of a fixed class, or of a class drawn for each customer
+        sp = SourcePopulation("Source2", Distribution(scipy.stats.expon(scale=10)),
+                              Assigner().assignInSequence, priority=3)
+        self.assertEqual(3, sp._createCustomer(0).priority)
+
+        sp = SourcePopulation("Source3", Distribution(scipy.stats.expon(scale=10)),
+                              Assigner().assignInSequence,
+                              priority=Distribution("scipy.stats.randint(0, 3)"))
+        priorities = {sp._createCustomer(0).priority for i in range(50)}
+        self.assertSetEqual({0, 1, 2}, priorities)
+
     def test_setArrivalTimeDistribution(self):
         # save the state, Distribution will have generated it's first RV
         rstate = np.random.get_state()
@@ -47,6 +47,19 @@ class TestSystemExit(TestCase):
         # now, try to add another customer with the same name as an existing customer
         self.assertFalse(self.se.acceptArrival(500, Customer('Cust 1', 50)))
 
+        # customers of a source population are stored by key, and looked up by name
+        cust = Customer(1, 600, source='SP0')
+        self.assertTrue(self.se.acceptArrival(600, cust))
+        self.assertTrue(self.se.customer['SP0-1'] is cust)
+        self.assertTrue(self.se.customer['Cust 1'] is self.cust[1])
+        self.assertEqual(11, self.se.numCustomers)
+
+        # customers of different sources with the same number are all kept
+        for source in ['SP1', 'SP2']:
+            self.assertTrue(self.se.acceptArrival(700, Customer(1, 700, source=source)))
+        self.assertFalse(self.se.acceptArrival(700, Customer(1, 700, source='SP2')))
+        self.assertEqual(13, len(self.se.customer))
+
     def test_iter(self):
         # create 10 customers for use in test
         # the names and arrivalTimes lists are in Customer arrival sequence
@@ -0,0 +1,114 @@
+from unittest import TestCase, main
+from Sim.TraceSourcePopulation import TraceSourcePopulation
+from Sim.SourcePopulation import SourcePopulation
+from Sim.Simulation import Simulation
+from Sim.SystemExit import SystemExit
+from Sim.Assigner import Assigner
+import numpy as np
+import math
+import os
+import pickle
+import tempfile
+
+
+class TestTraceSourcePopulation(TestCase):
+
+    def setUp(self) -> None:
+        self.dir = tempfile.TemporaryDirectory()
+        self.times = np.cumsum(np.full(25, 10.0)) + 1000
+        self.priority = np.arange(25) % 3
+
+        self.csvPath = os.path.join(self.dir.name, 'trace.csv')
+        with open(self.csvPath, 'w') as f:
+            f.write('time,priority,region\n')
+            for t, p in zip(self.times, self.priority):
+                f.write(f'{t},{p},north\n')
+
+        self.binPath = os.path.join(self.dir.name, 'trace.bin')
+        self.times.tofile(self.binPath)
+
+        self.npyPath = os.path.join(self.dir.name, 'trace.npy')
+        np.save(self.npyPath, self.times)
+
+    def tearDown(self) -> None:
+        self.dir.cleanup()
+
+    def replay(self, sp):
+        sim = Simulation()
+        se = SystemExit('SE0')
+        sp.addCustomerDestination(se)
+        sim.addStage(sp)
+        sim.addStage(se)
+        sim.run(maxEvents=100)
+
+        return sim
+
+    def test_init(self):
+        sp = TraceSourcePopulation('SP0', self.csvPath, Assigner().assignInSequence)
+        self.assertTrue(isinstance(sp, SourcePopulation))
+        self.assertEqual('csv', sp._format)
+        self.assertFalse(sp.isValid())
+        self.assertEqual(self.times[0], sp._nextArrivalTime)
+
+        sp.addCustomerDestination(SystemExit('SE0'))
+        self.assertTrue(sp.isValid())
+        self.assertEqual(self.times[0], sp.getNextEventTime())
+
+        self.assertEqual('binary', TraceSourcePopulation('SP0', self.binPath, Assigner().assignInSequence)._format)
+        self.assertEqual('parquet', TraceSourcePopulation('SP0', 'trace.parquet', Assigner().assignInSequence)._format)
+
+        # missing files and unknown formats are invalid
+        sp = TraceSourcePopulation('SP0', 'missing.csv', Assigner().assignInSequence)
+        sp.addCustomerDestination(SystemExit('SE0'))
+        self.assertFalse(sp.isValid())
+        self.assertTrue(math.isnan(sp.getNextEventTime()))
+        self.assertFalse(TraceSourcePopulation('SP0', self.csvPath, Assigner().assignInSequence,
+                                               format='xlsx').isValid())
+
+    def test_replay(self):
+        for path in [self.csvPath, self.binPath, self.npyPath]:
+            with self.subTest(path=path):
+                # small chunks exercise reading the trace in several pieces
+                sp = TraceSourcePopulation('SP0', path, Assigner().assignInSequence,
+                                           chunkSize=4, timeOffset=1000)
+                sim = self.replay(sp)
+
+                arrivals = [c.systemArrivalTime for c in sim]
+                self.assertTrue(np.allclose(self.times - 1000, arrivals))
+                self.assertEqual(25, sp.numReplayed)
+
+                # the exhausted trace produces no further arrivals
+                self.assertTrue(math.isinf(sp.getNextEventTime()))
+
+    def test_pickle(self):
+        for path in [self.csvPath, self.binPath]:
+            with self.subTest(path=path):
+                sp = TraceSourcePopulation('SP0', path, Assigner().assignInSequence, chunkSize=4)
+                sp.addCustomerDestination(SystemExit('SE0'))
+
+                # pickled part way through the trace, the copy resumes where it left off
+                for i in range(10):
+                    sp.processEvent(sp.getNextEventTime())
+
+                copy = pickle.loads(pickle.dumps(sp))
+                copy.removeCustomerDestination('SE0')
+                sim = self.replay(copy)
+
+                arrivals = [c.systemArrivalTime for c in sim]
+                self.assertTrue(np.allclose(self.times[10:], arrivals))
+
+    def test_attributes(self):
+        sp = TraceSourcePopulation('SP0', self.csvPath, Assigner().assignInSequence,
+                                   attributeColumns=['priority', 'region'], chunkSize=7)
+        sim = self.replay(sp)
+
+        customers = list(sim)
+        self.assertEqual(25, len(customers))
+        for i, cust in enumerate(customers):
+            with self.subTest(i=i):
+                self.assertEqual(self.priority[i], cust.attributes['priority'])
+                self.assertEqual('north', cust.attributes['region'])
+
+
+if __name__ == '__main__':
+    main(verbosity=2)